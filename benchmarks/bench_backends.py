@@ -0,0 +1,56 @@
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from uclacatalog import api
+from uclacatalog.parser import backends
+import pages
+
+'''
+Checks that every parser backend extracts identical, plain fields from the same pages, then compares how fast each backend
+extracts them.
+
+Usage: python benchmarks/bench_backends.py [repeats]
+'''
+
+def _workloads():
+    catalog = pages.catalog_page('MATH')
+    sections = pages.leaf_sections_page('100001', 30)
+    detail = pages.section_detail_page('100001')
+    return [
+        ('catalog', lambda backend: backend.parse_courses(catalog.text, [api.LOWER_DIV, api.UPPER_DIV, api.GRAD_DIV])),
+        ('find', lambda backend: backend.parse_courses(catalog.text)),
+        ('sections', lambda backend: backend.parse_sections(sections.text)),
+        ('detail', lambda backend: backend.parse_detail(detail.text))
+    ]
+
+# Backends must only return plain values (see backends.py), which also makes them directly comparable
+def _check_plain(fields):
+    if type(fields) is dict:
+        for value in fields.values():
+            _check_plain(value)
+    elif type(fields) is list:
+        for value in fields:
+            _check_plain(value)
+    elif fields is not None and type(fields) is not str:
+        raise AssertionError('backend returned a ' + type(fields).__name__)
+    return fields
+
+def main(repeats):
+    names = list(backends._BACKENDS)
+    for workload, run in _workloads():
+        results = [_check_plain(run(backends.get_backend(name))) for name in names]
+        if any(result != results[0] for result in results):
+            raise AssertionError(workload + ': backends disagree')
+
+        timings = []
+        for name in names:
+            backend = backends.get_backend(name)
+            timings.append(min(timeit.repeat(lambda: run(backend), number=1, repeat=repeats)))
+        print('%-9s' % workload + '  '.join('%s: %7.2f ms' % (name, t * 1000) for name, t in zip(names, timings)))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,47 @@
+import os
+import sys
+import timeit
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from uclacatalog import api
+from uclacatalog.parser import backends, catalogparser
+import pages
+
+'''
+Compares parsing every division of a catalog page with one BeautifulSoup tree per division (the previous behavior)
+against the single-parse path used by catalogparser.parse_catalog, with each parser backend.
+
+Usage: python benchmarks/bench_catalog.py [repeats]
+'''
+
+def _parse_per_division(resp, subj_area):
+    course_list = []
+    for div in (api.LOWER_DIV, api.UPPER_DIV, api.GRAD_DIV):
+        resp_soup = BeautifulSoup(resp.text, 'lxml')
+        for course_soup in resp_soup.find('div', {'id': div}).find_all('div', class_='media-body'):
+            course_fields = backends.get_backend('bs4')._course_fields(course_soup, div)
+            course_list.append(catalogparser._populate_course(course_fields, subj_area))
+    return course_list
+
+def _parse_single(resp, subj_area, backend):
+    backends.set_backend(backend)
+    return catalogparser.parse_catalog(resp, subj_area, api.ALL_DIV)
+
+def main(repeats):
+    # Every page is parsed again on every repeat, which the parse memo would skip
+    backends.set_parse_memo(None)
+    for subj_area in ('MATH', 'COM SCI'):
+        resp = pages.catalog_page(subj_area)
+        before = min(timeit.repeat(lambda: _parse_per_division(resp, subj_area), number=1, repeat=repeats))
+        line = '%-8s per-division: %7.2f ms' % (subj_area, before * 1000)
+        for backend in ('bs4', 'lxml'):
+            assert len(_parse_per_division(resp, subj_area)) == len(_parse_single(resp, subj_area, backend))
+            after = min(timeit.repeat(lambda: _parse_single(resp, subj_area, backend), number=1, repeat=repeats))
+            line += '  single parse (%s): %7.2f ms (%.2fx)' % (backend, after * 1000, before / after)
+        print(line)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
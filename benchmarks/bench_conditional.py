@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from uclacatalog import api, cache, requesthandler, server
+from uclacatalog.memo import ParseMemo
+from uclacatalog.model import Course
+from uclacatalog.parser import backends, catalogparser, sectionparser
+import pages
+import recorded
+
+'''
+Crawls the recordings in fixtures/ twice from server.StandInServer with ETags enabled: with neither conditional
+requests nor the parse memo, with the parse memo alone, and with both. Reports the time of the second crawl, the 304s
+sent by the server and the pages that were not parsed again, then the time to parse an unchanged page of the largest
+kinds with and without the parse memo. The catalog memo is disabled so that every crawl requests every page.
+
+Usage: python benchmarks/bench_conditional.py [latency]
+'''
+
+CONFIGURATIONS = (
+    ('full requests and parses', False, False),
+    ('parse memo', False, True),
+    ('conditional + parse memo', True, True)
+)
+
+def _second_crawl(recordings, stand_in, expected, conditional, memoized):
+    requesthandler.set_conditional_store(cache.ConditionalStore() if conditional else None)
+    backends.set_parse_memo(ParseMemo() if memoized else None)
+    recorded.crawl(recordings)
+    stand_in.stats.clear()
+    parse_memo = backends.get_parse_memo()
+    before = parse_memo.stats() if parse_memo is not None else {'hits': 0, 'misses': 0}
+    started = time.perf_counter()
+    assert recorded.crawl(recordings) == expected
+    elapsed = time.perf_counter() - started
+    after = parse_memo.stats() if parse_memo is not None else before
+    requests = sum(stats['requests'] for stats in stand_in.stats.values())
+    not_modified = sum(stats['not_modified'] for stats in stand_in.stats.values())
+    return elapsed, requests, not_modified, after['hits'] - before['hits']
+
+def _parse_unchanged(repeats=10):
+    course = Course()
+    course.subj_area = 'MATH'
+    course.ctlg_no = '31'
+    course_page = pages.catalog_page('MATH')
+    sections_page = pages.leaf_sections_page('100001', 200)
+    section = sectionparser._parse_root_sections(pages.root_sections_page(1), course, '20F', fetch_details=False)[0]
+    for name, parse_memo in (('no parse memo', None), ('parse memo', ParseMemo())):
+        backends.set_parse_memo(parse_memo)
+        index = min(timeit.repeat(lambda: catalogparser.parse_index(course_page, 'MATH'), number=1, repeat=repeats))
+        sections = min(timeit.repeat(lambda: sectionparser._parse_leaf_sections(sections_page, section, fetch_details=False), number=1, repeat=repeats))
+        print('%-26s catalog page: %7.2f ms  200 section page: %7.2f ms' % (name, index * 1000, sections * 1000))
+
+def main(latency):
+    recordings = recorded.load()
+    api.set_catalog_memo(None)
+    recorded.install(recordings)
+    expected = recorded.crawl(recordings)
+    requesthandler.set_transport(None)
+
+    with server.StandInServer(recordings, latency=latency, etags=True) as stand_in:
+        requesthandler.configure(registrar_url=stand_in.url, soc_url=stand_in.url)
+        for name, conditional, memoized in CONFIGURATIONS:
+            elapsed, requests, not_modified, skipped = _second_crawl(recordings, stand_in, expected, conditional, memoized)
+            print('%-26s %7.2f s  %4d requests  %4d 304s  %4d parses skipped' % (name, elapsed, requests, not_modified, skipped))
+    requesthandler.configure(registrar_url=requesthandler.DEFAULT_REGISTRAR_URL, soc_url=requesthandler.DEFAULT_SOC_URL)
+    _parse_unchanged()
+    requesthandler.set_conditional_store(cache.ConditionalStore())
+    backends.set_parse_memo(ParseMemo())
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 0.005)
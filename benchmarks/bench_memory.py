@@ -0,0 +1,60 @@
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from uclacatalog.model import Course
+from uclacatalog.parser import backends, sectionparser
+import pages
+
+'''
+Reports how many bytes a term's worth of parsed sections keeps alive, per section.
+
+The dataset is made of courses with 3 lectures of 10 discussions or labs each, with details. All sections of a course
+are parsed from the same pages, so the page text itself is not counted.
+
+Usage: python benchmarks/bench_memory.py [courses]
+'''
+
+LECTURES = 3
+LEAVES = 10
+
+def _build_term(courses, root_resp, leaf_resp, detail_resp):
+    out = []
+    for i in range(courses):
+        course = Course()
+        course.subj_area = 'COM SCI'
+        course.ctlg_no = str(i)
+        sections = sectionparser._parse_root_sections(root_resp, course, '20F', fetch_details=False)
+        for section in sections:
+            sectionparser._populate_section_details(section, detail_resp)
+            section.children = sectionparser._parse_leaf_sections(leaf_resp, section, fetch_details=False)
+            for child in section.children:
+                sectionparser._populate_section_details(child, detail_resp)
+        out.append(sections)
+    return out
+
+def main(courses):
+    root_resp = pages.root_sections_page(LECTURES)
+    leaf_resp = pages.leaf_sections_page('100001', LEAVES)
+    detail_resp = pages.section_detail_page('100001')
+    # The fields kept by the parse memo would otherwise be counted with the sections
+    backends.set_parse_memo(None)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    term = _build_term(courses, root_resp, leaf_resp, detail_resp)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    sections = courses * LECTURES * (LEAVES + 1)
+    print('%d sections: %.1f MB, %.0f bytes/section' % (sections, (after - before) / 1e6, (after - before) / sections))
+    return term
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from uclacatalog import api, requesthandler
+from uclacatalog.pipeline import ParsePipeline
+import pages
+import recorded
+
+'''
+Checks that pipeline.ParsePipeline returns the same courses and sections as the threaded api functions on the
+recordings in fixtures/, then compares the time to crawl many subject areas of synthetic catalog pages on threads alone
+against the pipeline with a few worker processes. Every catalog request takes latency seconds to answer.
+
+Parsing on processes only pays off with more than one core: on a single core the pipeline is expected to be slower
+than threads, by the cost of sending every page to a worker.
+
+Usage: python benchmarks/bench_pipeline.py [subject areas] [latency]
+'''
+
+PROCESSES = (1, 2, 4)
+
+class _CatalogTransport:
+    def __init__(self, latency):
+        self.latency = latency
+        self.page = pages.catalog_page('MATH')
+
+    def get(self, url, params=None, headers=None, session=None):
+        time.sleep(self.latency)
+        return recorded.Response(url, 200, self.page.text)
+
+def _dump(sections):
+    return [(s.id, s.enrolled, s.meet_days, s.start_minute, s.restrictions, [_dump(s.children)]) for s in sections]
+
+def _check(recordings):
+    recorded.install(recordings)
+    subj_areas = [recording['subj_area'] for recording in recordings]
+    with ParsePipeline(processes=2) as parse_pipeline:
+        threaded = {result.subj_area: result.courses for result in api.fetch_all_catalogs(subj_areas=subj_areas)}
+        piped = {result.subj_area: result.courses for result in parse_pipeline.iter_catalogs(subj_areas=subj_areas)}
+        assert {s: [c.get_path() for c in courses] for s, courses in threaded.items()} == \
+               {s: [c.get_path() for c in courses] for s, courses in piped.items()}
+
+        for recording in recordings:
+            courses = [c for c in piped[recording['subj_area']] if c.get_path() in recording['courses']]
+            for result in parse_pipeline.iter_sections(courses, recording['term']):
+                assert result.error is None, result.error
+                assert _dump(result.sections) == _dump(api.fetch_sections(result.course, recording['term']))
+    print('pipeline returns the same courses and sections as the threaded crawl')
+
+def _crawl(subj_areas, processes):
+    started = time.perf_counter()
+    results = list(api.fetch_all_catalogs(subj_areas=subj_areas, processes=processes))
+    assert all(result.error is None for result in results)
+    return time.perf_counter() - started
+
+def main(count, latency):
+    api.set_catalog_memo(None)
+    _check(recorded.load())
+
+    requesthandler.set_transport(_CatalogTransport(latency))
+    subj_areas = sorted(api.LEGAL_SA)[:count]
+    print('%d subject areas, %d cores, %.0f ms per request' % (len(subj_areas), os.cpu_count(), latency * 1000))
+    print('%-12s %8.2f s' % ('threads', _crawl(subj_areas, None)))
+    for processes in PROCESSES:
+        print('%-12s %8.2f s' % ('%d processes' % processes, _crawl(subj_areas, processes)))
+    requesthandler.set_transport(None)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 40, float(sys.argv[2]) if len(sys.argv) > 2 else 0.05)
@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from uclacatalog import api, poller, replay, requesthandler
+import recorded
+
+'''
+Watches the sections of every recorded course with poller.EnrollmentPoller, and compares one poll of every course
+against refetching them all with api.fetch_sections, in requests sent and time spent. Between the two polls, one more
+student enrolls in every section that had 112 students, which the second poll must report and nothing else.
+
+Usage: python benchmarks/bench_poller.py [repeats]
+'''
+
+class _CountingTransport:
+    def __init__(self, recordings):
+        self.replayer = replay.Replayer(recordings)
+        self.enrolled = '112 of 200 Enrolled'
+        self.counts = {}
+
+    def get(self, url, params=None, headers=None, session=None):
+        endpoint = replay.endpoint(url, params)
+        self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+        resp = self.replayer.get(url, params, headers, session)
+        return recorded.Response(url, resp.status_code, resp.text.replace('112 of 200 Enrolled', self.enrolled))
+
+    def take_counts(self):
+        counts, self.counts = self.counts, {}
+        return counts
+
+def _watched(recordings):
+    out = []
+    for recording in recordings:
+        for course in api.fetch_catalog(recording['subj_area']):
+            if course.get_path() in recording['courses']:
+                out.append((course, recording['term'], api.fetch_sections(course, recording['term'])))
+    return out
+
+def main(repeats):
+    recordings = recorded.load()
+    transport = _CountingTransport(recordings)
+    requesthandler.set_transport(transport)
+    watched = _watched(recordings)
+    transport.take_counts()
+
+    watcher = poller.EnrollmentPoller(budget=1000000)
+    for course, term, sections in watched:
+        watcher.watch(course, term, sections)
+
+    refetch = min(timeit.repeat(lambda: [api.fetch_sections(course, term) for course, term, _ in watched], number=1, repeat=repeats))
+    refetch_counts = transport.take_counts()
+    poll = min(timeit.repeat(lambda: [watcher.poll(course, term) for course, term, _ in watched], number=1, repeat=repeats))
+    poll_counts = transport.take_counts()
+    print('%d courses, %d sections' % (len(watched), sum(1 + len(s.children) for _, _, sections in watched for s in sections)))
+    print('refetch: %7.2f ms, requests %s' % (refetch * 1000, {k: v // repeats for k, v in sorted(refetch_counts.items())}))
+    print('poll:    %7.2f ms, requests %s' % (poll * 1000, {k: v // repeats for k, v in sorted(poll_counts.items())}))
+
+    before = int(time.time())
+    transport.enrolled = '113 of 200 Enrolled'
+    changes = [change for course, term, _ in watched for change in watcher.poll(course, term)]
+    moved = [s for _, _, sections in watched for root in sections for s in [root] + root.children if s.enrolled == 113]
+    assert len(changes) == len(moved) > 0
+    assert all(change.changes == {'enrolled': (112, 113)} for change in changes)
+    assert all(s.last_updated >= before for _, _, sections in watched for root in sections for s in [root] + root.children)
+    print('second poll reported the %d sections whose enrollment moved, and only those' % len(changes))
+
+    transport.take_counts()
+    watcher = poller.EnrollmentPoller(budget=50, min_interval=0)
+    for course, term, sections in watched:
+        watcher.watch(course, term, sections)
+    started = time.perf_counter()
+    watcher.poll_due()
+    elapsed = time.perf_counter() - started
+    sent = sum(transport.take_counts().values())
+    print('poll_due at a budget of 50 requests/s: %d requests in %.2fs (expected about %.2fs)' % (sent, elapsed, watcher.cycle_time()))
+    requesthandler.set_transport(None)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,79 @@
+import itertools
+import os
+import random
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from uclacatalog import schedule
+from uclacatalog.model import Course, Section
+from uclacatalog.model.section import days_to_mask
+
+'''
+Compares schedule.build_schedules with enumerating every lecture and discussion combination and checking each pair of
+sections for overlaps in pure Python, on course sets shaped like a typical quarter: 4 and 5 courses of 2 to 3 lectures
+with 6 to 12 discussions or labs each.
+
+Usage: python benchmarks/bench_schedule.py [repeats]
+'''
+
+_LECTURE_DAYS = [['M', 'W'], ['T', 'R'], ['M', 'W', 'F']]
+_CHILD_DAYS = [['M'], ['T'], ['W'], ['R'], ['F']]
+
+def _section(days, start_hour, minutes, enrollable):
+    section = Section()
+    section.days = days_to_mask(days)
+    section.start_minute = start_hour * 60
+    section.end_minute = section.start_minute + minutes
+    section.enrollable = enrollable
+    return section
+
+def _course_sections(rng):
+    lectures = []
+    for _ in range(rng.randint(2, 3)):
+        lecture = _section(rng.choice(_LECTURE_DAYS), rng.randint(8, 17), rng.choice((50, 75, 110)), rng.random() < 0.8)
+        lecture.course = Course()
+        lecture.children = [_section(rng.choice(_CHILD_DAYS), rng.randint(8, 18), rng.choice((50, 110)), rng.random() < 0.7)
+                            for _ in range(rng.randint(6, 12))]
+        lectures.append(lecture)
+    return lectures
+
+def _naive(course_sections, k):
+    options = [schedule._course_options(sections, None, None, False) for sections in course_sections]
+    found = []
+    for combination in itertools.product(*options):
+        sections = [section for option in combination for section in option]
+        intervals = [interval for section in sections for interval in schedule._event_intervals(section)]
+        if all(not (a[0] == b[0] and a[1] < b[2] and b[1] < a[2]) for a, b in itertools.combinations(intervals, 2)):
+            found.append(_naive_score(intervals))
+    return sorted(found)[:k]
+
+def _naive_score(intervals):
+    score = 0
+    for day in range(len(schedule.DAYS)):
+        on_day = [interval for interval in intervals if interval[0] == day]
+        if len(on_day) > 0:
+            score += max(end for _, _, end in on_day) - min(start for _, start, _ in on_day) + schedule.DAY_WEIGHT
+    return score
+
+def main(repeats):
+    rng = random.Random(31)
+    for count in (4, 5):
+        course_sections = [_course_sections(rng) for _ in range(count)]
+        combinations = 1
+        for sections in course_sections:
+            combinations *= len(schedule._course_options(sections, None, None, False))
+        # The naive enumeration is timed once, it takes about a minute for 5 courses
+        started = time.perf_counter()
+        naive_scores = _naive(course_sections, 10)
+        naive = time.perf_counter() - started
+        assert [s.score for s in schedule.build_schedules(course_sections, k=10)] == naive_scores
+        engine = min(timeit.repeat(lambda: schedule.build_schedules(course_sections, k=10), number=1, repeat=repeats))
+        constrained = min(timeit.repeat(lambda: schedule.build_schedules(course_sections, k=10, earliest_start=10 * 60, open_only=True), number=1, repeat=repeats))
+        print('%d courses (%7d combinations)  naive: %8.2f ms  engine: %7.2f ms (%.1fx)  10am+ open only: %7.2f ms' % (
+            count, combinations, naive * 1000, engine * 1000, naive / engine, constrained * 1000))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -0,0 +1,41 @@
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from uclacatalog import api, search
+from uclacatalog.parser import catalogparser
+import pages
+
+'''
+Times building a search.SearchIndex from synthetic catalog pages and querying it, against scanning every course's
+title and description for the query's terms.
+
+Usage: python benchmarks/bench_search.py [repeats]
+'''
+
+QUERIES = ['problem solving', 'topics number 42', 'applications theory methods']
+
+def _scan(catalogs, query):
+    terms = search.tokenize(query)
+    return [course for course_list in catalogs for course in course_list
+            if any(term in search.tokenize(course.title + ' ' + course.desc) for term in terms)]
+
+def main(repeats):
+    indexes = {subj_area: catalogparser.parse_index(pages.catalog_page(subj_area), subj_area) for subj_area in pages.SUBJECT_SIZES}
+    catalogs = [index.courses() for index in indexes.values()]
+    with tempfile.TemporaryDirectory() as tmp:
+        index = search.SearchIndex(os.path.join(tmp, 'search.sqlite'))
+        build = timeit.timeit(lambda: [index.index_subject(subj_area, course_index.divisions) for subj_area, course_index in indexes.items()], number=1)
+        print('indexed %d courses in %.2f ms' % (len(index), build * 1000))
+        for query in QUERIES:
+            indexed = min(timeit.repeat(lambda: index.search(query, div=api.UPPER_DIV), number=1, repeat=repeats))
+            scanned = min(timeit.repeat(lambda: _scan(catalogs, query), number=1, repeat=repeats))
+            print('%-30s index: %7.2f ms  scan: %7.2f ms' % (query, indexed * 1000, scanned * 1000))
+        index.close()
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
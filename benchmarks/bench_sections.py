@@ -0,0 +1,86 @@
+from datetime import datetime
+import os
+import re
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from uclacatalog.model import Course, Section
+from uclacatalog.parser import backends, sectionparser
+import pages
+
+'''
+Measures how many sections per second sectionparser turns into Section objects, both from already extracted row
+fields (field extraction only) and from a whole GetCourseSummary page (tree building included). Populating from fields
+is compared against the per-field implementation it replaced, which matched the status column four times, the
+waitlist column twice and the time column three times per row, with patterns compiled on every call.
+The current path also memoizes the parsing of days and times, which accounts for part of the difference.
+
+Usage: python benchmarks/bench_sections.py [repeats]
+'''
+
+ROWS = 200
+
+# The implementation of sectionparser._populate_section before every column was matched once
+def _populate_per_field(section_fields, course, term):
+    section = Section()
+    section.id = section_fields['id'].split('_')[0]
+    section.term = term
+    section.type = sectionparser._parse_type(section_fields)
+    section.waitlistable = _status(section_fields)[0] == 'Waitlist'
+    section.enrollable = _status(section_fields)[0] == 'Open'
+    section.enrolled = _first(re.findall('\\d+', _status(section_fields)[1]))
+    section.enrolled_max = _last(re.findall('\\d+', _status(section_fields)[1]))
+    section.waitlisted = _first(re.findall('\\d+', section_fields['waitlist']))
+    section.waitlisted_max = _last(re.findall('\\d+', section_fields['waitlist']))
+    days = section_fields['time'].split()[0]
+    section.meet_days = [day for day in re.findall('(M+)?(T+)?(W+)?(R+)?(F+)?', days)[0] if day != '']
+    section.start_time = time.mktime(_time(section_fields['time'].split()[1].split('-')[0]).timetuple())
+    section.end_time = time.mktime(_time(section_fields['time'].split()[1].split('-')[1]).timetuple())
+    section.location = section_fields['location'].strip()
+    section.instructors = section_fields['instructors']
+    section.last_updated = int(time.time())
+    section.course = course
+    return section
+
+def _status(section_fields):
+    return re.findall('(Open|Closed|Waitlist)\\D*((\\d+ of \\d+ Enrolled)|(Class Full \\(\\d+\\))?)', section_fields['status'])[0]
+
+def _first(groups):
+    return groups[0] if len(groups) > 0 else 0
+
+def _last(groups):
+    return groups[-1] if len(groups) > 0 else 0
+
+def _time(time_str):
+    return datetime.strptime(time_str, '%I:%M%p' if ':' in time_str else '%I%p').replace(year=1970)
+
+def main(repeats):
+    # Every page is parsed again on every repeat, which the parse memo would skip
+    backends.set_parse_memo(None)
+    course = Course()
+    course.subj_area = 'COM SCI'
+    course.ctlg_no = '31'
+    resp = pages.leaf_sections_page('100001', ROWS)
+    rows = backends.get_backend().parse_sections(resp.text)
+
+    before = [_populate_per_field(row, course, '20F') for row in rows]
+    after = [sectionparser._populate_section(row, course, '20F') for row in rows]
+    for old, new in zip(before, after):
+        assert (old.id, old.days, old.start_minute, old.end_minute, old.waitlistable) == (new.id, new.days, new.start_minute, new.end_minute, new.waitlistable)
+        assert (int(old.enrolled), int(old.enrolled_max), int(old.waitlisted)) == (new.enrolled, new.enrolled_max, new.waitlisted)
+
+    per_field = min(timeit.repeat(lambda: [_populate_per_field(row, course, '20F') for row in rows], number=1, repeat=repeats))
+    populate = min(timeit.repeat(lambda: [sectionparser._populate_section(row, course, '20F') for row in rows], number=1, repeat=repeats))
+    print('populate from fields, per field:  %9.0f sections/s' % (ROWS / per_field))
+    print('populate from fields, single pass: %9.0f sections/s (%.2fx)' % (ROWS / populate, per_field / populate))
+    for backend in ('bs4', 'lxml'):
+        backends.set_backend(backend)
+        page = min(timeit.repeat(lambda: sectionparser._parse_root_sections(resp, course, '20F', fetch_details=False), number=1, repeat=repeats))
+        print('parse page (%s): %11.0f sections/s' % (backend, ROWS / page))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,87 @@
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from uclacatalog import snapshot
+from uclacatalog.model import Course
+from uclacatalog.parser import catalogparser
+import pages
+
+'''
+Snapshots the synthetic catalogs of every subject area in pages.SUBJECT_SIZES, then changes a handful of courses and
+compares updating the snapshot with rewriting every course, as a nightly job that does not diff would. Also checks that
+the diff reports exactly the courses that were changed.
+
+Usage: python benchmarks/bench_snapshot.py [repeats]
+'''
+
+def _catalogs():
+    return {subj_area: catalogparser.parse_index(pages.catalog_page(subj_area), subj_area).courses()
+            for subj_area in pages.SUBJECT_SIZES}
+
+def _copy(course):
+    out = Course()
+    for name in ('subj_area', 'ctlg_no', 'seq_no', 'title', 'desc', 'units', 'is_concurrent', 'is_multi_listed'):
+        setattr(out, name, getattr(course, name))
+    return out
+
+# Retitles the first course, changes the units of the second, drops the third and adds a new one
+def _change(courses):
+    out = [_copy(course) for course in courses]
+    out[0].title = 'Renamed Topics'
+    out[1].units = '2.0'
+    removed = out.pop(2)
+    added = _copy(out[0])
+    added.ctlg_no = '999'
+    out.append(added)
+    return out, removed, added
+
+def _update(catalog_snapshot, catalogs):
+    for subj_area, courses in catalogs.items():
+        catalog_snapshot.update(subj_area, courses)
+
+def _rewrite(catalog_snapshot, catalogs):
+    for subj_area, courses in catalogs.items():
+        catalog_snapshot.remove_subject(subj_area)
+        catalog_snapshot.update(subj_area, courses)
+
+def main(repeats):
+    catalogs = _catalogs()
+    changed = {}
+    for subj_area, courses in catalogs.items():
+        changed[subj_area] = _change(courses)[0] if len(courses) > 2 else courses
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'snapshot.sqlite')
+        catalog_snapshot = snapshot.CatalogSnapshot(path)
+        for subj_area, courses in catalogs.items():
+            assert len(catalog_snapshot.update(subj_area, courses).added) == len(courses)
+
+        courses = catalogs['MATH']
+        new_courses, removed, added = _change(courses)
+        catalog_diff = catalog_snapshot.diff('MATH', new_courses)
+        assert [snapshot.course_key(c) for c in catalog_diff.added] == [snapshot.course_key(added)]
+        assert [snapshot.course_key(c) for c in catalog_diff.removed] == [snapshot.course_key(removed)]
+        assert [change.changes for change in catalog_diff.modified] == [
+            {'title': (courses[0].title, 'Renamed Topics')}, {'units': (courses[1].units, '2.0')}]
+        assert len(snapshot.diff_courses('MATH', courses, new_courses)) == len(catalog_diff)
+        print('diff reports the 1 added, 1 removed and 2 modified courses, and only those')
+
+        count = sum(len(courses) for courses in catalogs.values())
+        print('%d courses in %d subject areas, snapshot of %.0f KB' % (count, len(catalogs), os.path.getsize(path) / 1024))
+        unchanged = min(timeit.repeat(lambda: _update(catalog_snapshot, catalogs), number=1, repeat=repeats))
+        print('update, nothing changed:   %7.2f ms' % (unchanged * 1000))
+        # Alternates between the two versions, so that every update has the same changes to write
+        versions = [changed, catalogs]
+        update = min(timeit.timeit(lambda: _update(catalog_snapshot, versions[i % 2]), number=1) for i in range(repeats * 2))
+        rewrite = min(timeit.repeat(lambda: _rewrite(catalog_snapshot, changed), number=1, repeat=repeats))
+        print('update, 4 changes/subject: %7.2f ms' % (update * 1000))
+        print('rewrite every course:      %7.2f ms' % (rewrite * 1000))
+        catalog_snapshot.close()
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,81 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from uclacatalog import api, replay, requesthandler
+import pages
+import recorded
+
+'''
+Regenerates the recordings in fixtures/ by running the library against a stand-in for the registrar built from
+pages.py, and saving every response it was sent.
+
+Subject areas cover a small department (AERO ST, with an empty graduate division), large ones (MATH, COM SCI) and an
+edge case (LAW, whose page lists no courses at all). The sections of the first courses of each subject area follow
+SECTION_PLANS, which include a course that is not offered, lectures without discussions, and details without a final
+or enrollment restrictions.
+
+Usage: python benchmarks/make_fixtures.py
+'''
+
+TERM = '20F'
+SUBJECT_AREAS = {
+    'AERO ST': 'small',
+    'MATH': 'large',
+    'COM SCI': 'large',
+    'LAW': 'edge'
+}
+# (lectures, discussions or labs per lecture) of the first courses of every subject area. 0 lectures is a course
+# that is not offered in the term.
+SECTION_PLANS = [(3, 10), (2, 8), (1, 0), (0, 0), (1, 4)]
+
+class _Registrar:
+    def __init__(self):
+        self.plans = {}
+
+    def get(self, url, params=None, headers=None, session=None):
+        return requesthandler.Response(url, 200, self._page(url, params, headers or {}).text)
+
+    def _page(self, url, params, headers):
+        if 'SA' in params:
+            return pages.catalog_page(params['SA'])
+        if 'model' in params:
+            model = json.loads(params['model'])
+            if model['IsRoot']:
+                lectures = self.plans[model['Path']][0]
+                return pages.root_sections_page(lectures) if lectures > 0 else pages.no_sections_page()
+            parent_id, course_path = model['Path'].split('_', 1)
+            return pages.leaf_sections_page(parent_id, self.plans[course_path][1])
+        if headers.get('X-Requested-With') != 'XMLHttpRequest':
+            return requesthandler.Response(url, 200, '<html><body><h1>Not found</h1></body></html>')
+        # Every fourth section has neither enrollment restrictions nor a final
+        listed = int(params['class_id']) % 4 != 3
+        return pages.section_detail_page(params['class_id'], restrictions=listed, final=listed)
+
+def main():
+    api.set_catalog_memo(None)
+    for subj_area, size in SUBJECT_AREAS.items():
+        registrar = _Registrar()
+        recorder = replay.Recorder(registrar)
+        requesthandler.set_transport(recorder)
+        courses = api.fetch_catalog(subj_area)[:len(SECTION_PLANS)]
+        for course, plan in zip(courses, SECTION_PLANS):
+            registrar.plans[course.get_path()] = plan
+            api.fetch_sections(course, TERM)
+        recording = {
+            'subj_area': subj_area,
+            'size': size,
+            'term': TERM,
+            'courses': [course.get_path() for course in courses],
+            'responses': recorder.responses()
+        }
+        path = os.path.join(recorded.FIXTURES_DIR, subj_area.replace(' ', '') + '.json')
+        with open(path, 'w') as f:
+            json.dump(recording, f, indent=1, sort_keys=True)
+        print('%-8s %3d responses -> %s' % (subj_area, len(recorder), os.path.relpath(path)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+'''
+Builds HTML shaped like the UCLA Registrar's pages, for benchmarking the parsers without network access.
+
+Only the elements and attributes read by the parsers are reproduced, padded with the kind of markup the real pages
+surround them with so that tree building costs are comparable.
+'''
+
+from uclacatalog import requesthandler
+
+# Rough number of courses listed per division for some of the largest subject areas
+SUBJECT_SIZES = {
+    'MATH': (60, 120, 150),
+    'COM SCI': (40, 130, 120),
+    'ENGL': (30, 110, 80),
+    'AERO ST': (6, 3, 0),
+    'LAW': (0, 0, 0)
+}
+
+def _response(text):
+    return requesthandler.Response('', 200, text)
+
+_PREFIXES = ['', 'C', 'M', 'CM', '', '']
+_SEQUENCES = ['', 'A', 'B', 'C', '', 'SL']
+
+def _course_html(number, i):
+    head = '%s%d%s. Topics in Subject Number %d' % (_PREFIXES[i % len(_PREFIXES)], number, _SEQUENCES[i % len(_SEQUENCES)], i)
+    return (
+        '<li class="media"><div class="media-left"><a href="#"><img src="/icon.png" alt=""/></a></div>'
+        '<div class="media-body"><h3>%s</h3><p>Units: 4.0</p>'
+        '<p>Lecture, three hours; discussion, one hour. Requisite: course %d. Introduction to methods, '
+        'theory and applications of the subject with emphasis on problem solving. P/NP or letter grading.</p>'
+        '</div></li>'
+    ) % (head, number - 1)
+
+def catalog_page(subj_area):
+    out = ['<html><head><title>Course Descriptions</title></head><body><div class="container"><nav><ul>']
+    out.extend('<li><a href="/link%d">Link %d</a></li>' % (i, i) for i in range(200))
+    out.append('</ul></nav>')
+    for div, base, count in zip(('lower', 'upper', 'graduate'), (1, 100, 200), SUBJECT_SIZES[subj_area]):
+        out.append('<div id="%s"><ul class="media-list">' % div)
+        out.extend(_course_html(base + i % 99, i) for i in range(count))
+        out.append('</ul></div>')
+    out.append('</div></body></html>')
+    return _response(''.join(out))
+
+_STATUSES = ['Open: 112 of 200 Enrolled', 'Closed: Class Full (150)', 'Waitlist: Class Full (80)', 'Open: 18 of 30 Enrolled']
+_WAITLISTS = ['0 of 10 Taken', 'No Waitlist', '5 of 30 Taken', 'Waitlist Full (20)']
+
+def _section_row_html(section_id, kind, number, i, days, times):
+    return (
+        '<div class="row-fluid data_row primary-row class-info class-not-checked">'
+        '<div id="%s_COMSCI0031" class="row-fluid">'
+        '<div class="checkboxColumn"><input type="checkbox" aria-label="Select"/></div>'
+        '<div class="sectionColumn"><p><a href="#" title="Class Detail">%s %d</a></p><div class="hide-above-small">%s %d</div></div>'
+        '<div class="statusColumn"><p><i class="icon-ok"></i>%s</p></div>'
+        '<div class="waitlistColumn"><p>%s</p></div>'
+        '<div class="infoColumn"><p></p></div>'
+        '<div class="dayColumn hide-small"></div>'
+        '<div class="timeColumn"><p>%s<br/>\n%s</p></div>'
+        '<div class="locationColumn"><p>Boelter Hall %d</p></div>'
+        '<div class="unitsColumn"><p>4.0</p></div>'
+        '<div class="instructorColumn"><p>Instructor, A.<br/>Assistant %d, B.</p></div>'
+        '</div></div>'
+    ) % (section_id, kind, number, kind, number, _STATUSES[i % len(_STATUSES)], _WAITLISTS[i % len(_WAITLISTS)], days, times, 3400 + i, i)
+
+# A GetCourseSummary response listing count lecture sections
+def root_sections_page(count=3):
+    rows = ''.join(_section_row_html('1%05d' % i, 'Lec', i + 1, i, 'MWF', '10am-10:50am') for i in range(count))
+    return _response('<div class="results"><div id="187006200-children" class="primarySection-children">%s</div></div>' % rows)
+
+# A GetCourseSummary response listing the count discussion and lab sections of the lecture with parent_id
+def leaf_sections_page(parent_id, count=10):
+    rows = ''.join(_section_row_html('%s%02d' % (parent_id, i), ('Dis', 'Lab')[i % 2], i + 1, i, ('T', 'R', 'MW')[i % 3], ('9am-9:50am', '2pm-3:50pm', '12:30pm-1:45pm')[i % 3]) for i in range(count))
+    return _response('<div id="%s-children" class="secondarySection-children">%s</div>' % (parent_id, rows))
+
+# A GetCourseSummary response for a course that is not offered in the term
+def no_sections_page():
+    return _response('<div class="results"><p>No classes are scheduled for this subject area this quarter.</p></div>')
+
+_RESTRICTIONS = '<div class="enrollment_restrictions_content"><p> Restricted to Computer Science majors. </p></div>'
+_FINAL = '<div>12/12/2020</div><div>Saturday</div><div>Dec 12</div><div>Sat</div><div>11:30am-2:30pm</div><div>Royce Hall 100</div>'
+_NO_FINAL = '<div>None listed</div>'
+
+# A ClassDetailTooltip response, optionally without enrollment restrictions or a final
+def section_detail_page(section_id, restrictions=True, final=True):
+    return _response(
+        '<div class="class_detail_tooltip">' +
+        (_RESTRICTIONS if restrictions else '') +
+        '<div class="grade_type_content">'
+        '<p><span class="grade_type_content_label">Units</span><span class="grade_type_content_text">4.0</span></p>'
+        '<p><span class="grade_type_content_label">Class Webpage</span><span class="grade_type_content_text"> http://web.cs.ucla.edu/classes/%s </span></p>' % section_id +
+        '<p><span class="grade_type_content_label">Grading</span><span class="grade_type_content_text"> Letter grade </span></p>'
+        '</div>'
+        '<div class="final_exam_content"><div class="data-row">' + (_FINAL if final else _NO_FINAL) + '</div></div>'
+        '<div class="class_notes_content"><ul><li> Students must enroll in a discussion section. </li><li>Consult the department for more information.</li></ul></div>'
+        '</div>'
+    )
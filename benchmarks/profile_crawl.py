@@ -0,0 +1,35 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from uclacatalog import api, instrument
+from uclacatalog.parser import backends
+import recorded
+
+'''
+Replays the recordings in fixtures/ with an instrument.HistogramHook installed, and prints where the time of the
+crawl went: requests per endpoint, tree building and each extraction stage.
+
+Usage: python benchmarks/profile_crawl.py [backend]
+'''
+
+def main(backend):
+    backends.set_backend(backend)
+    recordings = recorded.load()
+    recorded.install(recordings)
+    api.set_catalog_memo(None)
+    backends.set_parse_memo(None)
+
+    histogram = instrument.HistogramHook()
+    instrument.set_hook(histogram)
+    for recording in recordings:
+        for course in api.fetch_catalog(recording['subj_area']):
+            if course.get_path() in recording['courses']:
+                api.fetch_sections(course, recording['term'])
+    instrument.set_hook(None)
+    print(histogram.report())
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else 'lxml')
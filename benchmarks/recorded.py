@@ -0,0 +1,47 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+from uclacatalog import api, replay, requesthandler
+
+'''
+Recorded registrar responses, for running the library end to end without network access.
+
+Each file in fixtures/ is a recording (see uclacatalog/replay.py) of every response the library received while
+crawling one subject area and the sections of some of its courses, with a few more keys:
+
+    {
+        "subj_area": "MATH",
+        "size": "large",                    // small, large or edge
+        "term": "20F",
+        "courses": ["MATH0001", ...],       // paths of the courses whose sections were recorded
+        "responses": [{"endpoint": "courses", "url": ..., "params": {...}, "status": 200, "body": "<html>..."}, ...]
+    }
+
+The fixtures are regenerated with make_fixtures.py.
+'''
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+Response = requesthandler.Response
+
+# Returns the recordings in fixtures/, sorted by subject area
+def load(fixtures_dir=FIXTURES_DIR):
+    return replay.load([fixtures_dir])
+
+# Answers every request of the library with its recorded response
+def install(recordings):
+    requesthandler.set_transport(replay.Replayer(recordings))
+
+# The fields of sections that a crawl is compared on
+def dump(sections):
+    return [(s.id, s.enrolled, s.meet_days, s.start_minute, s.restrictions, [dump(s.children)]) for s in sections]
+
+# Fetches the sections of every recorded course, on max_workers threads, and returns their dump by course path
+def crawl(recordings, max_workers=8):
+    out = {}
+    for recording in recordings:
+        courses = [c for c in api.fetch_catalog(recording['subj_area']) if c.get_path() in recording['courses']]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(lambda course: api.fetch_sections(course, recording['term'], max_workers=4), courses)
+            for course, sections in zip(courses, results):
+                out[course.get_path()] = dump(sections)
+    return out
@@ -0,0 +1,195 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from uclacatalog import api, requesthandler
+from uclacatalog.model import Course, Section
+from uclacatalog.parser import backends, catalogparser, sectionparser
+import recorded
+
+'''
+Runs every benchmark against the recorded responses in fixtures/, without network access, and writes the results as
+JSON so that they can be compared between versions.
+
+- parse.*:      throughput of catalogparser and sectionparser on the recorded pages, with each parser backend
+- alloc.*:      peak and retained memory of api.fetch_catalog and api.fetch_sections, from tracemalloc (which only
+                sees Python allocations, not the memory of lxml's trees)
+- latency.*:    end to end latency of api.fetch_catalog and api.fetch_sections, with the replayed responses standing in
+                for the network and the catalog memo disabled
+
+Every metric records whether higher or lower is better. When --compare is given, metrics that got worse by more than
+--threshold (10% by default) are listed and the script exits with status 1.
+
+Usage: python benchmarks/run_suite.py [--repeats N] [--output results.json] [--compare baseline.json] [--threshold 0.1]
+'''
+
+BACKENDS = ('lxml', 'bs4')
+
+class _Results:
+    def __init__(self):
+        self.metrics = {}
+
+    def add(self, name, value, unit, better):
+        self.metrics[name] = {'value': value, 'unit': unit, 'better': better}
+        print('%-48s %14.2f %s' % (name, value, unit))
+
+def _bodies(recording, endpoint):
+    return [requesthandler.Response(entry['url'], entry['status'], entry['body'])
+            for entry in recording['responses'] if entry['endpoint'] == endpoint]
+
+def _best(func, repeats):
+    return min(timeit.repeat(func, number=1, repeat=repeats))
+
+def bench_parsing(results, recordings, repeats):
+    course = Course()
+    course.subj_area = 'COM SCI'
+    course.ctlg_no = '31'
+    summaries = [resp for recording in recordings for endpoint in ('root_sections', 'leaf_sections') for resp in _bodies(recording, endpoint)]
+    details = [resp for recording in recordings for resp in _bodies(recording, 'section_detail')]
+    for backend in BACKENDS:
+        backends.set_backend(backend)
+        for recording in recordings:
+            resp = _bodies(recording, 'courses')[0]
+            count = len(catalogparser.parse_catalog(resp, recording['subj_area'], api.ALL_DIV))
+            elapsed = _best(lambda: catalogparser.parse_catalog(resp, recording['subj_area'], api.ALL_DIV), repeats)
+            name = 'parse.catalog.%s.%s' % (recording['subj_area'].replace(' ', ''), backend)
+            results.add(name + '.ms', elapsed * 1000, 'ms', 'lower')
+            if count > 0:
+                results.add(name + '.courses_per_sec', count / elapsed, 'courses/s', 'higher')
+
+        count = sum(len(sectionparser._parse_root_sections(resp, course, '20F', fetch_details=False)) for resp in summaries)
+        elapsed = _best(lambda: [sectionparser._parse_root_sections(resp, course, '20F', fetch_details=False) for resp in summaries], repeats)
+        results.add('parse.sections.%s.sections_per_sec' % backend, count / elapsed, 'sections/s', 'higher')
+
+        elapsed = _best(lambda: [sectionparser._populate_section_details(Section(), resp) for resp in details], repeats)
+        results.add('parse.details.%s.details_per_sec' % backend, len(details) / elapsed, 'details/s', 'higher')
+    backends.set_backend('lxml')
+
+def _courses(recording):
+    courses = api.fetch_catalog(recording['subj_area'])
+    return [course for course in courses if course.get_path() in recording['courses']]
+
+# Returns (peak bytes, retained bytes) of func, keeping its result alive until the retained bytes are measured
+def _allocations(func):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak - before, current - before
+
+def bench_allocations(results, recordings):
+    for recording in recordings:
+        subj_area = recording['subj_area']
+        name = subj_area.replace(' ', '')
+        peak, retained = _allocations(lambda: api.fetch_catalog(subj_area))
+        results.add('alloc.fetch_catalog.%s.peak_kb' % name, peak / 1024, 'KiB', 'lower')
+        results.add('alloc.fetch_catalog.%s.retained_kb' % name, retained / 1024, 'KiB', 'lower')
+        courses = _courses(recording)
+        if len(courses) > 0:
+            peak, retained = _allocations(lambda: [api.fetch_sections(course, recording['term']) for course in courses])
+            results.add('alloc.fetch_sections.%s.peak_kb' % name, peak / 1024, 'KiB', 'lower')
+            results.add('alloc.fetch_sections.%s.retained_kb' % name, retained / 1024, 'KiB', 'lower')
+
+def _latencies(func, repeats):
+    out = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        out.append((time.perf_counter() - started) * 1000)
+    return out
+
+def _p95(samples):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+
+def bench_latency(results, recordings, repeats):
+    for recording in recordings:
+        subj_area = recording['subj_area']
+        name = subj_area.replace(' ', '')
+        samples = _latencies(lambda: api.fetch_catalog(subj_area), repeats)
+        results.add('latency.fetch_catalog.%s.median_ms' % name, statistics.median(samples), 'ms', 'lower')
+        results.add('latency.fetch_catalog.%s.p95_ms' % name, _p95(samples), 'ms', 'lower')
+        samples = []
+        for course in _courses(recording):
+            samples.extend(_latencies(lambda: api.fetch_sections(course, recording['term']), repeats))
+        if len(samples) > 0:
+            results.add('latency.fetch_sections.%s.median_ms' % name, statistics.median(samples), 'ms', 'lower')
+            results.add('latency.fetch_sections.%s.p95_ms' % name, _p95(samples), 'ms', 'lower')
+
+def _meta():
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        revision = ''
+    return {
+        'revision': revision,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+
+# Returns the names of the metrics of results that are worse than in baseline by more than threshold
+def compare(baseline, results, threshold):
+    regressions = []
+    for name, metric in sorted(results['metrics'].items()):
+        if name not in baseline['metrics']:
+            continue
+        before = baseline['metrics'][name]['value']
+        after = metric['value']
+        if before == 0:
+            continue
+        change = (after - before) / before
+        worse = change < -threshold if metric['better'] == 'higher' else change > threshold
+        print('%-48s %+7.1f%%%s' % (name, change * 100, '  REGRESSION' if worse else ''))
+        if worse:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmarks against recorded registrar responses')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--compare')
+    parser.add_argument('--threshold', type=float, default=0.1)
+    args = parser.parse_args()
+
+    recordings = recorded.load()
+    recorded.install(recordings)
+    api.set_catalog_memo(None)
+    backends.set_parse_memo(None)
+
+    results = _Results()
+    bench_parsing(results, recordings, args.repeats)
+    bench_allocations(results, recordings)
+    bench_latency(results, recordings, args.repeats)
+
+    output = {'meta': _meta(), 'metrics': results.metrics}
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=2, sort_keys=True)
+    print('results written to ' + args.output)
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), output, args.threshold)
+        if len(regressions) > 0:
+            print('%d metrics regressed by more than %.0f%%' % (len(regressions), args.threshold * 100))
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
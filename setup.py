@@ -21,5 +21,6 @@ setuptools.setup(
         "Topic :: Internet :: WWW/HTTP :: Indexing/Search"
     ],
     install_requires=['beautifulsoup4', 'lxml', 'requests'],
+    extras_require={'async': ['aiohttp'], 'schedule': ['numpy']},
     python_requires='>=3.6',
 )
\ No newline at end of file
@@ -0,0 +1,44 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+
+import pytest
+from uclacatalog import api, instrument, requesthandler, server
+from uclacatalog.parser import backends
+import recorded
+
+'''
+Tests run against the recordings in benchmarks/fixtures/ and the generated pages of benchmarks/pages.py, never the
+registrar itself. Every fixture puts back the library's global settings it changed.
+'''
+
+@pytest.fixture
+def recordings():
+    return recorded.load()
+
+# The recordings served over HTTP by server.StandInServer, with the catalog memo disabled so every call makes requests
+@pytest.fixture
+def stand_in(recordings):
+    catalog_memo = api.get_catalog_memo()
+    api.set_catalog_memo(None)
+    with server.StandInServer(recordings) as stand_in:
+        requesthandler.configure(registrar_url=stand_in.url, soc_url=stand_in.url)
+        yield stand_in
+    requesthandler.configure(registrar_url=requesthandler.DEFAULT_REGISTRAR_URL, soc_url=requesthandler.DEFAULT_SOC_URL)
+    api.set_catalog_memo(catalog_memo)
+
+@pytest.fixture
+def histogram():
+    hook = instrument.HistogramHook()
+    instrument.set_hook(hook)
+    yield hook
+    instrument.set_hook(None)
+
+# Puts back the parser backend selected before the test
+@pytest.fixture
+def backend():
+    previous = backends.get_backend()
+    yield
+    backends.set_backend(previous)
@@ -0,0 +1,58 @@
+import asyncio
+import threading
+import pytest
+from uclacatalog import aio, api, cache, replay, requesthandler
+
+pytest.importorskip('aiohttp')
+
+def _first_recorded_course(recording, courses):
+    return next(course for course in courses if course.get_path() in recording['courses'])
+
+# Every request made through aio reaches the hook, with the size of its body
+def test_hook_sees_aio_requests(recordings, stand_in, histogram):
+    recording = next(recording for recording in recordings if recording['subj_area'] == 'MATH')
+
+    async def crawl():
+        async with aio.open_session() as session:
+            courses = await aio.fetch_catalog('MATH', session=session)
+            return courses, await aio.fetch_sections(_first_recorded_course(recording, courses), recording['term'], session)
+
+    courses, sections = asyncio.run(crawl())
+    assert len(courses) > 0 and len(sections) > 0
+    requests = histogram.summary()['requests']
+    for endpoint in (cache.COURSES, cache.ROOT_SECTIONS, cache.LEAF_SECTIONS, cache.SECTION_DETAIL):
+        assert requests[endpoint]['count'] > 0
+        assert requests[endpoint]['bytes'] > 0
+        assert requests[endpoint]['statuses'] == {200: requests[endpoint]['count']}
+
+class _ThreadRecordingReplayer(replay.Replayer):
+    def __init__(self, recordings):
+        super().__init__(recordings)
+        self.threads = set()
+
+    def get(self, url, params=None, headers=None, session=None):
+        self.threads.add(threading.get_ident())
+        return super().get(url, params, headers, session)
+
+# Transports and the response cache block, so they must not run on the event loop's thread
+def test_blocking_calls_run_off_the_loop(recordings, tmp_path):
+    transport = _ThreadRecordingReplayer(recordings)
+    response_cache = cache.ResponseCache(str(tmp_path / 'cache.sqlite'))
+    catalog_memo = api.get_catalog_memo()
+    api.set_catalog_memo(None)
+    requesthandler.set_transport(transport)
+    requesthandler.set_cache(response_cache)
+    try:
+        async def crawl():
+            async with aio.open_session() as session:
+                first = await aio.fetch_catalog('MATH', session=session)
+                second = await aio.fetch_catalog('MATH', session=session)
+                return threading.get_ident(), first, second
+        loop_thread, first, second = asyncio.run(crawl())
+    finally:
+        requesthandler.set_transport(None)
+        requesthandler.set_cache(None)
+        api.set_catalog_memo(catalog_memo)
+        response_cache.close()
+    assert len(first) == len(second) > 0
+    assert len(transport.threads) > 0 and loop_thread not in transport.threads
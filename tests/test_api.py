@@ -0,0 +1,94 @@
+import pytest
+from uclacatalog import api, cache, requesthandler
+from uclacatalog.memo import CatalogMemo, ParseMemo
+from uclacatalog.model.slots import slot_dict
+from uclacatalog.parser import backends
+import recorded
+
+# With the catalog memo disabled, every call returns courses of its own, even when the page's fields are memoized
+def test_matching_courses_are_not_shared(stand_in):
+    parse_memo = backends.get_parse_memo()
+    backends.set_parse_memo(ParseMemo())
+    try:
+        ctlg_no = api.fetch_catalog('MATH')[0].ctlg_no
+        first = api.fetch_matching_courses('MATH', ctlg_no)
+        first[0].title = 'Modified'
+        second = api.fetch_matching_courses('MATH', ctlg_no)
+        assert backends.get_parse_memo().stats()['hits'] > 0
+    finally:
+        backends.set_parse_memo(parse_memo)
+    assert len(second) == len(first) > 0
+    assert all(a is not b for a, b in zip(first, second))
+    assert second[0].title != 'Modified'
+
+def test_iter_catalog_rejects_illegal_subject_right_away():
+    with pytest.raises(ValueError):
+        api.iter_catalog('NOT A SUBJECT')
+
+def test_iter_catalog_matches_fetch_catalog(stand_in):
+    assert [str(course) for course in api.iter_catalog('MATH')] == [str(course) for course in api.fetch_catalog('MATH')]
+
+# The catalog memo saves the request, but every call still gets courses of its own
+def test_memoized_courses_are_copies(stand_in):
+    api.set_catalog_memo(CatalogMemo())
+    first = api.fetch_catalog('MATH')
+    first[0].title = 'Modified'
+    second = api.fetch_catalog('MATH')
+    matching = api.fetch_matching_courses('MATH', second[0].ctlg_no)
+    assert stand_in.stats[cache.COURSES]['requests'] == 1
+    assert all(a is not b for a, b in zip(first, second))
+    assert second[0].title != 'Modified'
+    assert all(course is not second[0] for course in matching)
+
+# The fields of sections and their children, details included, leaving out the time they were fetched
+def _dump(sections):
+    out = []
+    for section in sections:
+        fields = slot_dict(section)
+        del fields['course'], fields['children'], fields['last_updated']
+        details = [getattr(section, name) for name in ('restrictions', 'webpage', 'grade_type', 'notes')]
+        final = None if section.final is None else slot_dict(section.final)
+        out.append((section.course.get_path(), fields, details, final, _dump(section.children)))
+    return out
+
+def _recorded_courses(recordings):
+    for recording in recordings:
+        for course in api.fetch_catalog(recording['subj_area']):
+            if course.get_path() in recording['courses']:
+                yield course, recording['term']
+
+@pytest.fixture
+def replayed(recordings):
+    catalog_memo = api.get_catalog_memo()
+    api.set_catalog_memo(None)
+    recorded.install(recordings)
+    yield
+    requesthandler.set_transport(None)
+    api.set_catalog_memo(catalog_memo)
+
+# Requests made on several threads build the same sections, in the same order, as the serial path
+def test_concurrent_sections_match_serial(recordings, replayed):
+    compared = 0
+    for course, term in _recorded_courses(recordings):
+        serial = api.fetch_sections(course, term)
+        assert _dump(api.fetch_sections(course, term, max_workers=4)) == _dump(serial)
+        compared += len(serial)
+    assert compared > 0
+
+def _detail_requests(histogram):
+    return histogram.summary()['requests'].get(cache.SECTION_DETAIL, {'count': 0})['count']
+
+# Lazy sections request their details on first access only, and end up with the same fields as eager ones
+def test_lazy_details_match_eager(recordings, replayed, histogram):
+    compared = 0
+    for course, term in _recorded_courses(recordings):
+        eager = api.fetch_sections(course, term)
+        histogram.reset()
+        lazy = api.fetch_sections(course, term, lazy_details=True)
+        assert _detail_requests(histogram) == 0
+        if len(lazy) > 0:
+            assert lazy[0].webpage == eager[0].webpage
+            assert _detail_requests(histogram) > 0
+        assert _dump(lazy) == _dump(eager)
+        compared += len(eager)
+    assert compared > 0
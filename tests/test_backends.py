@@ -0,0 +1,87 @@
+import pytest
+from uclacatalog import api, requesthandler
+from uclacatalog.model import Course, Section
+from uclacatalog.model.slots import slot_dict
+from uclacatalog.parser import backends, catalogparser, sectionparser
+import pages
+import recorded
+
+'''
+Every parser backend must build the same models out of the same pages: the recordings in benchmarks/fixtures/, and
+generated pages for the cases the recordings may not cover.
+'''
+
+RECORDINGS = recorded.load()
+BACKENDS = sorted(backends._BACKENDS)
+
+# The fields of models, with sections' courses replaced by their path and the time of the fetch left out
+def _plain(model):
+    if isinstance(model, list):
+        return [_plain(m) for m in model]
+    fields = slot_dict(model)
+    if isinstance(model, Section):
+        for name in ('restrictions', 'webpage', 'grade_type', 'notes'):
+            fields[name] = getattr(model, name)
+        fields['final'] = None if model.final is None else slot_dict(model.final)
+        fields['course'] = model.course.get_path()
+        fields['children'] = _plain(model.children)
+        del fields['last_updated']
+    return fields
+
+def _per_backend(build):
+    out = {}
+    for name in BACKENDS:
+        backends.set_backend(name)
+        out[name] = _plain(build())
+    return out
+
+def _assert_agree(models):
+    for name in BACKENDS[1:]:
+        assert models[name] == models[BACKENDS[0]], name + ' and ' + BACKENDS[0] + ' disagree'
+
+def _course(subj_area, ctlg_no):
+    course = Course()
+    course.subj_area = subj_area
+    course.ctlg_no = ctlg_no
+    return course
+
+@pytest.mark.parametrize('recording', RECORDINGS, ids=[recording['subj_area'] for recording in RECORDINGS])
+def test_recordings(recording, backend):
+    catalog_memo = api.get_catalog_memo()
+    api.set_catalog_memo(None)
+    recorded.install([recording])
+    try:
+        def crawl():
+            courses = api.fetch_catalog(recording['subj_area'])
+            sections = [api.fetch_sections(course, recording['term']) for course in courses
+                        if course.get_path() in recording['courses']]
+            return courses + sections
+        models = _per_backend(crawl)
+    finally:
+        requesthandler.set_transport(None)
+        api.set_catalog_memo(catalog_memo)
+    _assert_agree(models)
+
+def test_missing_division(backend):
+    resp = pages.catalog_page('AERO ST')
+    resp.text = resp.text.replace('<div id="graduate">', '<div>')
+    models = _per_backend(lambda: catalogparser.parse_catalog(resp, 'AERO ST', api.ALL_DIV))
+    _assert_agree(models)
+    assert len(models[BACKENDS[0]]) == sum(pages.SUBJECT_SIZES['AERO ST'])
+
+def test_no_sections(backend):
+    course = _course('MATH', '31')
+    models = _per_backend(lambda: sectionparser._parse_root_sections(pages.no_sections_page(), course, '20F', fetch_details=False))
+    _assert_agree(models)
+    assert models[BACKENDS[0]] == []
+
+@pytest.mark.parametrize('restrictions, final', [(False, True), (True, False), (False, False)])
+def test_detail_without_restrictions_or_final(restrictions, final, backend):
+    course = _course('MATH', '31')
+    def build():
+        section = sectionparser._parse_root_sections(pages.root_sections_page(1), course, '20F', fetch_details=False)[0]
+        sectionparser._populate_section_details(section, pages.section_detail_page(section.id, restrictions, final))
+        return section
+    models = _per_backend(build)
+    _assert_agree(models)
+    assert (models[BACKENDS[0]]['final'] is None) != final
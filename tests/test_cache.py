@@ -0,0 +1,52 @@
+from uclacatalog import cache
+from uclacatalog.requesthandler import Response
+
+def _response(n):
+    return Response('https://sa.ucla.edu/' + str(n), 200, 'body ' + str(n), {'Content-Type': 'text/html'})
+
+def _put(response_cache, n):
+    response_cache.put(cache.COURSES, 'https://sa.ucla.edu/' + str(n), {}, _response(n))
+
+def _get(response_cache, n):
+    return response_cache.get(cache.COURSES, 'https://sa.ucla.edu/' + str(n), {})
+
+# A hit is served without writing to the file, and its access time still decides what is evicted
+def test_hits_are_batched_and_still_lru(tmp_path):
+    response_cache = cache.ResponseCache(str(tmp_path / 'cache.sqlite'), max_entries=3)
+    try:
+        for n in range(3):
+            _put(response_cache, n)
+        changes = response_cache._conn.total_changes
+        assert _get(response_cache, 0).text == 'body 0'
+        assert response_cache._conn.total_changes == changes
+        _put(response_cache, 3)
+        assert _get(response_cache, 0) is not None
+        assert _get(response_cache, 1) is None
+        assert len(response_cache) == 3
+    finally:
+        response_cache.close()
+
+# The row count kept in memory follows replacements, evictions and clears, and matches the file when reopened
+def test_len_matches_table(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    response_cache = cache.ResponseCache(path, max_entries=4)
+    try:
+        for n in range(3):
+            _put(response_cache, n)
+        _put(response_cache, 0)
+        assert len(response_cache) == 3
+        for n in range(3, 6):
+            _put(response_cache, n)
+        assert len(response_cache) == 4
+        response_cache.put(cache.SECTION_DETAIL, 'https://sa.ucla.edu/detail', {}, _response('detail'))
+        response_cache.clear(cache.COURSES)
+        assert len(response_cache) == 1
+    finally:
+        response_cache.close()
+    response_cache = cache.ResponseCache(path)
+    try:
+        assert len(response_cache) == 1
+        response_cache.clear()
+        assert len(response_cache) == 0
+    finally:
+        response_cache.close()
@@ -0,0 +1,33 @@
+import pytest
+from uclacatalog import api
+from uclacatalog.parser import catalogparser
+
+HEADS = ['2A', 'C2A', '31', '31A', '31B', 'M31', '131', 'CM121', 'M10', '10', '0015', '151B', 'C151B', 'M151B']
+
+def _index():
+    courses = [catalogparser._populate_course({'head': head + '. Title', 'units': 'Units: 4.0', 'desc': ''}, 'COM SCI')
+               for head in HEADS]
+    return catalogparser.CourseIndex({api.LOWER_DIV: courses, api.UPPER_DIV: [], api.GRAD_DIV: []})
+
+def _heads(courses):
+    return sorted(('C' if c.is_concurrent else '') + ('M' if c.is_multi_listed else '') + c.ctlg_no + c.seq_no for c in courses)
+
+# find matches the number, sequence and C/M conventions exactly, ignoring zero padding and case
+@pytest.mark.parametrize('ctlg_no, heads', [
+    ('2A', ['2A']), ('C2A', ['C2A']), ('2a', ['2A']), ('31', ['31']), ('M31', ['M31']), ('0031', ['31']),
+    ('15', ['0015']), ('CM121', ['CM121']), ('121', []), ('M121', []), ('1', []), ('no number', [])
+])
+def test_find(ctlg_no, heads):
+    assert _heads(_index().find(ctlg_no)) == heads
+
+def test_find_ignoring_conventions():
+    assert _heads(_index().find('151B', ignore_conventions=True)) == ['151B', 'C151B', 'M151B']
+    assert _heads(_index().find('2A', ignore_conventions=True)) == ['2A', 'C2A']
+
+@pytest.mark.parametrize('prefix, heads', [
+    ('31', ['31', '31A', '31B', 'M31']), ('1', ['0015', '10', '131', '151B', 'C151B', 'CM121', 'M10', 'M151B']),
+    ('M1', ['CM121', 'M10', 'M151B']), ('C1', ['C151B', 'CM121']), ('CM1', ['CM121']), ('m3', ['M31']),
+    ('C', ['C151B', 'C2A', 'CM121']), ('4', [])
+])
+def test_find_prefix(prefix, heads):
+    assert _heads(_index().find_prefix(prefix)) == heads
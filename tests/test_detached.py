@@ -0,0 +1,54 @@
+import gc
+import pytest
+from bs4.element import PageElement
+from lxml import etree
+from uclacatalog import api, requesthandler
+from uclacatalog.parser import backends
+import pages
+
+'''
+Parsed models must not keep parse trees alive.
+
+api.fetch_catalog and api.fetch_sections are run against generated pages with every parser backend. Everything
+reachable from the results is then walked with gc.get_referents, and the test fails if any BeautifulSoup or lxml node
+is found, or if any BeautifulSoup or lxml tree is still alive once the parse is over.
+'''
+
+@pytest.fixture
+def generated_pages(monkeypatch):
+    monkeypatch.setattr(requesthandler, 'fetch_courses', lambda subj_area, div, **kwargs: pages.catalog_page('MATH'))
+    monkeypatch.setattr(requesthandler, 'fetch_root_sections', lambda course, term, **kwargs: pages.root_sections_page(3))
+    monkeypatch.setattr(requesthandler, 'fetch_leaf_sections', lambda section, term, **kwargs: pages.leaf_sections_page(section.id, 10))
+    monkeypatch.setattr(requesthandler, 'fetch_section_detail', lambda section, **kwargs: pages.section_detail_page(section.id))
+    catalog_memo = api.get_catalog_memo()
+    api.set_catalog_memo(None)
+    yield
+    api.set_catalog_memo(catalog_memo)
+
+def _is_tree(obj):
+    return isinstance(obj, (PageElement, etree._Element, etree._ElementTree))
+
+def _find_trees(roots):
+    seen = set()
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, type):
+            continue
+        seen.add(id(obj))
+        if _is_tree(obj):
+            return obj
+        stack.extend(gc.get_referents(obj))
+    return None
+
+@pytest.mark.parametrize('name', sorted(backends._BACKENDS))
+def test_models_are_detached(name, generated_pages, backend):
+    backends.set_backend(name)
+    courses = api.fetch_catalog('MATH')
+    sections = api.fetch_sections(courses[0], '20F')
+    assert len(courses) > 0 and len(sections) > 0
+    gc.collect()
+
+    tree = _find_trees([courses, sections])
+    assert tree is None, 'results reference a ' + type(tree).__name__
+    assert [obj for obj in gc.get_objects() if _is_tree(obj)] == []
@@ -0,0 +1,20 @@
+from uclacatalog import api, requesthandler
+from uclacatalog.pipeline import ParsePipeline
+import recorded
+
+# Worker processes are spawned rather than forked from the I/O threads, and return what the thread path returns
+def test_pipeline_matches_threads(recordings):
+    catalog_memo = api.get_catalog_memo()
+    api.set_catalog_memo(None)
+    recorded.install(recordings)
+    subj_areas = [recording['subj_area'] for recording in recordings]
+    try:
+        with ParsePipeline(processes=1) as parse_pipeline:
+            assert parse_pipeline._processes._mp_context.get_start_method() == 'spawn'
+            piped = {result.subj_area: [str(c) for c in result.courses] for result in parse_pipeline.iter_catalogs(subj_areas=subj_areas)}
+        threaded = {result.subj_area: [str(c) for c in result.courses] for result in api.fetch_all_catalogs(subj_areas=subj_areas)}
+    finally:
+        requesthandler.set_transport(None)
+        api.set_catalog_memo(catalog_memo)
+    assert piped == threaded
+    assert sum(len(courses) for courses in piped.values()) > 0
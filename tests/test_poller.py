@@ -0,0 +1,96 @@
+import time
+import pytest
+from uclacatalog import api, poller, replay, requesthandler
+
+class _Transport(replay.Replayer):
+    def __init__(self, recordings):
+        super().__init__(recordings)
+        self.enrolled = '112 of 200 Enrolled'
+        self.fail = False
+
+    def get(self, url, params=None, headers=None, session=None):
+        if self.fail:
+            raise ConnectionError('registrar unreachable')
+        resp = super().get(url, params, headers, session)
+        return requesthandler.Response(url, resp.status_code, resp.text.replace('112 of 200 Enrolled', self.enrolled))
+
+@pytest.fixture
+def transport(recordings):
+    catalog_memo = api.get_catalog_memo()
+    api.set_catalog_memo(None)
+    transport = _Transport(recordings)
+    requesthandler.set_transport(transport)
+    yield transport
+    requesthandler.set_transport(None)
+    api.set_catalog_memo(catalog_memo)
+
+# (course, term, sections) of a recorded course with some sections enrolling 112 students
+@pytest.fixture
+def watched(recordings, transport):
+    for recording in recordings:
+        for course in api.fetch_catalog(recording['subj_area']):
+            if course.get_path() in recording['courses']:
+                sections = api.fetch_sections(course, recording['term'])
+                if any(s.enrolled == 112 for root in sections for s in [root] + root.children):
+                    return course, recording['term'], sections
+    pytest.skip('no recorded section enrolls 112 students')
+
+def _all(sections):
+    return [s for root in sections for s in [root] + root.children]
+
+def test_poll_reports_seat_changes(transport, watched):
+    course, term, sections = watched
+    watcher = poller.EnrollmentPoller(budget=1000)
+    watcher.watch(course, term, sections)
+    assert watcher.poll(course, term) == []
+
+    moved = [s for s in _all(sections) if s.enrolled == 112]
+    transport.enrolled = '113 of 200 Enrolled'
+    before = int(time.time())
+    changes = watcher.poll(course, term)
+    assert [change.section for change in changes] == moved
+    assert all(change.changes == {'enrolled': (112, 113)} for change in changes)
+    assert all(s.enrolled == 113 for s in moved)
+    assert all(s.last_updated >= before for s in _all(sections))
+    # One summary request per poll for the course, and one for every root section with children
+    assert watcher.polls == 2
+    assert watcher.requests == 2 * (1 + sum(1 for s in sections if len(s.children) > 0))
+
+# The interval doubles up to max_interval while nothing changes, and goes back to min_interval when a number moves
+def test_interval_backoff_and_reset(transport, watched):
+    course, term, sections = watched
+    watcher = poller.EnrollmentPoller(budget=1000, min_interval=10, max_interval=40)
+    watcher.watch(course, term, sections)
+    watch = watcher._watches[poller._key(course, term)]
+    intervals = []
+    for _ in range(3):
+        watcher.poll(course, term)
+        intervals.append(watch.interval)
+    assert intervals == [20, 40, 40]
+    transport.enrolled = '113 of 200 Enrolled'
+    watcher.poll(course, term)
+    assert watch.interval == 10
+
+# Failed polls are counted, reported and retried after the course's interval
+def test_poll_due_reports_errors(transport, watched):
+    course, term, sections = watched
+    errors = []
+    watcher = poller.EnrollmentPoller(budget=1000, min_interval=0, on_error=lambda *args: errors.append(args))
+    watcher.watch(course, term, sections)
+    transport.fail = True
+    assert watcher.poll_due() == []
+    assert watcher.errors == 1 and len(errors) == 1 and errors[0][0] is course
+    transport.fail = False
+    watcher.poll_due()
+    assert watcher.polls == 1
+
+# Requests are spaced 1 / budget seconds apart
+def test_budget_spacing():
+    watcher = poller.EnrollmentPoller(budget=50)
+    started = time.monotonic()
+    for _ in range(6):
+        watcher._acquire()
+    assert time.monotonic() - started >= 5 / 50 - 0.005
+    assert watcher.requests == 6
+    with pytest.raises(ValueError):
+        poller.EnrollmentPoller(budget=0)
@@ -0,0 +1,16 @@
+import requests as req
+from uclacatalog import requesthandler
+
+# A session given to configure survives later calls that change other settings, until use_own_sessions clears it
+def test_configure_keeps_session():
+    session = req.Session()
+    try:
+        requesthandler.configure(session=session)
+        requesthandler.configure(timeout=5)
+        assert requesthandler.get_session('sa.ucla.edu') is session
+        requesthandler.configure(use_own_sessions=True)
+        assert requesthandler.get_session('sa.ucla.edu') is not session
+    finally:
+        requesthandler.configure(timeout=requesthandler.DEFAULT_TIMEOUT, use_own_sessions=True)
+        requesthandler.close()
+        session.close()
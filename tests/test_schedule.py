@@ -0,0 +1,21 @@
+import pytest
+from uclacatalog import schedule
+from uclacatalog.model import Section
+
+pytest.importorskip('numpy')
+
+def _lecture(meet_days, start_minute, end_minute):
+    section = Section()
+    section.meet_days = meet_days
+    section.start_minute = start_minute
+    section.end_minute = end_minute
+    return section
+
+# Weekend meetings conflict and count towards the time on campus like weekday ones
+def test_weekend_sections():
+    saturday = _lecture(['S'], 10 * 60, 12 * 60)
+    sunday = _lecture(['U'], 10 * 60, 12 * 60)
+    assert schedule.build_schedules([[saturday], [_lecture(['S'], 11 * 60, 13 * 60)]]) == []
+    schedules = schedule.build_schedules([[saturday], [sunday]])
+    assert len(schedules) == 1
+    assert schedules[0].score == 2 * (2 * 60 + schedule.DAY_WEIGHT)
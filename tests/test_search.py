@@ -0,0 +1,19 @@
+from uclacatalog import api, cache, search
+from uclacatalog.memo import CatalogMemo
+
+def _course_requests(stand_in):
+    return stand_in.stats.get(cache.COURSES, {'requests': 0})['requests']
+
+# build and update request the page again even when the catalog memo holds it
+def test_update_bypasses_catalog_memo(stand_in, tmp_path):
+    api.set_catalog_memo(CatalogMemo())
+    api.fetch_catalog('MATH')
+    assert _course_requests(stand_in) == 1
+    index = search.SearchIndex(str(tmp_path / 'search.sqlite'))
+    index.build(['MATH'])
+    assert _course_requests(stand_in) == 2
+    index.update('math')
+    assert _course_requests(stand_in) == 3
+    assert len(index) == len(api.fetch_catalog('MATH')) > 0
+    assert _course_requests(stand_in) == 3
+    index.close()
@@ -0,0 +1,32 @@
+import pytest
+from uclacatalog.model import Course
+from uclacatalog.model.section import DAY_BITS
+from uclacatalog.parser import sectionparser
+import pages
+
+def _course():
+    course = Course()
+    course.subj_area = 'COM SCI'
+    course.ctlg_no = '31'
+    return course
+
+@pytest.mark.parametrize('days, meet_days', [('MWF', ['M', 'W', 'F']), ('S', ['S']), ('U', ['U']), ('TRSU', ['T', 'R', 'S', 'U'])])
+def test_days(days, meet_days):
+    assert sectionparser._parse_days(days) == sum(DAY_BITS[day] for day in meet_days)
+
+# Weekend sections meet, and overlap each other, like weekday ones
+def test_weekend_sections():
+    resp = pages.root_sections_page(2)
+    resp.text = resp.text.replace('MWF', 'SU', 1)
+    saturday, weekday = sectionparser._parse_root_sections(resp, _course(), '20F', fetch_details=False)
+    assert saturday.meet_days == ['S', 'U']
+    assert not saturday.overlaps(weekday)
+    assert saturday.overlaps(saturday)
+
+@pytest.mark.parametrize('name, day', [('Mon', 'M'), ('Tue', 'T'), ('Thu', 'R'), ('Sat', 'S'), ('Sun', 'U')])
+def test_final_day(name, day):
+    resp = pages.section_detail_page('100001')
+    resp.text = resp.text.replace('<div>Sat</div>', '<div>' + name + '</div>')
+    section = sectionparser._parse_root_sections(pages.root_sections_page(1), _course(), '20F', fetch_details=False)[0]
+    sectionparser._populate_section_details(section, resp)
+    assert section.final.days == DAY_BITS[day]
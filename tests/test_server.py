@@ -0,0 +1,64 @@
+import pytest
+import requests
+from uclacatalog import api, cache, requesthandler, server
+import recorded
+
+'''
+Runs the library against server.StandInServer serving the recordings in benchmarks/fixtures/ over HTTP.
+'''
+
+@pytest.fixture
+def expected(recordings):
+    catalog_memo = api.get_catalog_memo()
+    api.set_catalog_memo(None)
+    recorded.install(recordings)
+    try:
+        return recorded.crawl(recordings)
+    finally:
+        requesthandler.set_transport(None)
+        api.set_catalog_memo(catalog_memo)
+
+# A server that fails every request once with a 503 before answering it
+@pytest.fixture
+def flaky(recordings, expected):
+    catalog_memo = api.get_catalog_memo()
+    api.set_catalog_memo(None)
+    with server.StandInServer(recordings, fail_first=1, seed=0) as stand_in:
+        requesthandler.configure(backoff_factor=0.01, registrar_url=stand_in.url, soc_url=stand_in.url)
+        yield stand_in
+    requesthandler.configure(backoff_factor=requesthandler.DEFAULT_BACKOFF_FACTOR,
+                             registrar_url=requesthandler.DEFAULT_REGISTRAR_URL, soc_url=requesthandler.DEFAULT_SOC_URL)
+    api.set_catalog_memo(catalog_memo)
+
+def _any_section(recordings):
+    for recording in recordings:
+        for course in api.fetch_catalog(recording['subj_area']):
+            if course.get_path() in recording['courses']:
+                sections = api.fetch_sections(course, recording['term'])
+                if len(sections) > 0:
+                    return sections[0]
+
+# ClassDetailTooltip is refused without the X-Requested-With header, as on the real site
+def test_detail_requires_header(recordings, stand_in):
+    url, params, headers = requesthandler._section_detail_request(_any_section(recordings))
+    assert requests.get(url, params=params).status_code == 404
+    assert requests.get(url, params=params, headers=headers).status_code == 200
+
+# Every request that fails once is retried, and the sections match the ones replayed without HTTP
+def test_retries(recordings, expected, flaky):
+    assert recorded.crawl(recordings) == expected
+    assert len(flaky.stats) == 4
+    for stats in flaky.stats.values():
+        assert stats['errors'] >= 1
+
+# With a response cache installed, repeating the crawl sends no cacheable request to the server
+def test_response_cache(recordings, expected, flaky, tmp_path):
+    requesthandler.set_cache(cache.ResponseCache(str(tmp_path / 'cache.sqlite')))
+    try:
+        recorded.crawl(recordings)
+        before = {endpoint: stats['requests'] for endpoint, stats in flaky.stats.items()}
+        assert recorded.crawl(recordings) == expected
+        assert {endpoint: stats['requests'] for endpoint, stats in flaky.stats.items()} == before
+    finally:
+        requesthandler.get_cache().close()
+        requesthandler.set_cache(None)
@@ -0,0 +1,27 @@
+import pytest
+from uclacatalog import snapshot
+from uclacatalog.parser import catalogparser
+import pages
+
+def _courses(subj_area):
+    return catalogparser.parse_index(pages.catalog_page(subj_area), subj_area).courses()
+
+# The subject area is matched against the courses' own subj_area whatever its case
+def test_subject_area_is_case_insensitive(tmp_path):
+    catalog_snapshot = snapshot.CatalogSnapshot(str(tmp_path / 'snapshot.sqlite'))
+    courses = _courses('COM SCI')
+    assert len(catalog_snapshot.update('com sci', courses).added) == len(courses)
+    assert len(catalog_snapshot.diff('com sci', courses)) == 0
+    assert len(catalog_snapshot.update('Com Sci', courses)) == 0
+    assert len(catalog_snapshot.courses('com sci')) == len(courses)
+    catalog_snapshot.remove_subject('com sci')
+    assert len(catalog_snapshot) == 0
+    catalog_snapshot.close()
+
+def test_courses_of_another_subject_area(tmp_path):
+    catalog_snapshot = snapshot.CatalogSnapshot(str(tmp_path / 'snapshot.sqlite'))
+    with pytest.raises(ValueError):
+        catalog_snapshot.update('MATH', _courses('COM SCI'))
+    with pytest.raises(ValueError):
+        snapshot.diff_courses('MATH', [], _courses('COM SCI'))
+    catalog_snapshot.close()
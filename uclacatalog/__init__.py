@@ -1 +1 @@
-from .api import ALL_DIV, LOWER_DIV, UPPER_DIV, GRAD_DIV, LEGAL_SA, fetch_catalog, fetch_matching_courses, fetch_sections
\ No newline at end of file
+from .api import ALL_DIV, LOWER_DIV, UPPER_DIV, GRAD_DIV, LEGAL_SA, fetch_catalog, fetch_matching_courses, fetch_sections, fetch_all_catalogs, iter_catalog, iter_sections
\ No newline at end of file
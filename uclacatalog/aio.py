@@ -0,0 +1,148 @@
+import asyncio
+from typing import List
+from .model import Course, Section
+from .parser import catalogparser, sectionparser
+from . import api
+from . import cache
+from . import instrument
+from . import requesthandler
+
+'''
+Awaitable versions of the functions in api.py, backed by aiohttp (pip install uclacatalog[async]).
+
+Responses are parsed by the same parsers as the blocking API. Many lookups can share one event loop by passing the
+same session from open_session() to each call, e.g:
+
+    async with aio.open_session(max_per_host=8) as session:
+        results = await asyncio.gather(*[aio.fetch_sections(course, '20F', session) for course in courses])
+
+The session caps the number of requests in flight to each host, regardless of how many calls are gathered. If no
+session is given, a new one is opened and closed for the call.
+'''
+
+DEFAULT_MAX_PER_HOST = 8
+
+def _import_aiohttp():
+    try:
+        import aiohttp
+    except ImportError:
+        raise ImportError('aiohttp is required for uclacatalog.aio, install it with pip install uclacatalog[async]')
+    return aiohttp
+
+def open_session(max_per_host: int = DEFAULT_MAX_PER_HOST):
+    aiohttp = _import_aiohttp()
+    connector = aiohttp.TCPConnector(limit=0, limit_per_host=max_per_host)
+    timeout = aiohttp.ClientTimeout(total=requesthandler._config['timeout'])
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+'''
+Follows the same retry policy as the blocking transport: connection errors and 5xx responses are retried with
+exponential backoff.
+'''
+async def _get(session, url, params=None, headers=None):
+    aiohttp = _import_aiohttp()
+    retries = requesthandler._config['retries']
+    backoff_factor = requesthandler._config['backoff_factor']
+    attempt = 0
+    while True:
+        try:
+            async with session.get(url, params=params, headers=headers) as resp:
+                if resp.status not in requesthandler.RETRY_STATUSES or attempt >= retries:
+                    return requesthandler.Response(str(resp.url), resp.status, await resp.text(), dict(resp.headers))
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt >= retries:
+                raise
+        await asyncio.sleep(backoff_factor * (2 ** attempt))
+        attempt += 1
+
+async def _with_session(session, func, *args):
+    if session is not None:
+        return await func(session, *args)
+    async with open_session() as session:
+        return await func(session, *args)
+
+'''
+Same as requesthandler._fetch, including the response cache, conditional requests and transport if they are
+installed. Those are blocking, so they are called on the event loop's default executor rather than on the loop itself.
+'''
+async def _fetch(session, endpoint, request):
+    loop = asyncio.get_event_loop()
+    started = instrument.start()
+    cached, headers, stored = await loop.run_in_executor(None, requesthandler._prepare, endpoint, request, started)
+    if cached is not None:
+        return cached
+    url, params = request[:2]
+    transport = requesthandler.get_transport()
+    if transport is not None:
+        resp = await loop.run_in_executor(None, transport.get, url, params, headers, None)
+    else:
+        resp = await _get(session, url, params, headers)
+    return await loop.run_in_executor(None, requesthandler._complete, endpoint, request, resp, stored, started)
+
+async def fetch_courses(session, subj_area, div):
+    return await _fetch(session, cache.COURSES, requesthandler._courses_request(subj_area, div))
+
+async def fetch_root_sections(session, course, term):
+    return await _fetch(session, cache.ROOT_SECTIONS, requesthandler._root_sections_request(course, term))
+
+async def fetch_leaf_sections(session, section, term):
+    return await _fetch(session, cache.LEAF_SECTIONS, requesthandler._leaf_sections_request(section, term))
+
+async def fetch_section_detail(session, section):
+    return await _fetch(session, cache.SECTION_DETAIL, requesthandler._section_detail_request(section))
+
+# Returns a list of all courses in the specified division for the specified subject area
+async def fetch_catalog(subj_area: str, div: str = api.ALL_DIV, session=None) -> List[Course]:
+    subj_area = subj_area.upper()
+    if subj_area not in api.LEGAL_SA:
+        raise ValueError(subj_area + ' not a legal subject area!')
+    catalog_memo = api.get_catalog_memo()
+    if catalog_memo is None:
+        resp = await _with_session(session, fetch_courses, subj_area, div)
+        return catalogparser.parse_catalog(resp, subj_area, div)
+    return api._copies((await _fetch_index(session, catalog_memo, subj_area)).courses(div))
+
+# Returns list of courses in the specified subject area with a matching inputted catalog number
+# Matching is exact, like api.fetch_matching_courses
+async def fetch_matching_courses(subj_area: str, ctlg_no: str, session=None) -> List[Course]:
+    subj_area = subj_area.upper()
+    if subj_area not in api.LEGAL_SA:
+        raise ValueError(subj_area + ' not a legal subject area!')
+    catalog_memo = api.get_catalog_memo()
+    if catalog_memo is None:
+        resp = await _with_session(session, fetch_courses, subj_area, api.ALL_DIV)
+        return catalogparser.find_course(resp, subj_area, ctlg_no)
+    return api._copies((await _fetch_index(session, catalog_memo, subj_area)).find(ctlg_no))
+
+async def _fetch_index(session, catalog_memo, subj_area):
+    index = catalog_memo.get(subj_area)
+    if index is None:
+        resp = await _with_session(session, fetch_courses, subj_area, api.ALL_DIV)
+        index = catalogparser.parse_index(resp, subj_area)
+        catalog_memo.put(subj_area, index)
+    return index
+
+# Returns a list of root level sections for the specified course, or an empty list if no sections could be found
+async def fetch_sections(course: Course, term: str, session=None) -> List[Section]:
+    return await _with_session(session, _fetch_sections, course, term)
+
+'''
+Mirrors sectionparser.parse_sections, except that every leaf and detail request of the course is awaited together.
+The sections are placed before any detail arrives, so the ordering and children tree match the blocking API.
+'''
+async def _fetch_sections(session, course, term):
+    out = sectionparser._parse_root_sections(await fetch_root_sections(session, course, term), course, term, fetch_details=False)
+    resps = await asyncio.gather(
+        *[fetch_leaf_sections(session, section, term) for section in out],
+        *[fetch_section_detail(session, section) for section in out]
+    )
+    leaf_resps, detail_resps = resps[:len(out)], resps[len(out):]
+    leaves = []
+    for section, leaf_resp, detail_resp in zip(out, leaf_resps, detail_resps):
+        sectionparser._populate_section_details(section, detail_resp)
+        section.children = sectionparser._parse_leaf_sections(leaf_resp, section, fetch_details=False)
+        leaves.extend(section.children)
+    detail_resps = await asyncio.gather(*[fetch_section_detail(session, section) for section in leaves])
+    for section, detail_resp in zip(leaves, detail_resps):
+        sectionparser._populate_section_details(section, detail_resp)
+    return out
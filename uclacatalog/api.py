@@ -1,6 +1,11 @@
-from typing import List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import copy
+from typing import Iterator, List
+from .crawl import CrawlResult, CrawlStats
 from .model import Course, Section
 from .parser import catalogparser, sectionparser
+from .memo import CatalogMemo
+from .pipeline import ParsePipeline
 from . import requesthandler
 
 ALL_DIV = "all"
@@ -195,22 +200,127 @@ LEGAL_SA = {
     "YIDDSH"
 }
 
-# Returns a list of all courses in the specified division for the specified subject area
+_catalog_memo = CatalogMemo()
+
+'''
+Replaces the memo of parsed catalogs used by fetch_catalog, fetch_matching_courses and iter_catalog. Pass None to
+disable memoization.
+
+By default, a subject area's page is requested at most once an hour (memo.DEFAULT_TTL), so a change to the catalog may
+take that long to show. Every call still returns its own copies of the courses, which may be modified freely.
+'''
+def set_catalog_memo(catalog_memo):
+    global _catalog_memo
+    _catalog_memo = catalog_memo
+
+def get_catalog_memo():
+    return _catalog_memo
+
+# Returns a list of all courses in the specified division (or list of divisions) for the specified subject area
+# Served from the catalog memo if the page was requested in the last hour (see set_catalog_memo)
 def fetch_catalog(subj_area: str, div: str = ALL_DIV) -> List[Course]:
     subj_area = subj_area.upper()
     if subj_area in LEGAL_SA:
-        return catalogparser.parse_catalog(requesthandler.fetch_courses(subj_area, div), subj_area, div)
+        if _catalog_memo is None:
+            return catalogparser.parse_catalog(requesthandler.fetch_courses(subj_area, div), subj_area, div)
+        return _copies(_fetch_index(_catalog_memo, subj_area).courses(div))
     else:
         raise ValueError(subj_area + ' not a legal subject area!')
 
 # Returns list of courses in the specified subject area with a matching inputted catalog number
+# The catalog number must match exactly, including the sequence number and C and M conventions (e.g '31' won't match
+# '131', '31A' or 'M31', and '2A' won't match 'C2A'). Zero padding and case are ignored.
+# Served from the catalog memo if the page was requested in the last hour (see set_catalog_memo)
 def fetch_matching_courses(subj_area: str, ctlg_no: str) -> List[Course]:
     subj_area = subj_area.upper()
     if subj_area in LEGAL_SA:
-        return catalogparser.find_course(requesthandler.fetch_courses(subj_area, ALL_DIV), subj_area, ctlg_no)
+        if _catalog_memo is None:
+            return catalogparser.find_course(requesthandler.fetch_courses(subj_area, ALL_DIV), subj_area, ctlg_no)
+        return _copies(_fetch_index(_catalog_memo, subj_area).find(ctlg_no))
     else:
         raise ValueError(subj_area + ' not a legal subject area!')
 
+'''
+Same as fetch_catalog, but returns an iterator over the courses. Unlike iter_sections, this does not stream: the page is
+requested and its fields extracted in full when iter_catalog is called, and only the Course objects are built as the
+iterator is consumed. An illegal subject area raises right away, not on the first next(). Like fetch_catalog, it is
+served from the catalog memo if the page was requested in the last hour.
+'''
+def iter_catalog(subj_area: str, div: str = ALL_DIV) -> Iterator[Course]:
+    subj_area = subj_area.upper()
+    if subj_area not in LEGAL_SA:
+        raise ValueError(subj_area + ' not a legal subject area!')
+    if _catalog_memo is None:
+        return catalogparser.iter_catalog(requesthandler.fetch_courses(subj_area, div), subj_area, div)
+    return iter(_copies(_fetch_index(_catalog_memo, subj_area).courses(div)))
+
+'''
+Crawls the catalogs of many subject areas (every legal subject area by default) on up to max_workers threads.
+
+CrawlResults are yielded in the order the subject areas finish. A subject area that fails yields a result carrying its
+exception rather than stopping the crawl. If a CrawlStats is passed as stats, it holds the crawl's throughput once the
+iterator is exhausted.
+
+If processes is given, pages are parsed on that many worker processes instead of the request threads (see pipeline.py).
+'''
+def fetch_all_catalogs(div: str = ALL_DIV, max_workers: int = 8, subj_areas = None, stats: CrawlStats = None, processes: int = None) -> Iterator[CrawlResult]:
+    if processes is not None:
+        with ParsePipeline(processes=processes, io_workers=max_workers) as parse_pipeline:
+            yield from parse_pipeline.iter_catalogs(div, subj_areas, stats)
+        return
+    if subj_areas is None:
+        subj_areas = sorted(LEGAL_SA)
+    if stats is None:
+        stats = CrawlStats()
+    stats.start()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = {executor.submit(fetch_catalog, subj_area, div): subj_area for subj_area in subj_areas}
+    try:
+        for future in as_completed(futures):
+            try:
+                result = CrawlResult(futures[future], courses=future.result())
+            except Exception as e:
+                result = CrawlResult(futures[future], error=e)
+            stats.record(result)
+            yield result
+    finally:
+        # Stops the remaining subject areas if the caller stopped iterating early
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+# The courses of the catalog memo are shared by every caller, so callers are handed copies of them
+def _copies(courses):
+    return [copy.copy(course) for course in courses]
+
+def _fetch_index(catalog_memo, subj_area):
+    index = catalog_memo.get(subj_area)
+    if index is None:
+        index = catalogparser.parse_index(requesthandler.fetch_courses(subj_area, ALL_DIV), subj_area)
+        catalog_memo.put(subj_area, index)
+    return index
+
+'''
+The CourseIndex of every division of the subject area, memoized if the catalog memo is enabled. If refresh is True, the
+page is requested again even if it is memoized, and the new index replaces the memoized one.
+'''
+def _fetch_subject_index(subj_area, refresh=False):
+    catalog_memo = _catalog_memo
+    if catalog_memo is None:
+        return catalogparser.parse_index(requesthandler.fetch_courses(subj_area, ALL_DIV), subj_area)
+    if refresh:
+        catalog_memo.invalidate(subj_area)
+    return _fetch_index(catalog_memo, subj_area)
+
 # Returns a list of root level sections for the specified course, or an empty list if no sections could be found
-def fetch_sections(course: Course, term: str) -> List[Section]:
-    return sectionparser.parse_sections(requesthandler.fetch_root_sections(course, term), course, term)
\ No newline at end of file
+# If max_workers is greater than 1, leaf section and detail requests are made concurrently on that many threads
+# If lazy_details is True, restrictions, webpage, grade_type, final and notes are only requested when first read
+def fetch_sections(course: Course, term: str, max_workers: int = None, lazy_details: bool = False) -> List[Section]:
+    return sectionparser.parse_sections(requesthandler.fetch_root_sections(course, term), course, term, max_workers, lazy_details)
+
+'''
+Same as fetch_sections, but yields every section (roots and their children, depth first) as soon as it is parsed.
+Children are appended to their parent section as they arrive.
+'''
+def iter_sections(course: Course, term: str) -> Iterator[Section]:
+    return sectionparser.iter_sections(requesthandler.fetch_root_sections(course, term), course, term)
\ No newline at end of file
@@ -0,0 +1,204 @@
+from collections import OrderedDict
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from . import requesthandler
+
+'''
+Persistent, opt-in cache of registrar responses, backed by a SQLite file.
+
+Entries are keyed by URL and query parameters and expire after a time-to-live that depends on the endpoint they came
+from: course descriptions barely change within a term, while enrollment summaries change by the minute. The cache is
+bounded by a maximum number of entries; once it is exceeded, the least recently used entries are evicted. Reads do
+not write to the file: access times are kept in memory and written in batches, along with the next write.
+
+Enable it with:
+
+    requesthandler.set_cache(ResponseCache('uclacatalog-cache.sqlite'))
+'''
+
+COURSES = 'courses'
+ROOT_SECTIONS = 'root_sections'
+LEAF_SECTIONS = 'leaf_sections'
+SECTION_DETAIL = 'section_detail'
+
+# Time-to-live of each endpoint, in seconds. A TTL of 0 disables caching for that endpoint.
+DEFAULT_TTLS = {
+    COURSES: 24 * 60 * 60,
+    SECTION_DETAIL: 6 * 60 * 60,
+    ROOT_SECTIONS: 60,
+    LEAF_SECTIONS: 60
+}
+DEFAULT_MAX_ENTRIES = 50000
+# Number of pending access times that forces a write even if nothing is put
+ACCESS_BATCH = 256
+
+class ResponseCache:
+    def __init__(self, path, ttls=None, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls is not None:
+            self.ttls.update(ttls)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, endpoint TEXT, url TEXT, status INTEGER, body TEXT, headers TEXT, '
+            'stored REAL, accessed REAL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+        self._conn.commit()
+        # Access times of hits not yet written, by key
+        self._accessed = {}
+        self._count = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    # Returns the cached response for the request, or None if there is none or it has expired
+    def get(self, endpoint, url, params):
+        ttl = self.ttls.get(endpoint, 0)
+        if ttl <= 0:
+            return None
+        key = _make_key(url, params)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT url, status, body, headers, stored FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[4] > ttl:
+                self._accessed.pop(key, None)
+                self._count -= self._conn.execute('DELETE FROM responses WHERE key = ?', (key,)).rowcount
+                self._conn.commit()
+                return None
+            self._accessed[key] = now
+            if len(self._accessed) >= ACCESS_BATCH:
+                self._flush_accessed()
+                self._conn.commit()
+        return requesthandler.Response(row[0], row[1], row[2], json.loads(row[3]), from_cache=True)
+
+    def put(self, endpoint, url, params, resp):
+        if self.ttls.get(endpoint, 0) <= 0:
+            return
+        key = _make_key(url, params)
+        now = time.time()
+        with self._lock:
+            self._accessed.pop(key, None)
+            if self._conn.execute('SELECT 1 FROM responses WHERE key = ?', (key,)).fetchone() is None:
+                self._count += 1
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, endpoint, resp.url, resp.status_code, resp.text, json.dumps(dict(resp.headers)), now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def clear(self, endpoint=None):
+        with self._lock:
+            self._flush_accessed()
+            if endpoint is None:
+                self._conn.execute('DELETE FROM responses')
+                self._count = 0
+            else:
+                self._count -= self._conn.execute('DELETE FROM responses WHERE endpoint = ?', (endpoint,)).rowcount
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._flush_accessed()
+            self._conn.commit()
+            self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._count
+
+    # Writes the pending access times; the caller commits
+    def _flush_accessed(self):
+        if len(self._accessed) > 0:
+            self._conn.executemany(
+                'UPDATE responses SET accessed = ? WHERE key = ?',
+                [(accessed, key) for key, accessed in self._accessed.items()]
+            )
+            self._accessed.clear()
+
+    def _evict(self):
+        if self._count > self.max_entries:
+            # Eviction goes by access time, so it needs the pending ones
+            self._flush_accessed()
+            self._count -= self._conn.execute(
+                'DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?)',
+                (self._count - self.max_entries,)
+            ).rowcount
+
+'''
+In-memory store of responses that carry a validator (an ETag or Last-Modified header), for making conditional requests.
+
+The next request for the same URL and parameters is sent with If-None-Match and/or If-Modified-Since, and if the server
+answers 304 Not Modified, the stored response is used in its place: the body is not transferred again, and since it is
+the same body, the parse memo (see backends.set_parse_memo) does not parse it again either. Responses without a
+validator are not stored. At most max_entries responses are kept, least recently used first out.
+'''
+DEFAULT_CONDITIONAL_MAX_ENTRIES = 512
+
+class ConditionalStore:
+    def __init__(self, max_entries=DEFAULT_CONDITIONAL_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.not_modified = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Returns the stored response for the request, or None if there is none
+    def get(self, url, params):
+        with self._lock:
+            return self._entries.get(_make_key(url, params))
+
+    '''
+    Returns the response to hand to the parsers for resp, the answer to a request made with the conditional headers of
+    stored (the result of get(), or None): stored itself if resp is a 304, and resp otherwise, which replaces stored.
+    '''
+    def update(self, url, params, resp, stored):
+        key = _make_key(url, params)
+        with self._lock:
+            if resp.status_code == 304 and stored is not None:
+                self.not_modified += 1
+                self._entries[key] = stored
+                self._entries.move_to_end(key)
+                return stored
+            if resp.status_code == 200 and (_header(resp, 'ETag') or _header(resp, 'Last-Modified')):
+                self._entries[key] = resp
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.pop(key, None)
+        return resp
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+# Returns headers with the conditional headers for the stored response added
+def conditional_headers(headers, stored):
+    out = dict(headers or {})
+    etag = _header(stored, 'ETag')
+    last_modified = _header(stored, 'Last-Modified')
+    if etag:
+        out['If-None-Match'] = etag
+    if last_modified:
+        out['If-Modified-Since'] = last_modified
+    return out
+
+# Header names are case-insensitive, but not every response type's headers are
+def _header(resp, name):
+    for key, value in (resp.headers or {}).items():
+        if key.lower() == name.lower():
+            return value
+    return None
+
+def _make_key(url, params):
+    canonical = url + json.dumps(params or {}, sort_keys=True)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
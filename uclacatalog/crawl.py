@@ -0,0 +1,68 @@
+import time
+
+'''
+Models for bulk crawls of the catalog (see api.fetch_all_catalogs)
+
+CrawlResult
+subj_area:      (string)        The subject area that was crawled
+courses:        (List[Course])  Courses of the subject area, or None if the crawl of this subject area failed
+error:          (Exception)     The exception raised while crawling the subject area, or None if it succeeded
+
+SectionsResult
+course:         (Course)        The course whose sections were crawled
+sections:       (List[Section]) Root sections of the course (as returned by api.fetch_sections), or None if the crawl of this course failed
+error:          (Exception)     The exception raised while crawling the course, or None if it succeeded
+
+CrawlStats
+pages:          (int)           Number of subject area pages crawled successfully
+courses:        (int)           Number of courses parsed
+errors:         (int)           Number of subject areas that failed
+elapsed:        (float)         Seconds from the start of the crawl until its last result
+'''
+
+class CrawlResult:
+    def __init__(self, subj_area, courses=None, error=None):
+        self.subj_area = subj_area
+        self.courses = courses
+        self.error = error
+
+    def __str__(self):
+        return str(self.__class__) + ": " + str(self.__dict__)
+
+class SectionsResult:
+    def __init__(self, course, sections=None, error=None):
+        self.course = course
+        self.sections = sections
+        self.error = error
+
+    def __str__(self):
+        return str(self.__class__) + ": " + str(self.__dict__)
+
+class CrawlStats:
+    def __init__(self):
+        self.pages = 0
+        self.courses = 0
+        self.errors = 0
+        self.elapsed = 0.0
+        self._started = None
+
+    def start(self):
+        self._started = time.perf_counter()
+
+    def record(self, result):
+        if result.error is None:
+            self.pages += 1
+            self.courses += len(result.courses)
+        else:
+            self.errors += 1
+        self.elapsed = time.perf_counter() - self._started
+
+    def pages_per_sec(self):
+        return self.pages / self.elapsed if self.elapsed > 0 else 0.0
+
+    def courses_per_sec(self):
+        return self.courses / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self):
+        return '%d pages, %d courses, %d errors in %.2fs (%.2f pages/s, %.1f courses/s)' % (
+            self.pages, self.courses, self.errors, self.elapsed, self.pages_per_sec(), self.courses_per_sec())
@@ -0,0 +1,186 @@
+import logging
+import threading
+import time
+
+'''
+Hooks for profiling the library without patching it.
+
+Once a hook is installed with set_hook(), it is told about every request to the registrar and every parse stage:
+
+    on_request(endpoint, url, status, seconds, size, cached)
+        endpoint is one of the cache module's endpoints (cache.COURSES, ...), size is the length of the body in bytes,
+        and cached is True if the response came from the response cache rather than the network
+
+    on_parse(stage, seconds, items)
+        stage is one of the stages below, and items is the number of courses or sections produced (1 for a tree)
+
+TREE_BUILD is reported by the parser backend for every page it builds a tree of. The extraction stages cover turning
+one page into models, so they include the TREE_BUILD of their page.
+
+No hook is installed by default, in which case instrumented code only pays for a global lookup. HistogramHook keeps
+counts and latency histograms in memory, and LoggingHook logs every event to the 'uclacatalog' logger.
+
+    histogram = instrument.HistogramHook()
+    instrument.set_hook(histogram)
+    api.fetch_sections(course, '20F')
+    print(histogram.report())
+'''
+
+TREE_BUILD = 'tree_build'
+COURSE_EXTRACTION = 'course_extraction'
+ROOT_EXTRACTION = 'root_extraction'
+LEAF_EXTRACTION = 'leaf_extraction'
+DETAIL_EXTRACTION = 'detail_extraction'
+
+_hook = None
+
+# Installs a hook (anything with on_request and on_parse methods, e.g a subclass of Hook). Pass None to remove it.
+def set_hook(hook):
+    global _hook
+    _hook = hook
+
+def get_hook():
+    return _hook
+
+'''
+The functions below are called by the instrumented code. start() returns None when no hook is installed, which makes
+the matching request() or parse() call return straight away.
+'''
+def start():
+    if _hook is None:
+        return None
+    return time.perf_counter()
+
+def request(endpoint, url, resp, started, cached=False):
+    hook = _hook
+    if hook is None or started is None:
+        return
+    hook.on_request(endpoint, url, resp.status_code, time.perf_counter() - started, _size(resp), cached)
+
+def parse(stage, started, items=1):
+    hook = _hook
+    if hook is None or started is None:
+        return
+    hook.on_parse(stage, time.perf_counter() - started, items)
+
+# Responses from installed transports (see requesthandler.set_transport) may not have .content
+def _size(resp):
+    content = getattr(resp, 'content', None)
+    if content is None:
+        return len(resp.text.encode('utf-8'))
+    return len(content)
+
+class Hook:
+    def on_request(self, endpoint, url, status, seconds, size, cached):
+        pass
+
+    def on_parse(self, stage, seconds, items):
+        pass
+
+class LoggingHook(Hook):
+    def __init__(self, logger=None, level=logging.DEBUG):
+        self.logger = logger or logging.getLogger('uclacatalog')
+        self.level = level
+
+    def on_request(self, endpoint, url, status, seconds, size, cached):
+        self.logger.log(self.level, 'request %s %d %.1fms %d bytes%s %s', endpoint, status, seconds * 1000, size,
+                        ' (cached)' if cached else '', url)
+
+    def on_parse(self, stage, seconds, items):
+        self.logger.log(self.level, 'parse %s %.2fms %d items', stage, seconds * 1000, items)
+
+# Upper bounds of the latency buckets, in milliseconds
+DEFAULT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+'''
+Keeps, for every endpoint and every parse stage, the number of events, their total and maximum time, a histogram of
+their times, and the total bytes (requests) or items (parse stages) they accounted for. Requests served from the cache
+are counted under '<endpoint> (cached)'.
+'''
+class HistogramHook(Hook):
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def on_request(self, endpoint, url, status, seconds, size, cached):
+        name = endpoint + ' (cached)' if cached else endpoint
+        self._record('request', name, seconds, size, status)
+
+    def on_parse(self, stage, seconds, items):
+        self._record('parse', stage, seconds, items, None)
+
+    def _record(self, kind, name, seconds, amount, status):
+        ms = seconds * 1000
+        with self._lock:
+            series = self._series.get((kind, name))
+            if series is None:
+                series = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'amount': 0, 'statuses': {},
+                          'histogram': [0] * (len(self.buckets) + 1)}
+                self._series[(kind, name)] = series
+            series['count'] += 1
+            series['total_ms'] += ms
+            series['max_ms'] = max(series['max_ms'], ms)
+            series['amount'] += amount
+            if status is not None:
+                series['statuses'][status] = series['statuses'].get(status, 0) + 1
+            series['histogram'][_bucket(self.buckets, ms)] += 1
+
+    '''
+    Returns {'requests': {endpoint: stats}, 'parse': {stage: stats}}, where stats holds count, total_ms, mean_ms,
+    max_ms, p50_ms and p95_ms (the upper bound of the bucket the percentile falls in), histogram (a count per bucket),
+    statuses (requests only) and bytes (requests) or items (parse stages).
+    '''
+    def summary(self):
+        out = {'requests': {}, 'parse': {}}
+        with self._lock:
+            for (kind, name), series in self._series.items():
+                stats = {
+                    'count': series['count'],
+                    'total_ms': series['total_ms'],
+                    'mean_ms': series['total_ms'] / series['count'],
+                    'max_ms': series['max_ms'],
+                    'p50_ms': self._percentile(series, 0.5),
+                    'p95_ms': self._percentile(series, 0.95),
+                    'histogram': list(series['histogram'])
+                }
+                if kind == 'request':
+                    stats['statuses'] = dict(series['statuses'])
+                    stats['bytes'] = series['amount']
+                    out['requests'][name] = stats
+                else:
+                    stats['items'] = series['amount']
+                    out['parse'][name] = stats
+        return out
+
+    def report(self):
+        lines = ['%-28s %7s %10s %9s %9s %9s %12s' % ('', 'count', 'total ms', 'mean ms', 'p95 ms', 'max ms', 'bytes/items')]
+        summary = self.summary()
+        for kind, amount in (('requests', 'bytes'), ('parse', 'items')):
+            for name, stats in sorted(summary[kind].items()):
+                lines.append('%-28s %7d %10.1f %9.2f %9s %9.2f %12d' % (
+                    name, stats['count'], stats['total_ms'], stats['mean_ms'], _format_bound(self.buckets, stats['p95_ms']),
+                    stats['max_ms'], stats[amount]))
+        return '\n'.join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def _percentile(self, series, fraction):
+        target = fraction * series['count']
+        seen = 0
+        for i, count in enumerate(series['histogram']):
+            seen += count
+            if seen >= target and count > 0:
+                return self.buckets[i] if i < len(self.buckets) else float('inf')
+        return float('inf')
+
+def _bucket(buckets, ms):
+    for i, bound in enumerate(buckets):
+        if ms <= bound:
+            return i
+    return len(buckets)
+
+def _format_bound(buckets, bound):
+    return '>%g' % buckets[-1] if bound == float('inf') else '<=%g' % bound
@@ -0,0 +1,116 @@
+from collections import OrderedDict
+import hashlib
+import threading
+import time
+
+'''
+In-process memoization of parsed catalogs.
+
+Looking up many catalog numbers in the same department one after another is the most common way the library is used,
+so api.fetch_catalog and api.fetch_matching_courses keep the catalogparser.CourseIndex of each subject area in a least
+recently used cache. Entries expire after ttl seconds, and at most max_entries subject areas are kept.
+
+The Course objects in the cache are never handed out: the api functions return copies of them, so that callers may
+modify their results without changing what later calls get.
+'''
+
+DEFAULT_TTL = 60 * 60
+DEFAULT_MAX_ENTRIES = 64
+
+class CatalogMemo:
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Returns the index memoized for the subject area, or None if there is none or it has expired
+    def get(self, subj_area):
+        with self._lock:
+            entry = self._entries.get(subj_area)
+            if entry is None or time.time() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[subj_area]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(subj_area)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, subj_area, index):
+        with self._lock:
+            self._entries[subj_area] = (time.time(), index)
+            self._entries.move_to_end(subj_area)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, subj_area=None):
+        with self._lock:
+            if subj_area is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(subj_area, None)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self._entries)}
+
+'''
+Memoization of parsed responses by the content of their body.
+
+Many pages come back byte for byte the same from one request to the next (a subject's course descriptions, the detail
+tooltip of a section, the summary of a course whose enrollment has not moved), so whatever was parsed out of a body is
+kept under a fingerprint of that body, and a page that was already seen is not parsed again. Entries are keyed by the
+kind of result (e.g 'sections') and the fingerprint; at most max_entries of them are kept, least recently used first out.
+
+Like the catalog memo, results are shared between every caller that parses the same body, and should be treated as
+read-only.
+'''
+
+DEFAULT_PARSE_MAX_ENTRIES = 4096
+
+def fingerprint(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+class ParseMemo:
+    def __init__(self, max_entries=DEFAULT_PARSE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Returns what parse(text) returned for the last body with the same fingerprint, calling it if there is none
+    def parse(self, kind, text, parse):
+        key = (kind, fingerprint(text))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = parse(text)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self._entries)}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -1,3 +1,4 @@
+from .slots import slot_dict
 import base64
 import json
 
@@ -14,6 +15,8 @@ is_concurrent:      (boolean)       Whether or not the course yields concurrent
 is_multi_listed:    (boolean)       Whether or not the course is offered jointly with another department (see https://www.registrar.ucla.edu/Academics/Course-Descriptions/Course-Numbering-and-Description-Guide)
 '''
 class Course:
+    __slots__ = ('subj_area', 'ctlg_no', 'seq_no', 'title', 'desc', 'units', 'is_concurrent', 'is_multi_listed', '_cached_ids')
+
     def __init__(self):
         self.subj_area = ''
         self.ctlg_no = ''
@@ -23,6 +26,7 @@ class Course:
         self.units = ''
         self.is_concurrent = False
         self.is_multi_listed = False
+        self._cached_ids = None
 
     '''
     The schedule of classes backend requires a query with a JSON Object to request the sections of a course
@@ -46,22 +50,26 @@ class Course:
     }
     '''
     def to_jsons(self, term: str):
+        jsons = self._identifiers()[4]
+        if term not in jsons:
+            jsons[term] = json.dumps(self._query_model(term))
+        return jsons[term]
+
+    def _query_model(self, term):
         class_flag = 'n'
         if self.is_multi_listed: class_flag = 'y'
-        return json.dumps(
-            {
-                'Term': term,
-                'SubjectAreaCode': self.subj_area,
-                'CatalogNumber': self.get_full_ctlg_no(),
-                'IsRoot': True,
-                'SessionGroup': '%',
-                'ClassNumber': '%',
-                'SequenceNumber': None,
-                'Path': self.get_path(),
-                'MultiListedClassFlag': class_flag,
-                'Token': self.get_token()
-            }
-        )
+        return {
+            'Term': term,
+            'SubjectAreaCode': self.subj_area,
+            'CatalogNumber': self.get_full_ctlg_no(),
+            'IsRoot': True,
+            'SessionGroup': '%',
+            'ClassNumber': '%',
+            'SequenceNumber': None,
+            'Path': self.get_path(),
+            'MultiListedClassFlag': class_flag,
+            'Token': self.get_token()
+        }
 
     '''
     The schedule of classes backend requires a token to request the sections of a course
@@ -90,11 +98,26 @@ class Course:
         if self.subj_area == '' or self.ctlg_no == '':
             raise ValueError
         else:
-            unencoded_token = self.get_full_ctlg_no() + self.get_path()
+            return self._identifiers()[3]
 
-            unencoded_bytes = unencoded_token.encode('utf-8')
-            base64_token_bytes = base64.standard_b64encode(unencoded_bytes)
-            return base64_token_bytes.decode('utf-8')
+    '''
+    The padded catalog number, path, token and the query model JSON of every term are derived from the identifying
+    fields of the course. They are cached as a tuple of
+    
+        (identifying fields, full catalog number, path, token, {term: query model JSON})
+    
+    which is rebuilt whenever one of the identifying fields no longer matches.
+    '''
+    def _identifiers(self):
+        key = (self.subj_area, self.ctlg_no, self.seq_no, self.is_concurrent, self.is_multi_listed)
+        if self._cached_ids is None or self._cached_ids[0] != key:
+            padded_ctlg_no = self.get_padded_ctlg_no()
+            padded_seq_no = self._get_padded_seq_no()
+            padded_conventions = self._get_padded_conventions()
+            full_ctlg_no = padded_ctlg_no + padded_seq_no + padded_conventions
+            path = self._get_unspaced_subj_area() + padded_ctlg_no + padded_seq_no.strip() + padded_conventions.strip()
+            self._cached_ids = (key, full_ctlg_no, path, _encode_token(full_ctlg_no + path), {})
+        return self._cached_ids
 
     def get_padded_ctlg_no(self):
         return self.ctlg_no.zfill(4)
@@ -127,10 +150,15 @@ class Course:
         return self.subj_area.replace(' ', '')
 
     def get_full_ctlg_no(self):
-        return self.get_padded_ctlg_no() + self._get_padded_seq_no() + self._get_padded_conventions()
+        return self._identifiers()[1]
 
     def get_path(self):
-        return self._get_unspaced_subj_area() + self.get_padded_ctlg_no() + self._get_padded_seq_no().strip() + self._get_padded_conventions().strip()
+        return self._identifiers()[2]
 
     def __str__(self):
-        return str(self.__class__) + ": " + str(self.__dict__)
\ No newline at end of file
+        return str(self.__class__) + ": " + str(slot_dict(self))
+
+def _encode_token(unencoded_token):
+    unencoded_bytes = unencoded_token.encode('utf-8')
+    base64_token_bytes = base64.standard_b64encode(unencoded_bytes)
+    return base64_token_bytes.decode('utf-8')
@@ -1,29 +1,133 @@
 from . import Course
-import base64
+from .course import _encode_token
+from .slots import slot_dict
+from datetime import date
 import json
+import time
 
 '''
 Model for objects that start and end in the space-time continuum
 
+days            (int)           Bitmask of the days the event takes place (see DAY_BITS)
+start_minute    (int)           Minutes since midnight at which the event starts, or None if it has no set time
+end_minute      (int)           Minutes since midnight at which the event ends, or None if it has no set time
+location        (string)        Location of the event
+
+The following are derived from the fields above, and may still be assigned to:
+
 meet_days       (List[string])  A list containing the days the event takes place (Abbreviations are M: Monday, T: Tuesday, W: Wednesday, R: Thursday, F: Friday)
 start_time      (int)           Unix timestamp containing the start time (If only a time, such as for a section rather than a final, disregard date portion when parsing)
 end_time        (int)           Unix timestamp containing the end time
-location        (string)        Location of the event
 '''
 
+DAY_BITS = {'M': 1, 'T': 2, 'W': 4, 'R': 8, 'F': 16, 'S': 32, 'U': 64}
+
+def days_to_mask(days):
+    mask = 0
+    for day in days:
+        for abbreviation in day:
+            mask |= DAY_BITS[abbreviation]
+    return mask
+
+def mask_to_days(mask):
+    return [day for day, bit in DAY_BITS.items() if mask & bit]
+
 class Event:
+    __slots__ = ('days', 'start_minute', 'end_minute', 'location')
+
     def __init__(self):
-        self.meet_days = []
-        self.start_time = ''
-        self.end_time = ''
+        self.days = 0
+        self.start_minute = None
+        self.end_minute = None
         self.location = ''
 
+    # Whether both events meet at the same time on at least one common day
+    def overlaps(self, other):
+        return (self.days & other.days != 0 and self.start_minute is not None and other.start_minute is not None
+                and self.start_minute < other.end_minute and other.start_minute < self.end_minute)
+
+    # Whether other only meets on days and at times that this event also meets
+    def contains(self, other):
+        return (other.days & ~self.days == 0 and self.start_minute is not None and other.start_minute is not None
+                and self.start_minute <= other.start_minute and other.end_minute <= self.end_minute)
+
+    @property
+    def meet_days(self):
+        return mask_to_days(self.days)
+
+    @meet_days.setter
+    def meet_days(self, meet_days):
+        self.days = days_to_mask(meet_days)
+
+    @property
+    def start_time(self):
+        return self._timestamp(self.start_minute)
+
+    @start_time.setter
+    def start_time(self, timestamp):
+        self.start_minute = self._minute(timestamp)
+
+    @property
+    def end_time(self):
+        return self._timestamp(self.end_minute)
+
+    @end_time.setter
+    def end_time(self, timestamp):
+        self.end_minute = self._minute(timestamp)
+
+    # Sections have no date, so their timestamps fall on the first day of 1970
+    def _timestamp(self, minute):
+        if minute is None:
+            return ''
+        return time.mktime((1970, 1, 1, minute // 60, minute % 60, 0, 0, 1, -1))
+
+    def _minute(self, timestamp):
+        if timestamp == '' or timestamp is None:
+            return None
+        local = time.localtime(timestamp)
+        return local.tm_hour * 60 + local.tm_min
+
+'''
+Model for finals. Finals take place once, on date (a datetime.date), so they only overlap finals on the same date, and
+their meet_days is the abbreviation of that one day rather than a list.
+'''
 class Final(Event):
+    __slots__ = ('date',)
+
     def __init__(self):
         super().__init__()
+        self.date = None
+
+    def overlaps(self, other):
+        if isinstance(other, Final) and self.date != other.date:
+            return False
+        return super().overlaps(other)
+
+    def contains(self, other):
+        if isinstance(other, Final) and self.date != other.date:
+            return False
+        return super().contains(other)
+
+    @property
+    def meet_days(self):
+        return ''.join(mask_to_days(self.days))
+
+    @meet_days.setter
+    def meet_days(self, meet_days):
+        self.days = days_to_mask(meet_days)
+
+    def _timestamp(self, minute):
+        if minute is None or self.date is None:
+            return ''
+        return time.mktime((self.date.year, self.date.month, self.date.day, minute // 60, minute % 60, 0, 0, 1, -1))
+
+    def _minute(self, timestamp):
+        if timestamp != '' and timestamp is not None:
+            self.date = date.fromtimestamp(timestamp)
+        return super()._minute(timestamp)
 
     def __str__(self):
-        return str(self.__class__) + ": " + str(self.__dict__)
+        return str(self.__class__) + ": " + str(slot_dict(self))
 
 '''
 Model for course sections (lectures, discussions, and labs). A subclass of the Event type.
@@ -47,8 +151,37 @@ grade_type:     (string)        Whether the class is P/NP, Letter Graded, or Not
 notes:          (List[string])        Notes specified by the department or registrar
 children:       (List[Section]) Children sections (e.g Discussion or lab sections for lectures)
 last_updated:   (int)           Unix timestamp for which enrolled and waitlisted was accurate
+
+restrictions, webpage, grade_type, final and notes come from a separate request per section. When sections are parsed
+with lazy details, they are only requested the first time one of them is read (see sectionparser._DetailLoader).
 '''
+def _lazy_detail(name):
+    attr = '_' + name
+
+    def getter(self):
+        loader = self._detail_loader
+        if loader is not None:
+            loader.load(self)
+        return getattr(self, attr)
+
+    def setter(self, value):
+        setattr(self, attr, value)
+
+    return property(getter, setter)
+
 class Section(Event):
+    __slots__ = (
+        'course', 'id', 'sec_no', 'term', 'type', 'enrollable', 'waitlistable', 'enrolled', 'enrolled_max', 'waitlisted',
+        'waitlisted_max', 'instructors', '_detail_loader', '_restrictions', '_webpage', '_grade_type', '_final', '_notes',
+        'children', 'last_updated', '_cached_ids'
+    )
+
+    restrictions = _lazy_detail('restrictions')
+    webpage = _lazy_detail('webpage')
+    grade_type = _lazy_detail('grade_type')
+    final = _lazy_detail('final')
+    notes = _lazy_detail('notes')
+
     def __init__(self):
         super().__init__()
         self.course = None
@@ -63,6 +196,7 @@ class Section(Event):
         self.waitlisted = 0
         self.waitlisted_max = 0
         self.instructors = []
+        self._detail_loader = None
         self.final = None
         self.restrictions = ''
         self.webpage = ''
@@ -70,17 +204,10 @@ class Section(Event):
         self.notes = []
         self.children = []
         self.last_updated = 0
+        self._cached_ids = None
 
     def to_jsons(self):
-        json_obj = json.loads(self.course.to_jsons(self.term))
-        json_obj['IsRoot'] = False
-        json_obj['SessionGroup'] = None
-        json_obj['ClassNumber'] = self.sec_no
-        json_obj['SequenceNumber'] = '1'
-        json_obj['Path'] = self._get_path()
-        json_obj['Token'] = self.get_token()
-
-        return json.dumps(json_obj)
+        return self._identifiers()[3]
 
     '''
     See course.py for full documentation on how the UCLA Registrar formats its tokens
@@ -96,14 +223,38 @@ class Section(Event):
         if self.course.subj_area == '' or self.course.ctlg_no == '':
             raise ValueError
         else:
-            unencoded_token = self.course.get_full_ctlg_no() + self._get_path()
-            unencoded_token_bytes = unencoded_token.encode('utf-8')
-            base64_token = base64.standard_b64encode(unencoded_token_bytes)
-            return base64_token.decode('utf-8')
+            return self._identifiers()[2]
+
+    '''
+    Like Course._identifiers, caches (identifying fields, path, token, query model JSON), rebuilt whenever the section's
+    ID, section number, term or the identifying fields of its course change.
+
+    The query model is the course's, with the fields that select this section's children replaced.
+    '''
+    def _identifiers(self):
+        course_ids = self.course._identifiers()
+        key = (self.id, self.sec_no, self.term, course_ids[0])
+        if self._cached_ids is None or self._cached_ids[0] != key:
+            path = self._get_path()
+            token = _encode_token(course_ids[1] + path)
+            query_model = self.course._query_model(self.term)
+            query_model['IsRoot'] = False
+            query_model['SessionGroup'] = None
+            query_model['ClassNumber'] = self.sec_no
+            query_model['SequenceNumber'] = '1'
+            query_model['Path'] = path
+            query_model['Token'] = token
+            self._cached_ids = (key, path, token, json.dumps(query_model))
+        return self._cached_ids
 
     def _get_path(self):
         # This feels so dirty
         return self.id + "_" + self.course.get_path()
 
+    # Details that have not been loaded yet are shown as they are, without loading them
     def __str__(self):
-        return str(self.__class__) + ": " + str(self.__dict__)
+        fields = {}
+        for name, value in slot_dict(self, private=True).items():
+            if name not in ('_detail_loader', '_cached_ids'):
+                fields[name.lstrip('_')] = value
+        return str(self.__class__) + ": " + str(fields)
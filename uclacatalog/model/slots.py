@@ -0,0 +1,12 @@
+'''
+Helpers for the models, which declare their attributes in __slots__ rather than carrying a per-instance __dict__.
+'''
+
+# Returns a dictionary of the attributes of a slotted object, like __dict__ would for a regular one
+def slot_dict(obj, private=False):
+    out = {}
+    for cls in reversed(type(obj).__mro__):
+        for name in getattr(cls, '__slots__', ()):
+            if (private or not name.startswith('_')) and hasattr(obj, name):
+                out[name] = getattr(obj, name)
+    return out
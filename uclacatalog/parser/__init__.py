@@ -1,2 +1,3 @@
+from . import backends
 from . import catalogparser
 from . import sectionparser
\ No newline at end of file
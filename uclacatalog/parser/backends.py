@@ -0,0 +1,258 @@
+from bs4 import BeautifulSoup, Comment, NavigableString, Tag
+from lxml import etree
+import lxml.html
+import re
+from uclacatalog import instrument
+from uclacatalog.memo import ParseMemo
+
+'''
+Backends that pull the raw text of every field the parsers need out of the registrar's pages.
+
+catalogparser and sectionparser only ever deal with the plain dictionaries returned here, so the way the HTML is
+searched can be swapped without touching how models are populated. Two backends are available:
+
+- 'lxml' (default): walks the lxml tree directly with precompiled XPath expressions
+- 'bs4':            the original BeautifulSoup implementation, kept as a fallback
+
+Every value returned by a backend is a plain Python str, list, dict or None, detached from the tree it was read from,
+so that parsed models never keep a whole page alive. Every backend returns the following structures:
+
+course fields:      {'head': <h3 text>, 'units': <first p text>, 'desc': <second p text>, 'div': <division or None>}
+section fields:     {'id': <id attribute of the row's first div>, 'type': <sectionColumn text>, 'label': <hide-above-small text>,
+                     'status': <statusColumn text>, 'waitlist': <waitlistColumn text>, 'time': <timeColumn text>,
+                     'location': <locationColumn text>, 'instructors': <List of instructor lines>}
+detail fields:      {'restrictions': <text or None>, 'webpage': <text>, 'grade_type': <text>,
+                     'final': <List of texts of the final exam row's divs>, 'notes': <List of note texts>}
+'''
+
+class SoupBackend:
+    name = 'bs4'
+
+    # Returns the fields of every course in divs (in order), or of every course on the page if divs is None
+    def parse_courses(self, text, divs=None):
+        resp_soup = self._build_tree(text)
+        if divs is None:
+            return [self._course_fields(course_soup, None) for course_soup in resp_soup.find_all('div', class_='media-body')]
+        out = []
+        for div in divs:
+            # Divisions without courses may be left out of the page altogether
+            div_soup = resp_soup.find('div', {'id': div})
+            if div_soup is not None:
+                out.extend(self._course_fields(course_soup, div) for course_soup in div_soup.find_all('div', class_='media-body'))
+        return out
+
+    # Returns the fields of every section on a GetCourseSummary page, or None if the page lists no sections
+    def parse_sections(self, text):
+        sections_soup = self._build_tree(text).find('div', {'id': re.compile('\\d*-children')})
+        if sections_soup is None:
+            return None
+        return [self._section_fields(section_soup) for section_soup in sections_soup.find_all('div', class_='class-info')]
+
+    def parse_detail(self, text):
+        detail_soup = self._build_tree(text)
+        restrictions_soup = detail_soup.find('div', class_='enrollment_restrictions_content')
+        grade_type_soup = detail_soup.find('div', class_='grade_type_content').find_all('p')
+        final_soup = detail_soup.find('div', class_='final_exam_content').find('div', class_='data-row').find_all('div')
+        return {
+            'restrictions': None if restrictions_soup is None else restrictions_soup.text,
+            'webpage': grade_type_soup[1].find('span', class_='grade_type_content_text').text,
+            'grade_type': grade_type_soup[2].find('span', class_='grade_type_content_text').text,
+            'final': [x.text for x in final_soup],
+            'notes': [note.text for note in detail_soup.find('div', 'class_notes_content').find_all('li')]
+        }
+
+    def _build_tree(self, text):
+        started = instrument.start()
+        soup = BeautifulSoup(text, 'lxml')
+        instrument.parse(instrument.TREE_BUILD, started)
+        return soup
+
+    def _course_fields(self, course_soup, div):
+        p_soup = course_soup.find_all('p')
+        return {'head': course_soup.h3.text, 'units': p_soup[0].text, 'desc': p_soup[1].text, 'div': div}
+
+    def _section_fields(self, section_soup):
+        type_soup = section_soup.find('div', class_='sectionColumn')
+        instructor_soup = section_soup.find('div', class_='instructorColumn')
+        return {
+            'id': section_soup.div['id'],
+            'type': type_soup.text,
+            'label': type_soup.find('div', class_='hide-above-small').text,
+            'status': section_soup.find('div', class_='statusColumn').text,
+            'waitlist': section_soup.find('div', class_='waitlistColumn').text,
+            'time': section_soup.find('div', class_='timeColumn').text,
+            'location': section_soup.find('div', class_='locationColumn').text,
+            'instructors': self._instructors(instructor_soup.p)
+        }
+
+    # Copies the lines out of the tree, since NavigableStrings reference the whole parsed page
+    def _instructors(self, p_soup):
+        out = []
+        for x in p_soup.contents:
+            if isinstance(x, Tag):
+                if x.name != 'br':
+                    out.append(x.get_text())
+            elif isinstance(x, NavigableString) and not isinstance(x, Comment):
+                out.append(str(x))
+        return out
+
+
+'''
+XPath equivalents of the BeautifulSoup searches above. A BeautifulSoup class_ search matches any one of an element's
+classes, which is what _has_class reproduces, and BeautifulSoup's .text is lxml's text_content().
+'''
+def _has_class(cls):
+    return "contains(concat(' ', normalize-space(@class), ' '), ' %s ')" % cls
+
+def _first(elements):
+    return elements[0] if len(elements) > 0 else None
+
+class LxmlBackend:
+    name = 'lxml'
+
+    _ALL_COURSES = etree.XPath('//div[%s]' % _has_class('media-body'))
+    _DIV_COURSES = etree.XPath("(//div[@id = $div])[1]//div[%s]" % _has_class('media-body'))
+    _FIRST_H3 = etree.XPath('(.//h3)[1]')
+    _PARAGRAPHS = etree.XPath('.//p')
+
+    _SECTIONS_CONTAINER = etree.XPath("(//div[contains(@id, '-children')])[1]")
+    _SECTION_ROWS = etree.XPath('.//div[%s]' % _has_class('class-info'))
+    _FIRST_DIV = etree.XPath('(.//div)[1]')
+    _COLUMN = etree.XPath('(.//div[contains(concat(" ", normalize-space(@class), " "), concat(" ", $cls, " "))])[1]')
+    _FIRST_P = etree.XPath('(.//p)[1]')
+
+    _SPAN_TEXT = etree.XPath('(.//span[%s])[1]' % _has_class('grade_type_content_text'))
+    _DIVS = etree.XPath('.//div')
+    _ITEMS = etree.XPath('.//li')
+
+    def parse_courses(self, text, divs=None):
+        root = self._build_tree(text)
+        if divs is None:
+            return [self._course_fields(course, None) for course in self._ALL_COURSES(root)]
+        out = []
+        for div in divs:
+            out.extend(self._course_fields(course, div) for course in self._DIV_COURSES(root, div=div))
+        return out
+
+    def parse_sections(self, text):
+        container = _first(self._SECTIONS_CONTAINER(self._build_tree(text)))
+        if container is None:
+            return None
+        return [self._section_fields(row) for row in self._SECTION_ROWS(container)]
+
+    def parse_detail(self, text):
+        root = self._build_tree(text)
+        restrictions = self._column(root, 'enrollment_restrictions_content')
+        grade_type = self._PARAGRAPHS(self._column(root, 'grade_type_content'))
+        final = self._column(self._column(root, 'final_exam_content'), 'data-row')
+        return {
+            'restrictions': None if restrictions is None else restrictions.text_content(),
+            'webpage': self._SPAN_TEXT(grade_type[1])[0].text_content(),
+            'grade_type': self._SPAN_TEXT(grade_type[2])[0].text_content(),
+            'final': [x.text_content() for x in self._DIVS(final)],
+            'notes': [note.text_content() for note in self._ITEMS(self._column(root, 'class_notes_content'))]
+        }
+
+    def _build_tree(self, text):
+        started = instrument.start()
+        try:
+            root = lxml.html.document_fromstring(text)
+        except etree.ParserError:
+            # Empty documents have no root to search
+            root = lxml.html.Element('html')
+        instrument.parse(instrument.TREE_BUILD, started)
+        return root
+
+    def _column(self, element, cls):
+        return _first(self._COLUMN(element, cls=cls))
+
+    def _course_fields(self, course, div):
+        paragraphs = self._PARAGRAPHS(course)
+        return {
+            'head': self._FIRST_H3(course)[0].text_content(),
+            'units': paragraphs[0].text_content(),
+            'desc': paragraphs[1].text_content(),
+            'div': div
+        }
+
+    def _section_fields(self, row):
+        type_column = self._column(row, 'sectionColumn')
+        return {
+            'id': self._FIRST_DIV(row)[0].get('id'),
+            'type': type_column.text_content(),
+            'label': self._column(type_column, 'hide-above-small').text_content(),
+            'status': self._column(row, 'statusColumn').text_content(),
+            'waitlist': self._column(row, 'waitlistColumn').text_content(),
+            'time': self._column(row, 'timeColumn').text_content(),
+            'location': self._column(row, 'locationColumn').text_content(),
+            'instructors': self._instructors(self._FIRST_P(self._column(row, 'instructorColumn'))[0])
+        }
+
+    # Mirrors the contents of the instructor paragraph, without the <br> separators
+    def _instructors(self, p):
+        out = []
+        if p.text is not None:
+            out.append(p.text)
+        for child in p:
+            if child.tag != 'br' and isinstance(child.tag, str):
+                out.append(child.text_content())
+            if child.tail is not None:
+                out.append(child.tail)
+        return out
+
+
+_BACKENDS = {
+    SoupBackend.name: SoupBackend(),
+    LxmlBackend.name: LxmlBackend()
+}
+_backend = _BACKENDS[LxmlBackend.name]
+
+# Selects the backend used by the parsers, either by name ('lxml' or 'bs4') or by passing a backend object
+def set_backend(backend):
+    global _backend
+    if isinstance(backend, str):
+        if backend not in _BACKENDS:
+            raise ValueError(backend + ' is not a known parser backend!')
+        backend = _BACKENDS[backend]
+    _backend = backend
+
+def get_backend(name=None):
+    if name is None:
+        return _backend
+    return _BACKENDS[name]
+
+_parse_memo = ParseMemo()
+
+'''
+Installs the memo.ParseMemo that the functions below keep the fields of every page in, so that a page whose body has
+not changed since it was last parsed is not parsed again. Pass None to parse every page.
+'''
+def set_parse_memo(parse_memo):
+    global _parse_memo
+    _parse_memo = parse_memo
+
+def get_parse_memo():
+    return _parse_memo
+
+'''
+What the parsers call: the same as the methods of the selected backend, memoized by the parse memo if there is one.
+The fields returned are shared with every other caller that parsed the same body, and must not be modified.
+'''
+def parse_courses(text, divs=None):
+    backend = _backend
+    kind = ('courses', backend.name, None if divs is None else tuple(divs))
+    return _memoized(kind, lambda text: backend.parse_courses(text, divs), text)
+
+def parse_sections(text):
+    backend = _backend
+    return _memoized(('sections', backend.name), backend.parse_sections, text)
+
+def parse_detail(text):
+    backend = _backend
+    return _memoized(('detail', backend.name), backend.parse_detail, text)
+
+def _memoized(kind, parse, text):
+    parse_memo = _parse_memo
+    if parse_memo is None:
+        return parse(text)
+    return parse_memo.parse(kind, text, parse)
@@ -1,52 +1,142 @@
-from typing import List
+from typing import Dict, Iterator, List
 from uclacatalog.model import Course
-from uclacatalog import api
-from bs4 import BeautifulSoup
+from uclacatalog import api, instrument
+from uclacatalog.parser import backends
+import bisect
 import re
 
 '''
 Parser for responses from https://www.registrar.ucla.edu/Academics/Course-Descriptions/Course-Details
 '''
 
-def parse_catalog(resp: str, subj_area: str, div: str) -> List[Course]:
-    if div == api.ALL_DIV: 
-        return _get_all_div(resp, subj_area)
-    else: 
-        return _parse_course_list(resp, subj_area, div)
+# The C and M conventions in front of a catalog number prefix, and the rest of the prefix
+PREFIX_PATTERN = re.compile('(C?)(M?)(.*)')
 
+# div may be a single division, api.ALL_DIV, or a list of divisions
+def parse_catalog(resp: str, subj_area: str, div) -> List[Course]:
+    return _parse_course_lists(resp, subj_area, _expand_divs(div))
+
+# Lazy version of parse_catalog: the fields of the page are extracted right away, and each course is populated as it is consumed
+def iter_catalog(resp: str, subj_area: str, div) -> Iterator[Course]:
+    courses_fields = backends.parse_courses(resp.text, _expand_divs(div))
+    return (_populate_course(course_fields, subj_area) for course_fields in courses_fields)
+
+# Returns the courses of the page whose catalog number matches ctlg_no exactly (see CourseIndex.find)
 def find_course(resp: str, subj_area: str, ctlg_no: str) -> List[Course]:
-    resp_soup = BeautifulSoup(resp.text, 'lxml')
-    courses_soup = resp_soup.find_all('div', class_='media-body')
-    matched_courses = []
-    for course_soup in courses_soup:
-        course_head_soup = course_soup.h3
-        if ctlg_no in course_head_soup.text:
-            course = _populate_course(course_soup, subj_area)
-            matched_courses.append(course)
-    return matched_courses
-
-
-# TODO: Implement getting all divisions' courses asynchronously
-# TODO: Perhaps also implement a more general function that takes in the response, subject area, and an array of divisions
-def _get_all_div(resp, subj_area):
-    return _parse_course_list(resp, subj_area, api.LOWER_DIV) + _parse_course_list(resp, subj_area, api.UPPER_DIV) + _parse_course_list(resp, subj_area, api.GRAD_DIV)
-
-def _parse_course_list(resp, subj_area, div):
-    course_list = []
-    resp_soup = BeautifulSoup(resp.text, 'lxml')
-    courses_soup = resp_soup.find('div', {'id': div}).find_all('div', class_='media-body')
-    for course_soup in courses_soup:
-        course = _populate_course(course_soup, subj_area)
-        course_list.append(course)
+    return parse_index(resp, subj_area).find(ctlg_no)
+
+'''
+Parses every division of the page at once into a CourseIndex. The fields of the page are memoized like those of
+parse_catalog (see backends.set_parse_memo), but the courses are built anew on every call, so they may be modified.
+'''
+def parse_index(resp: str, subj_area: str) -> 'CourseIndex':
+    started = instrument.start()
+    index = _index_courses(backends.parse_courses(resp.text, _expand_divs(api.ALL_DIV)), subj_area)
+    instrument.parse(instrument.COURSE_EXTRACTION, started, len(index))
+    return index
+
+# Builds the CourseIndex of a subject area out of the course fields of all its divisions (see backends.py)
+def _index_courses(courses_fields, subj_area):
+    divisions = {div: [] for div in _expand_divs(api.ALL_DIV)}
+    for course_fields in courses_fields:
+        divisions[course_fields['div']].append(_populate_course(course_fields, subj_area))
+    return CourseIndex(divisions)
+
+'''
+The courses of one subject area, split by division and indexed by normalized catalog number.
+
+Catalog numbers are normalized with the same rules used to parse course heads (see _match_ctlg_no_components): the
+number loses its zero padding and the sequence number and C/M conventions are kept separate, so '0031A', '31A' and
+'31a' are the same key, while '31' never matches '131', 'M31' or a title containing '31'.
+'''
+class CourseIndex:
+    def __init__(self, divisions: Dict[str, List[Course]]):
+        self.divisions = divisions
+        self._exact = {}
+        self._numbers = {}
+        for course in self.courses():
+            number = _normalize_number(course.ctlg_no) + course.seq_no
+            self._exact.setdefault((number, course.is_concurrent, course.is_multi_listed), []).append(course)
+            self._numbers.setdefault(number, []).append(course)
+        self._sorted_numbers = sorted(self._numbers)
+
+    # The parse_catalog equivalent: courses of the division, api.ALL_DIV or list of divisions, in page order
+    def courses(self, div = None) -> List[Course]:
+        if div is None:
+            div = api.ALL_DIV
+        course_list = []
+        for d in _expand_divs(div):
+            course_list.extend(self.divisions[d])
+        return course_list
+
+    '''
+    Returns the courses whose catalog number, including its C and M conventions, is exactly ctlg_no: '31' finds 31 but
+    not M31. If ignore_conventions is True, C and M are disregarded on both sides, so '151B' finds C151B and M151B.
+    '''
+    def find(self, ctlg_no: str, ignore_conventions: bool = False) -> List[Course]:
+        components = _match_query(ctlg_no)
+        if components is None:
+            return []
+        number = _normalize_number(_extract_ctlg_no(components)) + _extract_seq_no(components)
+        if ignore_conventions:
+            return list(self._numbers.get(number, []))
+        key = (number, _extract_is_concurrent(components), _extract_is_multi_listed(components))
+        return list(self._exact.get(key, []))
+
+    '''
+    Returns the courses whose normalized catalog number starts with prefix, e.g '31' finds 31A and 31B. C and M in front
+    of prefix only keep the courses with those conventions ('M1' finds M10 and CM121 but not 10), and without them any
+    convention matches ('1' finds 10, M10 and CM121).
+    '''
+    def find_prefix(self, prefix: str) -> List[Course]:
+        is_concurrent, is_multi_listed, number = PREFIX_PATTERN.fullmatch(prefix.strip().upper()).groups()
+        number = number.lstrip('0')
+        start = bisect.bisect_left(self._sorted_numbers, number)
+        matched_courses = []
+        for key in self._sorted_numbers[start:]:
+            if not key.startswith(number):
+                break
+            matched_courses.extend(course for course in self._numbers[key]
+                                   if (course.is_concurrent or is_concurrent == '') and (course.is_multi_listed or is_multi_listed == ''))
+        return matched_courses
+
+    def __len__(self):
+        return sum(len(course_list) for course_list in self.divisions.values())
+
+def _match_query(ctlg_no):
+    try:
+        return _match_ctlg_no_components(ctlg_no.strip().upper())
+    except IndexError:
+        # ctlg_no doesn't contain a number at all
+        return None
+
+def _normalize_number(ctlg_no):
+    return ctlg_no.lstrip('0') or '0'
+
+def _expand_divs(div):
+    if div == api.ALL_DIV:
+        return [api.LOWER_DIV, api.UPPER_DIV, api.GRAD_DIV]
+    elif isinstance(div, str):
+        return [div]
+    else:
+        return div
+
+'''
+Builds the tree for the page once and collects the courses of every requested division from it, in the order the
+divisions were given.
+'''
+def _parse_course_lists(resp, subj_area, divs):
+    started = instrument.start()
+    course_list = list(iter_catalog(resp, subj_area, divs))
+    instrument.parse(instrument.COURSE_EXTRACTION, started, len(course_list))
     return course_list
-        
 
-def _populate_course(course_soup, subj_area):
+def _populate_course(course_fields, subj_area):
     course = Course()
     course.subj_area = subj_area
-    course.units = _parse_course_units(course_soup)
-    course.desc = _parse_course_desc(course_soup)
-    _parse_head(course, course_soup)
+    course.units = _parse_course_units(course_fields)
+    course.desc = _parse_course_desc(course_fields)
+    _parse_head(course, course_fields)
     return course
 
 
@@ -62,14 +152,14 @@ Noteably:
 
 Therefore, the longest course number is CM999SC, but I haven't been able to find one with all the conventions.
 '''
-def _split_head(course_soup):
-    return course_soup.h3.text.split('. ')
+def _split_head(course_fields):
+    return course_fields['head'].split('. ')
 
 def _match_ctlg_no_components(ctlg_no):
     return re.findall('(C?)(M?)(\\d+)(\\D*)', ctlg_no)[0]
 
-def _parse_head(course, course_soup):
-    head = _split_head(course_soup)
+def _parse_head(course, course_fields):
+    head = _split_head(course_fields)
     ctlg_no = head[0]
 
     '''
@@ -105,8 +195,8 @@ Course units is not always an integer (sometimes the registrar specifies a range
 
 Format on the UCLA page is always 'Units: UNITS [to UNITS]'
 '''
-def _parse_course_units(course_soup):
-    return course_soup.find_all('p')[0].text.split(': ')[1]
+def _parse_course_units(course_fields):
+    return course_fields['units'].split(': ')[1]
 
-def _parse_course_desc(course_soup):
-    return course_soup.find_all('p')[1].text
\ No newline at end of file
+def _parse_course_desc(course_fields):
+    return course_fields['desc']
\ No newline at end of file
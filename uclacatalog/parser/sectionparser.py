@@ -1,92 +1,235 @@
-from bs4 import BeautifulSoup
-from datetime import datetime, date, timedelta
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from functools import lru_cache
+from typing import Iterator, List
 from uclacatalog.model import Course
 from uclacatalog.model import Section, Final
-from uclacatalog import requesthandler
+from uclacatalog.model.section import DAY_BITS, days_to_mask
+from uclacatalog import instrument, requesthandler
+from uclacatalog.parser import backends
 import requests as req
 import re
+import sys
+import threading
 import time
 
 '''
 Parser for responses from https://sa.ucla.edu/ro/public/soc (schedule of classes)
 '''
 
-def parse_sections(resp, course, term) -> List[Section]:
+STATUS_PATTERN = re.compile("(Open|Closed|Waitlist)\\D*((\\d+ of \\d+ Enrolled)|(Class Full \\(\\d+\\))?)")
+NUMBER_PATTERN = re.compile('\\d+')
+DAYS_PATTERN = re.compile("(M+)?(T+)?(W+)?(R+)?(F+)?(S+)?(U+)?")
+SEC_NO_PATTERN = re.compile('(\\D*)(\\d*)')
+TIME_PATTERN = re.compile('(\\d{1,2})(?::(\\d{2}))?([ap]m)', re.IGNORECASE)
+# Finals give their day as a three letter name, which does not always start with its DAY_BITS abbreviation
+FINAL_DAYS = {'Mon': 'M', 'Tue': 'T', 'Wed': 'W', 'Thu': 'R', 'Fri': 'F', 'Sat': 'S', 'Sun': 'U'}
+
+DEFAULT_DETAIL_BATCH_SIZE = 16
+DEFAULT_DETAIL_WORKERS = 8
+
+'''
+If lazy_details is True, no ClassDetailTooltip request is made up front. Each section's restrictions, webpage,
+grade_type, final and notes are instead requested the first time one of them is read (see _DetailLoader).
+'''
+def parse_sections(resp, course, term, max_workers=None, lazy_details=False) -> List[Section]:
+    if lazy_details:
+        return _parse_sections_lazily(resp, course, term, max_workers)
+    if max_workers is not None and max_workers > 1:
+        return _parse_sections_concurrently(resp, course, term, max_workers)
     out = []
     out.extend(_parse_root_sections(resp, course, term))
     for section in out:
         section.children = _parse_leaf_sections(requesthandler.fetch_leaf_sections(section, term), section)
     return out
 
-def _parse_root_sections(resp, course, term):
-    out = []
-    sections_soup = BeautifulSoup(resp.text, 'lxml').find('div', {'id': re.compile('\\d*-children')})
-    if sections_soup is not None:
-        sections_arr = sections_soup.find_all("div", class_="class-info")
-        for i in range(len(sections_arr)):
-            section_soup = sections_arr[i]
-            section = _populate_section(section_soup, course, term)
-            section.sec_no = _parse_sec_no(section_soup)
+'''
+Same as the serial path of parse_sections, except that the leaf section and detail requests are issued on a pool of at
+most max_workers threads. Sections are still created in the order they appear on the page, and details are filled in
+on the already placed objects, so the output and its children are ordered exactly like the serial path.
+'''
+def _parse_sections_concurrently(resp, course, term, max_workers):
+    out = _parse_root_sections(resp, course, term, fetch_details=False)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        detail_futures = [executor.submit(_parse_section_details, section) for section in out]
+        leaf_futures = [executor.submit(requesthandler.fetch_leaf_sections, section, term) for section in out]
+        for section, leaf_future in zip(out, leaf_futures):
+            section.children = _parse_leaf_sections(leaf_future.result(), section, fetch_details=False)
+            detail_futures.extend(executor.submit(_parse_section_details, child) for child in section.children)
+        for detail_future in detail_futures:
+            # Re-raises any exception that happened while fetching a detail
+            detail_future.result()
+    return out
+
+def _parse_sections_lazily(resp, course, term, max_workers):
+    out = _parse_root_sections(resp, course, term, fetch_details=False)
+    if max_workers is not None and max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            leaf_resps = list(executor.map(lambda section: requesthandler.fetch_leaf_sections(section, term), out))
+    else:
+        leaf_resps = [requesthandler.fetch_leaf_sections(section, term) for section in out]
+
+    loader = _DetailLoader(max_workers=max_workers or DEFAULT_DETAIL_WORKERS)
+    for section, leaf_resp in zip(out, leaf_resps):
+        section.children = _parse_leaf_sections(leaf_resp, section, fetch_details=False)
+        loader.add(section)
+        for child in section.children:
+            loader.add(child)
+    return out
+
+'''
+Loads the details of sections parsed with lazy details. When a detail of one section is read, the details of that
+section and of up to batch_size - 1 other pending sections (in parse order) are requested together on a thread pool,
+since callers that read a detail of one section usually go on to read it for the others.
+'''
+class _DetailLoader:
+    def __init__(self, batch_size=DEFAULT_DETAIL_BATCH_SIZE, max_workers=DEFAULT_DETAIL_WORKERS):
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def add(self, section):
+        section._detail_loader = self
+        self._pending[id(section)] = section
+
+    def load(self, section):
+        with self._lock:
+            # Another thread may have loaded this section's batch while we were waiting
+            if section._detail_loader is not self:
+                return
+            batch = [section]
+            for pending in self._pending.values():
+                if len(batch) >= self.batch_size:
+                    break
+                if pending is not section:
+                    batch.append(pending)
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batch))) as executor:
+                detail_resps = list(executor.map(requesthandler.fetch_section_detail, batch))
+            for pending, detail_resp in zip(batch, detail_resps):
+                _populate_section_details(pending, detail_resp)
+                pending._detail_loader = None
+                del self._pending[id(pending)]
+
+'''
+Streaming version of parse_sections. Sections are yielded depth first as soon as their details are parsed: each root
+section is yielded (with an empty children list) before its leaf sections are requested, and every leaf section is
+appended to its parent's children right before it is yielded.
+'''
+def iter_sections(resp, course, term) -> Iterator[Section]:
+    for section in _parse_root_sections(resp, course, term, fetch_details=False):
+        _parse_section_details(section)
+        yield section
+        leaf_resp = requesthandler.fetch_leaf_sections(section, term)
+        for child in _parse_leaf_sections(leaf_resp, section, fetch_details=False):
+            _parse_section_details(child)
+            section.children.append(child)
+            yield child
+
+def _parse_root_sections(resp, course, term, fetch_details=True):
+    started = instrument.start()
+    out = _populate_root_sections(backends.parse_sections(resp.text), course, term)
+    instrument.parse(instrument.ROOT_EXTRACTION, started, len(out))
+    if fetch_details:
+        for section in out:
             _parse_section_details(section)
-            out.append(section)
     return out
 
 # Leaf sections can be both labs or discussions, or just may not exist
-def _parse_leaf_sections(resp, parent):
+def _parse_leaf_sections(resp, parent, fetch_details=True):
+    started = instrument.start()
+    out = _populate_leaf_sections(backends.parse_sections(resp.text), parent)
+    instrument.parse(instrument.LEAF_EXTRACTION, started, len(out))
+    if fetch_details:
+        for section in out:
+            _parse_section_details(section)
+    return out
+
+'''
+The _populate_* functions build models out of the fields extracted by a parser backend (see backends.py), which may
+have been extracted in another process (see pipeline.py).
+'''
+def _populate_root_sections(sections_arr, course, term):
     out = []
-    sections_soup = BeautifulSoup(resp.text, 'lxml').find('div', {'id': re.compile('\\d*-children')})
-    sections_arr = sections_soup.find_all("div", class_="class-info")
-    for section_soup in sections_arr:
-        section = _populate_section(section_soup, parent.course, parent.term)
+    if sections_arr is not None:
+        for section_fields in sections_arr:
+            section = _populate_section(section_fields, course, term)
+            section.sec_no = _parse_sec_no(section_fields)
+            out.append(section)
+    return out
+
+def _populate_leaf_sections(sections_arr, parent):
+    out = []
+    for section_fields in sections_arr or []:
+        section = _populate_section(section_fields, parent.course, parent.term)
         section.sec_no = parent.sec_no
-        _parse_section_details(section)
         out.append(section)
     return out
 
-def _populate_section(section_soup, course, term):
+'''
+Text that repeats across the sections of a term (locations, restrictions, grade types, notes...) is interned, so that
+tens of thousands of sections share one copy of each value.
+
+Every column of the row is read exactly once: the status, waitlist and time columns are matched a single time and the
+resulting groups are handed to the extractors that need them.
+'''
+def _populate_section(section_fields, course, term):
     section = Section()
-    section.id = _parse_id(section_soup)
+    section.id = _parse_id(section_fields)
     section.term = term
-    section.type = _parse_type(section_soup)
-    section.waitlistable = _parse_waitlistable(section_soup)
-    section.enrollable = _parse_enrollable(section_soup)
-    section.enrolled = _parse_enrollment(section_soup)
-    section.enrolled_max = _parse_enrollment_max(section_soup)
-    section.waitlisted = _parse_waitlisted(section_soup)
-    section.waitlisted_max = _parse_waitlisted_max(section_soup)
-    section.meet_days = _parse_days(section_soup)
-    section.start_time = time.mktime(_parse_start(section_soup).timetuple())
-    section.end_time = time.mktime(_parse_end(section_soup).timetuple())
-    section.location = _parse_location(section_soup)
-    section.instructors = _parse_instructors(section_soup)
+    section.type = _parse_type(section_fields)
+    _populate_seats(section, section_fields)
+
+    time_parts = _parse_time(section_fields)
+    start_end = _parse_start_end(time_parts[1])
+    section.days = _parse_days(time_parts[0])
+    section.start_minute = _parse_start(start_end)
+    section.end_minute = _parse_end(start_end)
+
+    section.location = _parse_location(section_fields)
+    section.instructors = _parse_instructors(section_fields)
     section.last_updated = int(time.time())
     section.course = course
     return section
 
+# Sets the enrollment and waitlist fields, which are the only ones refreshed by poller.EnrollmentPoller
+def _populate_seats(section, section_fields):
+    status = _match_status(section_fields)
+    enrollment = _match_enrollment(status)
+    section.waitlistable = _parse_waitlistable(status)
+    section.enrollable = _parse_enrollable(status)
+    section.enrolled = _parse_enrollment(enrollment)
+    section.enrolled_max = _parse_enrollment_max(enrollment)
+
+    waitlisted = _match_waitlisted(section_fields)
+    section.waitlisted = _parse_waitlisted(waitlisted)
+    section.waitlisted_max = _parse_waitlisted_max(waitlisted)
+
 def _parse_section_details(section):
-    detail_resp = requesthandler.fetch_section_detail(section)
-    detail_soup = BeautifulSoup(detail_resp.text, 'lxml')
-    
-    section.restrictions = _parse_detail_restrictions(detail_soup)
-    section.webpage = _parse_detail_webpage(detail_soup)
-    section.grade_type = _parse_detail_gradetype(detail_soup)
-    section.final = _parse_detail_final(detail_soup)
-    section.notes = _parse_detail_notes(detail_soup)
-
-def _parse_id(section_soup):
-    # ID Attribute is in format of ID_subjAreaCLASSNUM; we want to split at '_' and take the first element
-    return section_soup.div['id'].split("_")[0]
+    _populate_section_details(section, requesthandler.fetch_section_detail(section))
+
+def _populate_section_details(section, detail_resp):
+    started = instrument.start()
+    _populate_detail_fields(section, backends.parse_detail(detail_resp.text))
+    instrument.parse(instrument.DETAIL_EXTRACTION, started)
+
+def _populate_detail_fields(section, detail_fields):
+    section.restrictions = _parse_detail_restrictions(detail_fields)
+    section.webpage = _parse_detail_webpage(detail_fields)
+    section.grade_type = _parse_detail_gradetype(detail_fields)
+    section.final = _parse_detail_final(detail_fields)
+    section.notes = _parse_detail_notes(detail_fields)
 
-def _match_status(section_soup):
-    status = section_soup.find("div", class_="statusColumn")
+def _parse_id(section_fields):
+    # ID Attribute is in format of ID_subjAreaCLASSNUM; we want to split at '_' and take the first element
+    return section_fields['id'].split("_")[0]
 
+def _match_status(section_fields):
     # Use regex match groups to seperate openness from class capacity
-    return re.findall("(Open|Closed|Waitlist)\\D*((\\d+ of \\d+ Enrolled)|(Class Full \\(\\d+\\))?)", status.text)[0]
+    return STATUS_PATTERN.search(section_fields['status']).groups('')
 
-def _parse_type(section_soup):
-    type_soup = section_soup.find('div', class_='sectionColumn')
-    sec_type = type_soup.text
+def _parse_type(section_fields):
+    sec_type = section_fields['type']
     if 'Lec' in sec_type:
         return 'lecture'
     elif 'Dis' in sec_type:
@@ -98,161 +241,151 @@ def _parse_type(section_soup):
     else:
         raise ValueError
 
-def _parse_sec_no(section_soup):
-    type_soup = section_soup.find('div', class_='sectionColumn')
-    sec_type = type_soup.find('div', class_='hide-above-small').text.strip()
-    match = re.findall('(\\D*)(\\d*)', sec_type)[0]
+def _parse_sec_no(section_fields):
+    sec_type = section_fields['label'].strip()
+    match = SEC_NO_PATTERN.match(sec_type).groups()
     # Why IT decided to format the section number like this and actually strictly enforce its format on the backend, I have no idea. 
     # The interface is full of bad design decisions like these.
     return str.format(' {0}', str(match[1]).zfill(3))
 
-def _parse_enrollable(section_soup):
-    status = _match_status(section_soup)[0]
-    return status == "Open"
+def _parse_enrollable(status):
+    return status[0] == "Open"
 
-def _parse_waitlistable(section_soup):
-    status = _match_status(section_soup)[0]
-    return status == "Waitlist"
+def _parse_waitlistable(status):
+    return status[0] == "Waitlist"
 
 ''' 
 For matching enrollment and waitlist, we only care about the numbers for matching. 
 
 The result will always either come in a tuple containing (current_num, max_num) or an empty tuple if the course was closed by the department
 '''
-def _match_enrollment(section_soup):
-    enrollment = _match_status(section_soup)[1]
-    return re.findall('\\d+', enrollment)
+def _match_enrollment(status):
+    return NUMBER_PATTERN.findall(status[1])
 
-def _parse_enrollment(section_soup):
-    groups = _match_enrollment(section_soup)
+def _parse_enrollment(groups):
     if len(groups) > 0: 
-        return groups[0]
+        return int(groups[0])
     else:
         return 0
 
-def _parse_enrollment_max(section_soup):
-    groups = _match_enrollment(section_soup)
+def _parse_enrollment_max(groups):
     if len(groups) > 1:
-        return groups[1]
+        return int(groups[1])
     elif len(groups) == 0:
         return 0
     else: 
-        return groups[0]
+        return int(groups[0])
 
-def _match_waitlisted(section_soup):
-    waitlist = section_soup.find("div", class_="waitlistColumn")
-    return re.findall("\\d+", waitlist.text)
+def _match_waitlisted(section_fields):
+    return NUMBER_PATTERN.findall(section_fields['waitlist'])
 
-def _parse_waitlisted(section_soup):
-    groups = _match_waitlisted(section_soup)
+def _parse_waitlisted(groups):
     if len(groups) > 0:
-        return groups[0]
+        return int(groups[0])
     else:
         return 0
 
-def _parse_waitlisted_max(section_soup):
-    groups = _match_waitlisted(section_soup)
+def _parse_waitlisted_max(groups):
     if len(groups) > 1:
-        return groups[1]
+        return int(groups[1])
     elif len(groups) == 0:
         return 0
     else:
-        return groups[0]
-
-def _parse_time(section_soup):
-    time_soup = section_soup.find("div", class_="timeColumn")
+        return int(groups[0])
 
+def _parse_time(section_fields):
     # Text comes in the format DAYS \n TIME, so we split it to give an array of [DAYS, TIME]
-    return time_soup.text.split()
-
-def _parse_days(section_soup):
-    days = _parse_time(section_soup)[0]
-    groups = re.findall("(M+)?(T+)?(W+)?(R+)?(F+)?", days)[0]
-    
-    # Filter for elements that aren't empty strings
-    return list(filter(lambda e: e != '', groups))
-
-def _parse_start_end(section_soup):
-    time = _parse_time(section_soup)[1]
-    return time.split('-') # time_arr is in format of [start_time, end_time]
-
-def _parse_start(section_soup):
-    start_str = _parse_start_end(section_soup)[0]
-    return _parse_time_str(start_str).replace(year=1970)
-
-def _parse_end(section_soup):
-    end_str = _parse_start_end(section_soup)[1]
-    return _parse_time_str(end_str).replace(year=1970)
-
-def _parse_time_str(time_str):
-    if time_str.find(':') > -1:
-        # Time is within the hour
-        return datetime.strptime(time_str, '%I:%M%p')
-    else: 
-        # Time *is* the hour; for some reason UCLA doesn't standardize timestamps and assumes that 12:00 = 12. We will follow this assumption grudgingly.
-        return datetime.strptime(time_str, '%I%p')
+    return section_fields['time'].split()
 
-def _parse_location(section_soup):
-    return section_soup.find("div", class_="locationColumn").text.strip()
-
-def _parse_instructors(section_soup):
-    instructor_soup = section_soup.find("div", class_="instructorColumn")
-    return [x for x in instructor_soup.p.contents if getattr(x, 'name', None) != 'br']
-
-def _parse_detail_restrictions(detail_soup):
-    restrictions_soup = detail_soup.find('div', class_='enrollment_restrictions_content')
-    if restrictions_soup == None:
+'''
+Days, times and dates come from a handful of distinct strings ('MWF', '10am', '12:30pm', ...), so they are parsed once
+each and memoized.
+'''
+@lru_cache(maxsize=None)
+def _parse_days(days):
+    # Returns the bitmask of the days (see model.section.DAY_BITS)
+    return days_to_mask(DAYS_PATTERN.match(days).groups(''))
+
+def _parse_start_end(times):
+    return times.split('-') # time_arr is in format of [start_time, end_time]
+
+def _parse_start(start_end):
+    return _parse_minutes(start_end[0])
+
+def _parse_end(start_end):
+    return _parse_minutes(start_end[1])
+
+@lru_cache(maxsize=None)
+def _parse_minutes(time_str):
+    # Returns the minutes since midnight of a time such as 9am or 12:30pm
+    match = TIME_PATTERN.fullmatch(time_str)
+    if match is None:
+        raise ValueError(time_str + ' is not a valid time!')
+    hour, minute, meridiem = match.groups('0')
+    # When the time *is* the hour, UCLA leaves the minutes out (e.g 12 means 12:00). 12am is midnight and 12pm is noon.
+    hour = int(hour) % 12
+    if meridiem.lower() == 'pm':
+        hour += 12
+    return hour * 60 + int(minute)
+
+def _parse_location(section_fields):
+    return sys.intern(section_fields['location'].strip())
+
+def _parse_instructors(section_fields):
+    return [sys.intern(str(instructor)) for instructor in section_fields['instructors']]
+
+def _parse_detail_restrictions(detail_fields):
+    restrictions = detail_fields['restrictions']
+    if restrictions == None:
         return None
     else:
-        return restrictions_soup.text.strip()
+        return sys.intern(restrictions.strip())
 
-def _parse_detail_webpage(detail_soup):
-    return detail_soup.find('div', class_='grade_type_content').find_all('p')[1].find('span', class_='grade_type_content_text').text.strip()
+def _parse_detail_webpage(detail_fields):
+    return sys.intern(detail_fields['webpage'].strip())
 
-def _parse_detail_gradetype(detail_soup):
-    return detail_soup.find('div', class_='grade_type_content').find_all('p')[2].find('span', class_='grade_type_content_text').text.strip()
+def _parse_detail_gradetype(detail_fields):
+    return sys.intern(detail_fields['grade_type'].strip())
 
-def _parse_detail_final(detail_soup):
-    final_soup = detail_soup.find('div', class_='final_exam_content').find('div', class_='data-row').find_all('div')
-    if final_soup[0].text == 'None listed':
+def _parse_detail_final(detail_fields):
+    final_fields = detail_fields['final']
+    if final_fields[0] == 'None listed':
         return None
     else:
         final = Final()
-        final.meet_days = _parse_final_day(final_soup)
-        final.start_time = time.mktime(_parse_final_start(final_soup).timetuple())
-        final.end_time = time.mktime(_parse_final_end(final_soup).timetuple())
-        final.location = _parse_final_location(final_soup)
+        final.days = _parse_final_day(final_fields)
+        final.date = _parse_final_date(final_fields)
+        final.start_minute = _parse_final_start(final_fields)
+        final.end_minute = _parse_final_end(final_fields)
+        final.location = _parse_final_location(final_fields)
         return final
 
-def _parse_final_day(final_soup):
-    day = final_soup[3].text
-    if (day == 'Thu'):
-        return 'R'
-    else:
-        return day[0]
+def _parse_final_day(final_fields):
+    day = final_fields[3]
+    if day not in FINAL_DAYS:
+        raise ValueError(day + ' is not a valid day!')
+    return DAY_BITS[FINAL_DAYS[day]]
+
+def _parse_final_date(final_fields):
+    return _parse_date(final_fields[0])
 
-def _parse_final_start(final_soup):
-    date = final_soup[0].text
-    time = final_soup[4].text.split('-')[0]
-    return _parse_final_datetime(date, time)
+@lru_cache(maxsize=None)
+def _parse_date(date_str):
+    # Dates are in the format MM/DD/YYYY
+    month, day, year = date_str.split('/')
+    return date(int(year), int(month), int(day))
 
-def _parse_final_end(final_soup):
-    date = final_soup[0].text
-    time = final_soup[4].text.split('-')[1]
-    return _parse_final_datetime(date, time)
+def _parse_final_start(final_fields):
+    return _parse_minutes(final_fields[4].split('-')[0])
 
-def _parse_final_location(final_soup):
-    return final_soup[5].text
+def _parse_final_end(final_fields):
+    return _parse_minutes(final_fields[4].split('-')[1])
 
-def _parse_final_datetime(date, time):
-    time = _parse_time_str(time)
-    date = datetime.strptime(date, '%m/%d/%Y')
-    delta = timedelta(hours=time.hour, minutes=time.minute, seconds=time.second)
-    return date + delta
+def _parse_final_location(final_fields):
+    return sys.intern(final_fields[5])
 
-def _parse_detail_notes(detail_soup):
-    notes_soup = detail_soup.find('div', 'class_notes_content').find_all('li')
+def _parse_detail_notes(detail_fields):
     out = []
-    for note in notes_soup:
-        out.append(note.text.strip())
+    for note in detail_fields['notes']:
+        out.append(sys.intern(note.strip()))
     return out
\ No newline at end of file
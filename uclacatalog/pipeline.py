@@ -0,0 +1,143 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import multiprocessing
+from typing import Iterable, Iterator, List
+from .crawl import CrawlResult, CrawlStats, SectionsResult
+from .model import Course, Section
+from .parser import backends, catalogparser, sectionparser
+from . import api
+from . import requesthandler
+
+'''
+Crawls that parse on a pool of processes, for crawls large enough to be bound by parsing rather than the network.
+
+Requests are made on a pool of I/O threads as usual, but every page they fetch is handed to a pool of worker processes
+that run the parser backend on it. Backends only return plain dictionaries of strings (see backends.py), so what comes
+back from a worker is cheap to pickle; the Course and Section models are then built from it in this process, with the
+same extractors as the rest of the library. Building the tree and searching it, which is most of the cost of parsing a
+page, is thus spread over every core.
+
+    with pipeline.ParsePipeline(processes=4) as parse_pipeline:
+        for result in parse_pipeline.iter_catalogs():
+            ...
+        for result in parse_pipeline.iter_sections(courses, '20F'):
+            ...
+
+Results are yielded in the order they complete. A subject area or course that fails yields a result carrying its
+exception. Instrumentation hooks (see instrument.py) are not called for the parsing done in worker processes.
+
+This only pays off for large crawls with several cores to spare, and is never the default. Starting the workers takes a
+few tenths of a second, and every page then makes a round trip to a worker and back, so on a single core the pipeline
+is slower than the thread path of api.fetch_all_catalogs: benchmarks/bench_pipeline.py crawls 40 subject areas at 50 ms
+per request in 0.46s with one worker process, against 0.26s on threads alone.
+
+The worker processes are started with the 'spawn' start method by default: they are created from the I/O threads while
+other requests are in flight, and forking a process with running threads can deadlock. As with any spawned process,
+the script creating the pipeline must guard its entry point with if __name__ == '__main__'.
+'''
+
+DEFAULT_IO_WORKERS = 16
+DEFAULT_START_METHOD = 'spawn'
+
+'''
+The functions run in the worker processes. The backend is sent along with every page, so that workers use the backend
+that was selected when the pipeline was created.
+'''
+def _parse_courses(backend, text):
+    return backend.parse_courses(text, catalogparser._expand_divs(api.ALL_DIV))
+
+def _parse_sections(backend, text):
+    return backend.parse_sections(text)
+
+def _parse_detail(backend, text):
+    return backend.parse_detail(text)
+
+class ParsePipeline:
+    # start_method is the multiprocessing start method of the worker processes ('spawn', 'forkserver' or 'fork')
+    def __init__(self, processes: int = None, io_workers: int = DEFAULT_IO_WORKERS, backend=None,
+                 start_method: str = DEFAULT_START_METHOD):
+        self.backend = backend or backends.get_backend()
+        self._processes = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context(start_method))
+        self._io = ThreadPoolExecutor(max_workers=io_workers)
+
+    def close(self):
+        self._io.shutdown(wait=True)
+        self._processes.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Same as api.fetch_all_catalogs, including the use of the catalog memo. div defaults to api.ALL_DIV.
+    def iter_catalogs(self, div = None, subj_areas = None, stats: CrawlStats = None) -> Iterator[CrawlResult]:
+        if div is None:
+            div = api.ALL_DIV
+        if subj_areas is None:
+            subj_areas = sorted(api.LEGAL_SA)
+        if stats is None:
+            stats = CrawlStats()
+        stats.start()
+        futures = {self._io.submit(self._fetch_index, subj_area): subj_area for subj_area in subj_areas}
+        try:
+            for future in as_completed(futures):
+                try:
+                    result = CrawlResult(futures[future], courses=api._copies(future.result().courses(div)))
+                except Exception as e:
+                    result = CrawlResult(futures[future], error=e)
+                stats.record(result)
+                yield result
+        finally:
+            for future in futures:
+                future.cancel()
+
+    # Yields a SectionsResult with the same sections api.fetch_sections would return for each course
+    def iter_sections(self, courses: Iterable[Course], term: str) -> Iterator[SectionsResult]:
+        futures = {self._io.submit(self._fetch_sections, course, term): course for course in courses}
+        try:
+            for future in as_completed(futures):
+                try:
+                    result = SectionsResult(futures[future], sections=future.result())
+                except Exception as e:
+                    result = SectionsResult(futures[future], error=e)
+                yield result
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def _parse(self, func, resp):
+        return self._processes.submit(func, self.backend, resp.text)
+
+    def _fetch_index(self, subj_area):
+        subj_area = subj_area.upper()
+        if subj_area not in api.LEGAL_SA:
+            raise ValueError(subj_area + ' not a legal subject area!')
+        catalog_memo = api.get_catalog_memo()
+        if catalog_memo is not None:
+            index = catalog_memo.get(subj_area)
+            if index is not None:
+                return index
+        courses_fields = self._parse(_parse_courses, requesthandler.fetch_courses(subj_area, api.ALL_DIV)).result()
+        index = catalogparser._index_courses(courses_fields, subj_area)
+        if catalog_memo is not None:
+            catalog_memo.put(subj_area, index)
+        return index
+
+    '''
+    Each page is handed to the workers as soon as it is fetched, so the course's next requests are made while the
+    previous pages are being parsed. Details are filled in on the sections in page order, like the serial path of
+    sectionparser.parse_sections.
+    '''
+    def _fetch_sections(self, course, term) -> List[Section]:
+        root_fields = self._parse(_parse_sections, requesthandler.fetch_root_sections(course, term)).result()
+        out = sectionparser._populate_root_sections(root_fields, course, term)
+        detail_futures = [self._parse(_parse_detail, requesthandler.fetch_section_detail(section)) for section in out]
+        leaf_futures = [self._parse(_parse_sections, requesthandler.fetch_leaf_sections(section, term)) for section in out]
+        for section, detail_future, leaf_future in zip(out, detail_futures, leaf_futures):
+            sectionparser._populate_detail_fields(section, detail_future.result())
+            section.children = sectionparser._populate_leaf_sections(leaf_future.result(), section)
+        leaves = [child for section in out for child in section.children]
+        detail_futures = [self._parse(_parse_detail, requesthandler.fetch_section_detail(section)) for section in leaves]
+        for section, detail_future in zip(leaves, detail_futures):
+            sectionparser._populate_detail_fields(section, detail_future.result())
+        return out
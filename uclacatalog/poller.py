@@ -0,0 +1,225 @@
+from concurrent.futures import ThreadPoolExecutor
+import heapq
+import itertools
+import threading
+import time
+from typing import List
+from .model import Course, Section
+from .parser import backends, sectionparser
+from . import requesthandler
+
+'''
+Keeps the seat counts of already fetched sections up to date during enrollment periods.
+
+Polling a course only re-requests its GetCourseSummary pages: the root summary, and the leaf summary of every root
+section that has children. No ClassDetailTooltip request is made and no Section is rebuilt. Instead enrolled,
+enrolled_max, waitlisted, waitlisted_max, enrollable and waitlistable are updated in place on the sections being
+watched, and last_updated is set to the time of the poll. Sections that are no longer listed keep their last known
+numbers, and sections that were not listed when the course was fetched are ignored. Responses to polls are never served
+from the response cache (see requesthandler.set_cache).
+
+Requests are spent on a fixed budget of requests per second shared by every watched course. A course is polled again
+interval seconds after its last poll: the interval starts at min_interval, doubles every time a poll finds nothing
+changed (up to max_interval), and goes back to min_interval as soon as a number moves, so busy courses are polled often
+and quiet ones rarely. When more courses are due than the budget allows, the most overdue are polled first.
+
+    watcher = poller.EnrollmentPoller(budget=5, on_change=print)
+    for course in courses:
+        watcher.watch(course, '20F', api.fetch_sections(course, '20F'))
+    watcher.run()                   # until watcher.stop() is called from another thread
+'''
+
+DEFAULT_BUDGET = 2.0
+DEFAULT_MIN_INTERVAL = 60
+DEFAULT_MAX_INTERVAL = 15 * 60
+DEFAULT_WORKERS = 4
+
+SEAT_FIELDS = ('enrollable', 'waitlistable', 'enrolled', 'enrolled_max', 'waitlisted', 'waitlisted_max')
+
+'''
+Model for a change in the seat counts of a section
+
+section:        (Section)       The section whose numbers moved, already updated
+changes:        (dict)          Maps the name of every field in SEAT_FIELDS that changed to its (old, new) values
+'''
+class SeatChange:
+    def __init__(self, section, changes):
+        self.section = section
+        self.changes = changes
+
+    def __str__(self):
+        return str(self.__class__) + ": " + str(self.__dict__)
+
+class EnrollmentPoller:
+    '''
+    on_change is called with every SeatChange, and on_error with (course, term, exception) for every poll that failed,
+    in the thread that called poll_due() or run(). A failed poll is retried after the course's current interval.
+    '''
+    def __init__(self, budget: float = DEFAULT_BUDGET, on_change=None, on_error=None, min_interval: float = DEFAULT_MIN_INTERVAL,
+                 max_interval: float = DEFAULT_MAX_INTERVAL, max_workers: int = DEFAULT_WORKERS):
+        if budget <= 0:
+            raise ValueError(str(budget) + ' is not a legal request budget!')
+        self.budget = budget
+        self.on_change = on_change
+        self.on_error = on_error
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_workers = max_workers
+        self.requests = 0
+        self.polls = 0
+        self.errors = 0
+        self._watches = {}
+        self._due = []
+        self._counter = itertools.count()
+        self._next_request = time.monotonic()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    # Starts watching the root sections of a course (as returned by api.fetch_sections), first polled min_interval from now
+    def watch(self, course: Course, term: str, sections: List[Section]):
+        watch = _Watch(course, term, sections, self.min_interval)
+        with self._lock:
+            self._watches[watch.key] = watch
+            self._schedule(watch, time.monotonic() + watch.interval)
+
+    def unwatch(self, course: Course, term: str):
+        with self._lock:
+            self._watches.pop(_key(course, term), None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._watches)
+
+    # Seconds it takes to poll every watched course once at the request budget
+    def cycle_time(self):
+        with self._lock:
+            return sum(watch.cost() for watch in self._watches.values()) / self.budget
+
+    # Polls one watched course right away and returns what changed. on_change is not called.
+    def poll(self, course: Course, term: str) -> List[SeatChange]:
+        with self._lock:
+            watch = self._watches[_key(course, term)]
+        return self._poll(watch)
+
+    # Polls every course that is due, at most max_workers at a time, and returns what changed
+    def poll_due(self) -> List[SeatChange]:
+        now = time.monotonic()
+        due = []
+        with self._lock:
+            while len(self._due) > 0 and self._due[0][0] <= now:
+                due_at, _, key = heapq.heappop(self._due)
+                watch = self._watches.get(key)
+                # Entries of courses that were unwatched or rescheduled since are skipped
+                if watch is not None and watch.due_at == due_at:
+                    due.append(watch)
+        if len(due) == 0:
+            return []
+
+        out = []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(due))) as executor:
+            futures = [executor.submit(self._poll, watch) for watch in due]
+            for watch, future in zip(due, futures):
+                try:
+                    changes = future.result()
+                except Exception as e:
+                    with self._lock:
+                        self.errors += 1
+                        self._schedule(watch, time.monotonic() + watch.interval)
+                    if self.on_error is not None:
+                        self.on_error(watch.course, watch.term, e)
+                    continue
+                out.extend(changes)
+                if self.on_change is not None:
+                    for change in changes:
+                        self.on_change(change)
+        return out
+
+    # Polls courses as they come due until stop() is called
+    def run(self):
+        self._stopped.clear()
+        while not self._stopped.is_set():
+            with self._lock:
+                next_due = self._due[0][0] if len(self._due) > 0 else None
+            if next_due is None:
+                self._stopped.wait(self.min_interval)
+            elif next_due > time.monotonic():
+                # Courses watched in the meantime are due no sooner than min_interval from now
+                self._stopped.wait(min(next_due - time.monotonic(), self.min_interval))
+            else:
+                self.poll_due()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _poll(self, watch):
+        self._acquire()
+        resp = requesthandler.fetch_root_sections(watch.course, watch.term, use_cache=False)
+        changes = _update_seats(watch.sections, resp, int(time.time()))
+        for section in watch.sections:
+            if len(section.children) > 0:
+                self._acquire()
+                resp = requesthandler.fetch_leaf_sections(section, watch.term, use_cache=False)
+                changes.extend(_update_seats(section.children, resp, int(time.time())))
+
+        with self._lock:
+            self.polls += 1
+            if len(changes) > 0:
+                watch.interval = self.min_interval
+            else:
+                watch.interval = min(watch.interval * 2, self.max_interval)
+            if watch.key in self._watches:
+                self._schedule(watch, time.monotonic() + watch.interval)
+        return changes
+
+    # Blocks until the budget allows one more request. Requests are spaced evenly, 1 / budget seconds apart.
+    def _acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_request)
+            self._next_request = slot + 1 / self.budget
+            self.requests += 1
+        if slot > now:
+            time.sleep(slot - now)
+
+    def _schedule(self, watch, due_at):
+        watch.due_at = due_at
+        heapq.heappush(self._due, (due_at, next(self._counter), watch.key))
+
+class _Watch:
+    def __init__(self, course, term, sections, interval):
+        self.course = course
+        self.term = term
+        self.sections = sections
+        self.interval = interval
+        self.due_at = None
+        self.key = _key(course, term)
+
+    # Number of requests one poll of the course takes
+    def cost(self):
+        return 1 + sum(1 for section in self.sections if len(section.children) > 0)
+
+def _key(course, term):
+    return (course.get_path(), term)
+
+# Updates the seat counts of sections from a GetCourseSummary response, matching rows to sections by ID
+def _update_seats(sections, resp, polled_at):
+    rows = {}
+    for section_fields in backends.parse_sections(resp.text) or []:
+        rows[sectionparser._parse_id(section_fields)] = section_fields
+
+    out = []
+    for section in sections:
+        section_fields = rows.get(section.id)
+        if section_fields is None:
+            continue
+        before = [getattr(section, name) for name in SEAT_FIELDS]
+        sectionparser._populate_seats(section, section_fields)
+        section.last_updated = polled_at
+        changes = {}
+        for name, old in zip(SEAT_FIELDS, before):
+            new = getattr(section, name)
+            if new != old:
+                changes[name] = (old, new)
+        if len(changes) > 0:
+            out.append(SeatChange(section, changes))
+    return out
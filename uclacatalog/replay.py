@@ -0,0 +1,117 @@
+import json
+import os
+import threading
+from urllib.parse import urlsplit
+from . import cache
+from . import requesthandler
+
+'''
+Transports (see requesthandler.set_transport) that record the registrar's responses to disk and replay them later,
+without network access.
+
+    recorder = replay.Recorder()
+    requesthandler.set_transport(recorder)
+    ...                                         # use the library as usual
+    recorder.save('recording.json')
+
+    requesthandler.set_transport(replay.Replayer(['recording.json']))
+
+A recording is a JSON file of the form
+
+    {"responses": [{"endpoint": "courses", "url": ..., "params": {...}, "status": 200, "headers": {...}, "body": ...}]}
+
+Responses are matched on the path of the URL and the query parameters, so recordings can be replayed whatever host the
+library is configured to use, and served by server.py.
+'''
+
+'''
+Sends every request to the network (or to transport, if given) and keeps a copy of each response. If the same request
+is made more than once, the last response is kept.
+'''
+class Recorder:
+    def __init__(self, transport=None):
+        self.transport = transport
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, headers=None, session=None):
+        if self.transport is not None:
+            resp = self.transport.get(url, params, headers, session)
+        else:
+            resp = requesthandler._http_get(url, params, headers, session)
+        entry = {
+            'endpoint': endpoint(url, params),
+            'url': url,
+            'params': params,
+            'status': resp.status_code,
+            'headers': dict(resp.headers),
+            'body': resp.text
+        }
+        with self._lock:
+            self._entries[request_key(url, params)] = entry
+        return resp
+
+    def responses(self):
+        with self._lock:
+            return list(self._entries.values())
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump({'responses': self.responses()}, f, indent=1, sort_keys=True)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+'''
+Answers every request with its recorded response. recordings may mix paths of recording files, directories of them and
+already loaded recordings. A request that was never recorded raises a LookupError instead of going to the network.
+'''
+class Replayer:
+    def __init__(self, recordings):
+        self._entries = {}
+        for recording in load(recordings):
+            for entry in recording['responses']:
+                self._entries[request_key(entry['url'], entry['params'])] = entry
+
+    def get(self, url, params=None, headers=None, session=None):
+        entry = self.find(url, params)
+        if entry is None:
+            raise LookupError('No recorded response for ' + url + ' ' + json.dumps(params))
+        return requesthandler.Response(url, entry['status'], entry['body'], entry.get('headers'))
+
+    # Returns the recorded entry of the request, or None if it was never recorded
+    def find(self, url, params):
+        return self._entries.get(request_key(url, params))
+
+    def __len__(self):
+        return len(self._entries)
+
+# Returns every recording in recordings, loading the files and directories among them
+def load(recordings):
+    out = []
+    for recording in recordings:
+        if isinstance(recording, dict):
+            out.append(recording)
+        elif os.path.isdir(recording):
+            names = sorted(name for name in os.listdir(recording) if name.endswith('.json'))
+            out.extend(load([os.path.join(recording, name) for name in names]))
+        else:
+            with open(recording) as f:
+                out.append(json.load(f))
+    return out
+
+def request_key(url, params):
+    return urlsplit(url).path + json.dumps(params or {}, sort_keys=True)
+
+# Returns which of the four registrar endpoints (see cache.py) the request is for, or None if it is for none of them
+def endpoint(url, params):
+    path = urlsplit(url).path
+    if path.endswith('/Course-Details'):
+        return cache.COURSES
+    elif path.endswith('/GetCourseSummary'):
+        is_root = json.loads((params or {}).get('model', '{}')).get('IsRoot')
+        return cache.ROOT_SECTIONS if is_root else cache.LEAF_SECTIONS
+    elif path.endswith('/ClassDetailTooltip'):
+        return cache.SECTION_DETAIL
+    return None
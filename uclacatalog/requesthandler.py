@@ -1,31 +1,278 @@
+import threading
+from urllib.parse import urlsplit
 import requests as req
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from . import cache
+from . import instrument
 
 '''
 Handles requests to the necessary UCLA pages to scrape data from.
+
+Requests are made through one pooled, keep-alive session per host (registrar.ucla.edu and sa.ucla.edu), so that the
+dozens of requests made by a single api.fetch_sections call reuse the same TCP/TLS connections instead of performing
+a new handshake each time. The transport can be tuned through configure(), and every fetch function also accepts a
+session keyword argument if the caller would rather manage their own requests.Session.
+
+The network can also be replaced altogether with set_transport(), e.g to record responses to disk or replay them (see
+replay.py), and configure() can point the library at another host serving the same endpoints (see server.py).
 '''
 
-def fetch_courses(subj_area, div):
-    BASE = 'https://www.registrar.ucla.edu/Academics/Course-Descriptions/Course-Details?'
-    return req.get(BASE, params={'SA': subj_area, 'funsel': '3'})
+DEFAULT_TIMEOUT = 10
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (500, 502, 503, 504)
+DEFAULT_REGISTRAR_URL = 'https://www.registrar.ucla.edu'
+DEFAULT_SOC_URL = 'https://sa.ucla.edu'
 
-def fetch_root_sections(course, term):
-    DEFAULT_FILTERS = '{"enrollment_status":"O,W,C,X,T,S","advanced":"y","meet_days":"M,T,W,R,F","start_time":"8:00 am","end_time":"8:00 pm","meet_locations":null,"meet_units":null,"instructor":null,"class_career":null,"impacted":null,"enrollment_restrictions":null,"enforced_requisites":null,"individual_studies":null,"summer_session":null}'
-    BASE = 'https://sa.ucla.edu/ro/Public/SOC/Results/GetCourseSummary?'
-    return req.get(BASE, params={'model': course.to_jsons(term), 'FilterFlags': DEFAULT_FILTERS})
+_config = {
+    'timeout': DEFAULT_TIMEOUT,
+    'pool_size': DEFAULT_POOL_SIZE,
+    'retries': DEFAULT_RETRIES,
+    'backoff_factor': DEFAULT_BACKOFF_FACTOR,
+    'registrar_url': DEFAULT_REGISTRAR_URL,
+    'soc_url': DEFAULT_SOC_URL
+}
+_sessions = {}
+_default_session = None
+_cache = None
+_conditional = cache.ConditionalStore()
+_transport = None
+_lock = threading.Lock()
 
-def fetch_leaf_sections(section, term):
-    DEFAULT_FILTERS = '{"enrollment_status":"O,W,C,X,T,S","advanced":"y","meet_days":"M,T,W,R,F","start_time":"8:00 am","end_time":"8:00 pm","meet_locations":null,"meet_units":null,"instructor":null,"class_career":null,"impacted":null,"enrollment_restrictions":null,"enforced_requisites":null,"individual_studies":null,"summer_session":null}'
-    BASE = 'https://sa.ucla.edu/ro/Public/SOC/Results/GetCourseSummary?'
-    return req.get(BASE, params={'model': section.to_jsons(), 'FilterFlags': DEFAULT_FILTERS})
+'''
+Stand-in for requests.Response, for responses that did not come from requests: served from the cache (cache.py),
+replayed (replay.py) or fetched with aiohttp (aio.py). The parsers only read .text.
+'''
+class Response:
+    def __init__(self, url, status_code, text, headers=None, from_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+        self.from_cache = from_cache
+
+    @property
+    def content(self):
+        return self.text.encode('utf-8')
+
+'''
+Changes the settings of the shared transport. Sessions that were already created for a host are closed and rebuilt
+with the new settings on their next use.
 
-def fetch_section_detail(section):
-    BASE = 'https://sa.ucla.edu/ro/Public/SOC/Results/ClassDetailTooltip?'
+If session is given, it is used for every host instead of the library's own pooled sessions, until configure is called
+with another session or with use_own_sessions=True, which goes back to the library's own sessions. Calls that pass
+neither keep the current session.
+
+registrar_url and soc_url replace the scheme and host of the course descriptions (www.registrar.ucla.edu) and schedule
+of classes (sa.ucla.edu) endpoints respectively, e.g 'http://127.0.0.1:8080'.
+'''
+def configure(timeout=None, pool_size=None, retries=None, backoff_factor=None, session=None, registrar_url=None, soc_url=None,
+              use_own_sessions=False):
+    global _default_session
+    with _lock:
+        if timeout is not None: _config['timeout'] = timeout
+        if pool_size is not None: _config['pool_size'] = pool_size
+        if retries is not None: _config['retries'] = retries
+        if backoff_factor is not None: _config['backoff_factor'] = backoff_factor
+        if registrar_url is not None: _config['registrar_url'] = registrar_url.rstrip('/')
+        if soc_url is not None: _config['soc_url'] = soc_url.rstrip('/')
+        if use_own_sessions:
+            _default_session = None
+        if session is not None:
+            _default_session = session
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+def get_session(host):
+    with _lock:
+        if _default_session is not None:
+            return _default_session
+        if host not in _sessions:
+            _sessions[host] = _build_session()
+        return _sessions[host]
+
+def close():
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+'''
+Retries are done with exponential backoff on connection errors (including resets), read errors and 5xx responses.
+Only GET requests are made by this library, so every request is safe to retry.
+'''
+def _build_session():
+    retry = Retry(
+        total=_config['retries'],
+        connect=_config['retries'],
+        read=_config['retries'],
+        status=_config['retries'],
+        backoff_factor=_config['backoff_factor'],
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET']),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=_config['pool_size'], max_retries=retry)
+    session = req.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+'''
+Returns a dictionary mapping each host to the number of connections opened, the number of requests made and the
+number of requests that reused an already open connection (i.e the handshakes that were saved).
+'''
+def connection_stats():
+    with _lock:
+        sessions = list(_sessions.values())
+        if _default_session is not None:
+            sessions.append(_default_session)
+
+    stats = {}
+    for session in sessions:
+        for adapter in set(session.adapters.values()):
+            if not isinstance(adapter, HTTPAdapter):
+                continue
+            for key in adapter.poolmanager.pools.keys():
+                pool = adapter.poolmanager.pools.get(key)
+                if pool is None:
+                    continue
+                host_stats = stats.setdefault(pool.host, {'connections': 0, 'requests': 0, 'reused': 0})
+                host_stats['connections'] += pool.num_connections
+                host_stats['requests'] += pool.num_requests
+                host_stats['reused'] += max(pool.num_requests - pool.num_connections, 0)
+    return stats
+
+'''
+Installs a cache.ResponseCache (or anything with the same get/put methods) that responses are served from until they
+expire. Pass None to stop caching.
+'''
+def set_cache(response_cache):
+    global _cache
+    _cache = response_cache
+
+def get_cache():
+    return _cache
+
+'''
+Installs the cache.ConditionalStore used to make conditional requests to endpoints that send validators. One is
+installed by default. Pass None to always request full responses.
+'''
+def set_conditional_store(conditional_store):
+    global _conditional
+    _conditional = conditional_store
+
+def get_conditional_store():
+    return _conditional
+
+'''
+Installs a transport that every request is sent through instead of the network: any object with a
+get(url, params, headers, session) method returning something shaped like a requests.Response. Pass None to go back to
+the network.
+'''
+def set_transport(transport):
+    global _transport
+    _transport = transport
+
+def get_transport():
+    return _transport
+
+def _get(url, params=None, headers=None, session=None):
+    transport = _transport
+    if transport is not None:
+        return transport.get(url, params, headers, session)
+    return _http_get(url, params, headers, session)
+
+def _http_get(url, params=None, headers=None, session=None):
+    if session is None:
+        session = get_session(urlsplit(url).hostname)
+    return session.get(url, params=params, headers=headers, timeout=_config['timeout'])
+
+'''
+The _*_request functions build the (url, params, headers) for each endpoint, so that the blocking fetch functions below
+and the asyncio transport in aio.py send exactly the same requests.
+'''
+DEFAULT_FILTERS = '{"enrollment_status":"O,W,C,X,T,S","advanced":"y","meet_days":"M,T,W,R,F","start_time":"8:00 am","end_time":"8:00 pm","meet_locations":null,"meet_units":null,"instructor":null,"class_career":null,"impacted":null,"enrollment_restrictions":null,"enforced_requisites":null,"individual_studies":null,"summer_session":null}'
+
+def _courses_request(subj_area, div):
+    BASE = _config['registrar_url'] + '/Academics/Course-Descriptions/Course-Details?'
+    return BASE, {'SA': subj_area, 'funsel': '3'}, None
+
+def _root_sections_request(course, term):
+    BASE = _config['soc_url'] + '/ro/Public/SOC/Results/GetCourseSummary?'
+    return BASE, {'model': course.to_jsons(term), 'FilterFlags': DEFAULT_FILTERS}, None
+
+def _leaf_sections_request(section, term):
+    BASE = _config['soc_url'] + '/ro/Public/SOC/Results/GetCourseSummary?'
+    return BASE, {'model': section.to_jsons(), 'FilterFlags': DEFAULT_FILTERS}, None
+
+def _section_detail_request(section):
+    BASE = _config['soc_url'] + '/ro/Public/SOC/Results/ClassDetailTooltip?'
     query = {
-        'term_cd': section.term, 
-        'subj_area_cd': section.course.subj_area, 
-        'crs_catlg_no': section.course.get_padded_ctlg_no(), 
+        'term_cd': section.term,
+        'subj_area_cd': section.course.subj_area,
+        'crs_catlg_no': section.course.get_padded_ctlg_no(),
         'class_id': section.id,
         'class_no': section.sec_no
         }
     # We need to spoof a X-Requested-With header or else the response will just be a generic "Not found" page
-    return req.get(BASE, params=query, headers={'X-Requested-With': 'XMLHttpRequest'})
+    return BASE, query, {'X-Requested-With': 'XMLHttpRequest'}
+
+# If use_cache is False, the request is sent even if the cache holds a response for it, which then replaces that response
+def _fetch(endpoint, request, session, use_cache=True):
+    started = instrument.start()
+    cached, headers, stored = _prepare(endpoint, request, started, use_cache)
+    if cached is not None:
+        return cached
+    url, params = request[:2]
+    return _complete(endpoint, request, _get(url, params, headers, session), stored, started)
+
+'''
+_prepare and _complete are the steps of _fetch before and after the request is sent, shared with aio.py so that both
+handle the response cache, conditional requests and hooks the same way.
+
+_prepare returns (cached, headers, stored): the response served from the response cache or None, the headers to send,
+and the response of the conditional store the request was made conditional on or None.
+'''
+def _prepare(endpoint, request, started, use_cache=True):
+    url, params, headers = request
+    response_cache = _cache
+    if response_cache is not None and use_cache:
+        resp = response_cache.get(endpoint, url, params)
+        if resp is not None:
+            instrument.request(endpoint, url, resp, started, cached=True)
+            return resp, headers, None
+    conditional = _conditional
+    stored = None
+    if conditional is not None:
+        stored = conditional.get(url, params)
+        if stored is not None:
+            headers = cache.conditional_headers(headers, stored)
+    return None, headers, stored
+
+# Returns the response to hand to the parsers for resp, the answer to the request, and stores it
+def _complete(endpoint, request, resp, stored, started):
+    url, params = request[:2]
+    instrument.request(endpoint, url, resp, started)
+    conditional = _conditional
+    if conditional is not None:
+        resp = conditional.update(url, params, resp, stored)
+    response_cache = _cache
+    if response_cache is not None and resp.status_code == 200:
+        response_cache.put(endpoint, url, params, resp)
+    return resp
+
+def fetch_courses(subj_area, div, session=None):
+    return _fetch(cache.COURSES, _courses_request(subj_area, div), session)
+
+def fetch_root_sections(course, term, session=None, use_cache=True):
+    return _fetch(cache.ROOT_SECTIONS, _root_sections_request(course, term), session, use_cache)
+
+def fetch_leaf_sections(section, term, session=None, use_cache=True):
+    return _fetch(cache.LEAF_SECTIONS, _leaf_sections_request(section, term), session, use_cache)
+
+def fetch_section_detail(section, session=None):
+    return _fetch(cache.SECTION_DETAIL, _section_detail_request(section), session)
@@ -0,0 +1,178 @@
+import heapq
+import itertools
+from typing import List
+from .model import Section
+from .model.section import DAY_BITS
+
+'''
+Builds conflict-free weekly schedules out of the sections of several courses (pip install uclacatalog[schedule]).
+
+A schedule takes one option of every course, where an option is a lecture together with one of its children
+(discussion or lab), or a lecture alone if it has no children. Every option is encoded as a row of minute-of-the-week
+intervals in a NumPy array, and the options of every pair of courses are checked for overlaps all at once, giving one
+conflict matrix per pair of courses. The search then picks an option course by course, and after each pick strikes out
+the options of the remaining courses that conflict with it, so a partial schedule is abandoned as soon as any remaining
+course has nothing left that fits.
+
+Schedules are ranked by the time they keep you on campus: for each day with classes, the minutes from the first start
+to the last end, plus DAY_WEIGHT minutes per day. Since that can only grow as sections are added, partial schedules
+that are already worse than the k-th best complete schedule are abandoned as well.
+
+    sections = [api.fetch_sections(course, '20F') for course in courses]
+    schedules = schedule.build_schedules(sections, k=5, earliest_start=10 * 60, open_only=True)
+'''
+
+# Every day a section can meet on, Saturday (S) and Sunday (U) included
+DAYS = ''.join(DAY_BITS)
+MINUTES_PER_DAY = 24 * 60
+DAY_WEIGHT = 60
+DEFAULT_K = 10
+
+'''
+Model for a conflict-free schedule
+
+sections:       (List[Section]) The sections of the schedule, lectures followed by the child section chosen for them
+score:          (int)           Minutes spent on campus across the week plus DAY_WEIGHT per day with classes, lower is better
+'''
+class Schedule:
+    def __init__(self, sections, score):
+        self.sections = sections
+        self.score = score
+
+    def __str__(self):
+        return str(self.__class__) + ": " + str(self.__dict__)
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('numpy is required for uclacatalog.schedule, install it with pip install uclacatalog[schedule]')
+    return numpy
+
+'''
+Returns up to k conflict-free schedules taking one option from each list of root sections in course_sections (e.g the
+results of api.fetch_sections for each course), best first.
+
+earliest_start and latest_end are minutes since midnight (e.g 10 * 60 for no classes before 10am) that every section
+must fit between. If open_only is True, only sections with open seats are used.
+'''
+def build_schedules(course_sections: List[List[Section]], k: int = DEFAULT_K, earliest_start: int = None,
+                    latest_end: int = None, open_only: bool = False) -> List[Schedule]:
+    np = _import_numpy()
+    options = [_course_options(sections, earliest_start, latest_end, open_only) for sections in course_sections]
+    if k <= 0 or any(len(course_options) == 0 for course_options in options):
+        return []
+
+    intervals = [_interval_array(np, course_options) for course_options in options]
+    spans = [_day_spans(np, course_intervals) for course_intervals in intervals]
+    conflicts = {}
+    for a, b in itertools.permutations(range(len(options)), 2):
+        conflicts[(a, b)] = _conflict_matrix(intervals[a], intervals[b])
+
+    # Courses with the fewest options are placed first, so that conflicts prune the search as early as possible
+    order = sorted(range(len(options)), key=lambda c: len(options[c]))
+    best = []
+    counter = itertools.count()
+
+    def visit(depth, masks, day_start, day_end, chosen):
+        if depth == len(order):
+            entry = (-_score(np, day_start, day_end), next(counter), list(chosen))
+            if len(best) < k:
+                heapq.heappush(best, entry)
+            else:
+                heapq.heappushpop(best, entry)
+            return
+        c = order[depth]
+        remaining = order[depth + 1:]
+        for i in np.flatnonzero(masks[c]):
+            next_start = np.minimum(day_start, spans[c][0][i])
+            next_end = np.maximum(day_end, spans[c][1][i])
+            if len(best) == k and _score(np, next_start, next_end) >= -best[0][0]:
+                continue
+            next_masks = dict(masks)
+            for other in remaining:
+                next_masks[other] = masks[other] & ~conflicts[(c, other)][i]
+                if not next_masks[other].any():
+                    break
+            else:
+                chosen[c] = i
+                visit(depth + 1, next_masks, next_start, next_end, chosen)
+
+    masks = {c: np.ones(len(options[c]), dtype=bool) for c in order}
+    visit(0, masks, np.full(len(DAYS), MINUTES_PER_DAY), np.zeros(len(DAYS), dtype=int), [0] * len(options))
+
+    out = []
+    for neg_score, _, chosen in sorted(best, key=lambda entry: (-entry[0], entry[1])):
+        sections = [section for c, i in enumerate(chosen) for section in options[c][i]]
+        out.append(Schedule(sections, int(-neg_score)))
+    return out
+
+# Returns every allowed [lecture, child] (or [lecture]) of a course, leaving out children that overlap their lecture
+def _course_options(sections, earliest_start, latest_end, open_only):
+    out = []
+    for lecture in sections:
+        if not _allowed(lecture, earliest_start, latest_end, open_only):
+            continue
+        if len(lecture.children) == 0:
+            out.append([lecture])
+        for child in lecture.children:
+            if _allowed(child, earliest_start, latest_end, open_only) and not lecture.overlaps(child):
+                out.append([lecture, child])
+    return out
+
+def _allowed(section, earliest_start, latest_end, open_only):
+    if open_only and not section.enrollable:
+        return False
+    for day, start, end in _event_intervals(section):
+        if earliest_start is not None and start < earliest_start:
+            return False
+        if latest_end is not None and end > latest_end:
+            return False
+    return True
+
+# Returns (day index, start minute, end minute) for every day the event meets
+def _event_intervals(event):
+    if event.start_minute is None:
+        return []
+    return [(i, event.start_minute, event.end_minute) for i, day in enumerate(DAYS) if event.days & DAY_BITS[day]]
+
+'''
+Encodes the options of a course as an array of shape (options, intervals, 2) holding the start and end of every
+meeting as minutes since the start of the week. Options with fewer meetings are padded with empty [0, 0) intervals,
+which overlap nothing.
+'''
+def _interval_array(np, course_options):
+    rows = []
+    for option in course_options:
+        rows.append([(day * MINUTES_PER_DAY + start, day * MINUTES_PER_DAY + end)
+                     for section in option for day, start, end in _event_intervals(section)])
+    width = max(1, max(len(row) for row in rows))
+    out = np.zeros((len(rows), width, 2), dtype=np.int32)
+    for i, row in enumerate(rows):
+        if len(row) > 0:
+            out[i, :len(row)] = row
+    return out
+
+# conflicts[i, j] is True if option i of the first course overlaps option j of the second
+def _conflict_matrix(a, b):
+    a_start = a[:, None, :, None, 0]
+    a_end = a[:, None, :, None, 1]
+    b_start = b[None, :, None, :, 0]
+    b_end = b[None, :, None, :, 1]
+    return ((a_start < b_end) & (b_start < a_end)).any(axis=(2, 3))
+
+# Returns the earliest start and latest end of each option on each day, as two arrays of shape (options, days)
+def _day_spans(np, course_intervals):
+    starts = np.full((len(course_intervals), len(DAYS)), MINUTES_PER_DAY)
+    ends = np.zeros((len(course_intervals), len(DAYS)), dtype=int)
+    for day in range(len(DAYS)):
+        day_start = day * MINUTES_PER_DAY
+        on_day = (course_intervals[:, :, 0] >= day_start) & (course_intervals[:, :, 1] > course_intervals[:, :, 0]) & \
+                 (course_intervals[:, :, 0] < day_start + MINUTES_PER_DAY)
+        starts[:, day] = np.where(on_day, course_intervals[:, :, 0] - day_start, MINUTES_PER_DAY).min(axis=1)
+        ends[:, day] = np.where(on_day, course_intervals[:, :, 1] - day_start, 0).max(axis=1)
+    return starts, ends
+
+def _score(np, day_start, day_end):
+    on_campus = day_end > day_start
+    return int(np.where(on_campus, day_end - day_start, 0).sum() + DAY_WEIGHT * on_campus.sum())
@@ -0,0 +1,201 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List
+import heapq
+import math
+import re
+import sqlite3
+import threading
+import time
+from .crawl import CrawlResult
+from .model import Course
+from . import api
+
+'''
+Full-text search over the titles and descriptions of the catalog, across every subject area.
+
+The index is an inverted index stored in a SQLite file, so it survives restarts and queries never go back to the
+registrar. Results are ranked with BM25, and a course's title counts TITLE_WEIGHT times as much as its description.
+
+    index = search.SearchIndex('uclacatalog-search.sqlite')
+    index.build()                               # crawls every legal subject area, once
+    index.search('machine learning', div=api.UPPER_DIV, subj_areas=['COM SCI', 'STATS'])
+    index.update('COM SCI')                     # re-crawls and re-indexes a single subject area
+
+Queries are tokenized the same way as the documents: lowercased runs of letters and digits, without stop words.
+'''
+
+TITLE_WEIGHT = 2
+BM25_K1 = 1.2
+BM25_B = 0.75
+DEFAULT_LIMIT = 20
+
+STOP_WORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'into', 'is', 'it', 'its', 'of', 'on', 'or',
+    'that', 'the', 'their', 'this', 'to', 'with'
+])
+
+TOKEN_PATTERN = re.compile('[a-z0-9]+')
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+class SearchIndex:
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._stats = None
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS courses ('
+            'id INTEGER PRIMARY KEY, subj_area TEXT, div TEXT, ctlg_no TEXT, seq_no TEXT, title TEXT, desc TEXT, '
+            'units TEXT, is_concurrent INTEGER, is_multi_listed INTEGER, length INTEGER)'
+        )
+        self._conn.execute('CREATE TABLE IF NOT EXISTS postings (term TEXT, course INTEGER, tf INTEGER)')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS subjects (subj_area TEXT PRIMARY KEY, updated REAL)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS postings_term ON postings (term)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS postings_course ON postings (course)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS courses_subj_area ON courses (subj_area)')
+        self._conn.commit()
+
+    '''
+    Crawls and indexes every subject area in subj_areas (every legal subject area by default) on up to max_workers
+    threads. Returns the CrawlResult of each subject area; a subject area that fails keeps whatever was previously
+    indexed for it. Pages are always requested again, even if the catalog memo (see api.set_catalog_memo) holds them.
+    '''
+    def build(self, subj_areas = None, max_workers: int = 8) -> List[CrawlResult]:
+        if subj_areas is None:
+            subj_areas = sorted(api.LEGAL_SA)
+        results = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(api._fetch_subject_index, subj_area, True): subj_area for subj_area in subj_areas}
+            for future in as_completed(futures):
+                subj_area = futures[future]
+                try:
+                    course_index = future.result()
+                except Exception as e:
+                    results.append(CrawlResult(subj_area, error=e))
+                    continue
+                self.index_subject(subj_area, course_index.divisions)
+                results.append(CrawlResult(subj_area, courses=course_index.courses()))
+        return results
+
+    # Re-crawls a single subject area, bypassing the catalog memo, and replaces its courses in the index
+    def update(self, subj_area: str):
+        subj_area = subj_area.upper()
+        if subj_area not in api.LEGAL_SA:
+            raise ValueError(subj_area + ' not a legal subject area!')
+        self.index_subject(subj_area, api._fetch_subject_index(subj_area, refresh=True).divisions)
+
+    # Replaces the courses of subj_area with divisions, a dictionary mapping each division to its list of courses
+    def index_subject(self, subj_area: str, divisions):
+        rows = []
+        for div, course_list in divisions.items():
+            for course in course_list:
+                rows.append((div, course, _term_frequencies(course)))
+        with self._lock:
+            with self._conn:
+                self._delete_subject(subj_area)
+                for div, course, tfs in rows:
+                    cursor = self._conn.execute(
+                        'INSERT INTO courses VALUES (NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        (subj_area, div, course.ctlg_no, course.seq_no, course.title, course.desc, course.units,
+                         course.is_concurrent, course.is_multi_listed, sum(tfs.values()))
+                    )
+                    self._conn.executemany(
+                        'INSERT INTO postings VALUES (?, ?, ?)',
+                        [(term, cursor.lastrowid, tf) for term, tf in tfs.items()]
+                    )
+                self._conn.execute('INSERT OR REPLACE INTO subjects VALUES (?, ?)', (subj_area, time.time()))
+            self._stats = None
+
+    def remove_subject(self, subj_area: str):
+        with self._lock:
+            with self._conn:
+                self._delete_subject(subj_area)
+            self._stats = None
+
+    '''
+    Returns up to limit courses matching query, best match first. A course matches if it contains any of the query's
+    terms. div may be a single division, api.ALL_DIV or a list of divisions, and subj_areas restricts the results to
+    the given subject areas.
+    '''
+    def search(self, query: str, div = api.ALL_DIV, subj_areas = None, limit: int = DEFAULT_LIMIT) -> List[Course]:
+        return [course for score, course in self.search_scored(query, div, subj_areas, limit)]
+
+    # Same as search, but returns (score, course) pairs
+    def search_scored(self, query: str, div = api.ALL_DIV, subj_areas = None, limit: int = DEFAULT_LIMIT):
+        terms = set(tokenize(query))
+        filters, filter_params = _filters(div, subj_areas)
+        scores = {}
+        with self._lock:
+            course_count, avg_length = self._collection_stats()
+            for term in terms:
+                df = self._conn.execute('SELECT COUNT(*) FROM postings WHERE term = ?', (term,)).fetchone()[0]
+                if df == 0:
+                    continue
+                idf = math.log(1 + (course_count - df + 0.5) / (df + 0.5))
+                postings = self._conn.execute(
+                    'SELECT postings.course, postings.tf, courses.length FROM postings '
+                    'JOIN courses ON courses.id = postings.course WHERE postings.term = ?' + filters,
+                    [term] + filter_params
+                )
+                for course_id, tf, length in postings:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+                    scores[course_id] = scores.get(course_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+            return [(score, self._load_course(course_id)) for course_id, score in top]
+
+    # Returns a dictionary mapping every indexed subject area to the time it was last indexed
+    def subject_areas(self):
+        with self._lock:
+            return dict(self._conn.execute('SELECT subj_area, updated FROM subjects'))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM courses').fetchone()[0]
+
+    def _delete_subject(self, subj_area):
+        self._conn.execute('DELETE FROM postings WHERE course IN (SELECT id FROM courses WHERE subj_area = ?)', (subj_area,))
+        self._conn.execute('DELETE FROM courses WHERE subj_area = ?', (subj_area,))
+        self._conn.execute('DELETE FROM subjects WHERE subj_area = ?', (subj_area,))
+
+    # The number of courses and their average length are only recomputed after the index changes
+    def _collection_stats(self):
+        if self._stats is None:
+            count, avg_length = self._conn.execute('SELECT COUNT(*), AVG(length) FROM courses').fetchone()
+            self._stats = (count, avg_length or 1.0)
+        return self._stats
+
+    def _load_course(self, course_id):
+        row = self._conn.execute(
+            'SELECT subj_area, ctlg_no, seq_no, title, desc, units, is_concurrent, is_multi_listed FROM courses WHERE id = ?',
+            (course_id,)
+        ).fetchone()
+        course = Course()
+        course.subj_area, course.ctlg_no, course.seq_no, course.title, course.desc, course.units = row[:6]
+        course.is_concurrent = bool(row[6])
+        course.is_multi_listed = bool(row[7])
+        return course
+
+def _term_frequencies(course):
+    tfs = Counter(tokenize(course.desc))
+    for token in tokenize(course.title):
+        tfs[token] += TITLE_WEIGHT
+    return tfs
+
+def _filters(div, subj_areas):
+    filters = ''
+    params = []
+    if div != api.ALL_DIV:
+        divs = [div] if isinstance(div, str) else list(div)
+        filters += ' AND courses.div IN (%s)' % ', '.join('?' * len(divs))
+        params.extend(divs)
+    if subj_areas is not None:
+        subj_areas = [subj_area.upper() for subj_area in subj_areas]
+        filters += ' AND courses.subj_area IN (%s)' % ', '.join('?' * len(subj_areas))
+        params.extend(subj_areas)
+    return filters, params
@@ -0,0 +1,199 @@
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qsl, urlsplit
+import argparse
+import hashlib
+import random
+import socket
+import socketserver
+import threading
+import time
+from . import cache
+from . import replay
+
+'''
+A local stand-in for www.registrar.ucla.edu and sa.ucla.edu, serving recorded responses (see replay.py) over HTTP.
+
+It answers the four endpoints the library uses, with the same quirk as the real site: ClassDetailTooltip only answers
+requests with an X-Requested-With: XMLHttpRequest header, and serves a "Not found" page otherwise. Requests that were
+not recorded get a 404.
+
+Latency and failures can be injected to exercise the library's concurrency, caching and retries:
+
+- latency:          seconds added to every response, or a dictionary of them per endpoint (cache.COURSES, ...)
+- jitter:           up to this many more seconds are added at random
+- error_rate:       chance that a request is answered with error_status instead of its recording
+- fail_first:       number of times each distinct request fails with error_status before it is answered, which makes
+                    retries deterministic
+- drop_rate:        chance that the connection is closed without any response
+
+If etags is True, every response carries an ETag derived from its body, and requests whose If-None-Match matches it are
+answered with 304 Not Modified, to exercise conditional requests (see cache.ConditionalStore).
+
+    with server.StandInServer(['recording.json'], latency=0.05, fail_first=1) as stand_in:
+        requesthandler.configure(registrar_url=stand_in.url, soc_url=stand_in.url)
+        ...
+
+or from the command line:
+
+    python -m uclacatalog.server recording.json --port 8080 --latency 0.05 --error-rate 0.1
+'''
+
+NOT_FOUND_PAGE = '<html><head><title>Not found</title></head><body><h1>Not found</h1></body></html>'
+
+class StandInServer:
+    def __init__(self, recordings, host='127.0.0.1', port=0, latency=0, jitter=0, error_rate=0, fail_first=0,
+                 drop_rate=0, error_status=503, seed=None, etags=False):
+        self.replayer = replay.Replayer(recordings)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.fail_first = fail_first
+        self.drop_rate = drop_rate
+        self.error_status = error_status
+        self.etags = etags
+        self.stats = {}
+        self._failures = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = _ThreadingHTTPServer((host, port), _handler(self))
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return 'http://%s:%d' % (host, port)
+
+    # Serves requests on a background thread until stop() is called
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    '''
+    Decides how to answer a request. Returns (status, body, headers), or None if the connection should be dropped.
+    Counts every request in stats, which maps each endpoint to its number of requests, injected errors, drops, 404s and
+    304s.
+    '''
+    def respond(self, url, params, headers):
+        endpoint = replay.endpoint(url, params)
+        key = replay.request_key(url, params)
+        with self._lock:
+            stats = self.stats.setdefault(endpoint, {'requests': 0, 'errors': 0, 'drops': 0, 'not_found': 0, 'not_modified': 0})
+            stats['requests'] += 1
+            delay = self._latency(endpoint) + self._random.uniform(0, self.jitter)
+            failures = self._failures.get(key, 0)
+            if failures < self.fail_first:
+                self._failures[key] = failures + 1
+                outcome = 'error'
+            elif self._random.random() < self.drop_rate:
+                outcome = 'drop'
+            elif self._random.random() < self.error_rate:
+                outcome = 'error'
+            else:
+                outcome = 'ok'
+        if delay > 0:
+            time.sleep(delay)
+
+        if outcome == 'drop':
+            self._count(endpoint, 'drops')
+            return None
+        if outcome == 'error':
+            self._count(endpoint, 'errors')
+            return self.error_status, '', {}
+        entry = self.replayer.find(url, params)
+        if entry is None or (endpoint == cache.SECTION_DETAIL and headers.get('X-Requested-With') != 'XMLHttpRequest'):
+            self._count(endpoint, 'not_found')
+            return 404, NOT_FOUND_PAGE, {}
+        if not self.etags:
+            return entry['status'], entry['body'], {}
+        etag = '"' + hashlib.sha1(entry['body'].encode('utf-8')).hexdigest()[:16] + '"'
+        if headers.get('If-None-Match') == etag:
+            self._count(endpoint, 'not_modified')
+            return 304, '', {'ETag': etag}
+        return entry['status'], entry['body'], {'ETag': etag}
+
+    def _latency(self, endpoint):
+        if isinstance(self.latency, dict):
+            return self.latency.get(endpoint, 0)
+        return self.latency
+
+    def _count(self, endpoint, name):
+        with self._lock:
+            self.stats[endpoint][name] += 1
+
+# http.server.ThreadingHTTPServer only exists from Python 3.7 on
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+def _handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        # Headers and body are written separately, which Nagle's algorithm would otherwise delay by a round trip
+        def setup(self):
+            super().setup()
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_GET(self):
+            split = urlsplit(self.path)
+            response = server.respond(split.path, dict(parse_qsl(split.query, keep_blank_values=True)), self.headers)
+            if response is None:
+                self.close_connection = True
+                return
+            status, body, headers = response
+            payload = body.encode('utf-8')
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            if status == 304:
+                self.end_headers()
+                return
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description='Serves recorded registrar responses on a local port')
+    parser.add_argument('recordings', nargs='+', help='recording files or directories of them')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0)
+    parser.add_argument('--jitter', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--fail-first', type=int, default=0)
+    parser.add_argument('--drop-rate', type=float, default=0)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--etags', action='store_true', help='send ETags and answer matching requests with 304s')
+    args = parser.parse_args()
+
+    stand_in = StandInServer(args.recordings, args.host, args.port, args.latency, args.jitter, args.error_rate,
+                             args.fail_first, args.drop_rate, seed=args.seed, etags=args.etags)
+    print('Serving %d recorded responses on %s' % (len(stand_in.replayer), stand_in.url))
+    try:
+        stand_in.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+from typing import Iterable, List
+import hashlib
+import sqlite3
+import threading
+import time
+from .crawl import CrawlResult
+from .model import Course
+
+'''
+Snapshots of the catalog, for finding out what changed from one crawl to the next.
+
+A snapshot keeps the title, units and description of every course of the subject areas it was given, keyed by subject
+area, catalog number, sequence number and C/M conventions (see course_key), in a SQLite file. Updating it with a new
+crawl of a subject area returns a CatalogDiff of the courses that were added, removed and modified, with the old and
+new value of every modified field, and only writes those courses. Downstream datasets, indexes and caches can then
+apply the changes instead of being rebuilt.
+
+    catalog_snapshot = snapshot.CatalogSnapshot('uclacatalog-snapshot.sqlite')
+    for catalog_diff in catalog_snapshot.update_all(api.fetch_all_catalogs()):
+        for change in catalog_diff.modified:
+            ...
+
+Each course is stored with a fingerprint of its fields, so a subject area is compared by reading one short row per
+course, and the stored fields are only read back for the courses that were removed or modified.
+'''
+
+DIFF_FIELDS = ('title', 'units', 'desc')
+
+'''
+Model for a course whose fields changed between two snapshots
+
+course:         (Course)        The course as it is now
+changes:        (dict)          Maps the name of every field in DIFF_FIELDS that changed to its (old, new) values
+'''
+class CourseChange:
+    def __init__(self, course, changes):
+        self.course = course
+        self.changes = changes
+
+    def __str__(self):
+        return str(self.__class__) + ": " + str(self.__dict__)
+
+'''
+Model for the changes to the catalog of a subject area
+
+subj_area:      (string)                The subject area
+added:          (List[Course])          Courses that were not in the previous snapshot
+removed:        (List[Course])          Courses of the previous snapshot that are no longer listed, as they were then
+modified:       (List[CourseChange])    Courses whose title, units or description changed
+'''
+class CatalogDiff:
+    def __init__(self, subj_area, added=None, removed=None, modified=None):
+        self.subj_area = subj_area
+        self.added = added or []
+        self.removed = removed or []
+        self.modified = modified or []
+
+    # The number of courses that changed
+    def __len__(self):
+        return len(self.added) + len(self.removed) + len(self.modified)
+
+    def __str__(self):
+        return str(self.__class__) + ": " + str(self.__dict__)
+
+# The key that identifies a course from one crawl to the next
+def course_key(course: Course):
+    return (course.subj_area, course.ctlg_no, course.seq_no, course.is_concurrent, course.is_multi_listed)
+
+'''
+Compares two lists of courses of the same subject area. If a list holds the same key more than once, only its first
+course is compared.
+
+Like every method of CatalogSnapshot, subj_area is case insensitive, and a course of another subject area raises a
+ValueError.
+'''
+def diff_courses(subj_area: str, old_courses: Iterable[Course], new_courses: Iterable[Course]) -> CatalogDiff:
+    subj_area = subj_area.upper()
+    old = _by_key(subj_area, old_courses)
+    new = _by_key(subj_area, new_courses)
+    catalog_diff = CatalogDiff(subj_area)
+    for key, course in new.items():
+        if key not in old:
+            catalog_diff.added.append(course)
+        else:
+            changes = _changes(_fields(old[key]), _fields(course))
+            if len(changes) > 0:
+                catalog_diff.modified.append(CourseChange(course, changes))
+    catalog_diff.removed = [course for key, course in old.items() if key not in new]
+    return catalog_diff
+
+class CatalogSnapshot:
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS courses ('
+            'subj_area TEXT, ctlg_no TEXT, seq_no TEXT, is_concurrent INTEGER, is_multi_listed INTEGER, '
+            'fingerprint BLOB, title TEXT, units TEXT, desc TEXT, '
+            'PRIMARY KEY (subj_area, ctlg_no, seq_no, is_concurrent, is_multi_listed)) WITHOUT ROWID'
+        )
+        self._conn.execute('CREATE TABLE IF NOT EXISTS subjects (subj_area TEXT PRIMARY KEY, updated REAL)')
+        self._conn.commit()
+
+    # Returns what changed in the courses of subj_area since the snapshot, without updating it
+    def diff(self, subj_area: str, courses: Iterable[Course]) -> CatalogDiff:
+        subj_area = subj_area.upper()
+        new = _by_key(subj_area, courses)
+        with self._lock:
+            return self._diff(subj_area, new)
+
+    # Same as diff, and replaces the courses of subj_area in the snapshot with courses
+    def update(self, subj_area: str, courses: Iterable[Course]) -> CatalogDiff:
+        subj_area = subj_area.upper()
+        new = _by_key(subj_area, courses)
+        with self._lock:
+            catalog_diff = self._diff(subj_area, new)
+            with self._conn:
+                self._conn.executemany(
+                    'DELETE FROM courses WHERE subj_area = ? AND ctlg_no = ? AND seq_no = ? AND is_concurrent = ? '
+                    'AND is_multi_listed = ?',
+                    [course_key(course) for course in catalog_diff.removed]
+                )
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO courses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    [_row(course) for course in catalog_diff.added + [change.course for change in catalog_diff.modified]]
+                )
+                self._conn.execute('INSERT OR REPLACE INTO subjects VALUES (?, ?)', (subj_area, time.time()))
+            return catalog_diff
+
+    '''
+    Updates the snapshot with every successful CrawlResult of a crawl (e.g api.fetch_all_catalogs) and returns the
+    CatalogDiff of each subject area that changed. Subject areas that failed to crawl are left as they were rather than
+    reported as removed.
+    '''
+    def update_all(self, results: Iterable[CrawlResult]) -> List[CatalogDiff]:
+        out = []
+        for result in results:
+            if result.error is not None:
+                continue
+            catalog_diff = self.update(result.subj_area, result.courses)
+            if len(catalog_diff) > 0:
+                out.append(catalog_diff)
+        return out
+
+    # Returns the courses of subj_area as they were last snapshotted
+    def courses(self, subj_area: str) -> List[Course]:
+        subj_area = subj_area.upper()
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT subj_area, ctlg_no, seq_no, is_concurrent, is_multi_listed, title, units, desc FROM courses '
+                'WHERE subj_area = ?', (subj_area,)
+            ).fetchall()
+        return [_course(row) for row in rows]
+
+    # Returns a dictionary mapping every snapshotted subject area to the time it was last updated
+    def subject_areas(self):
+        with self._lock:
+            return dict(self._conn.execute('SELECT subj_area, updated FROM subjects'))
+
+    def remove_subject(self, subj_area: str):
+        subj_area = subj_area.upper()
+        with self._lock:
+            with self._conn:
+                self._conn.execute('DELETE FROM courses WHERE subj_area = ?', (subj_area,))
+                self._conn.execute('DELETE FROM subjects WHERE subj_area = ?', (subj_area,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM courses').fetchone()[0]
+
+    def _diff(self, subj_area, new):
+        stored = {}
+        for row in self._conn.execute(
+                'SELECT subj_area, ctlg_no, seq_no, is_concurrent, is_multi_listed, fingerprint FROM courses '
+                'WHERE subj_area = ?', (subj_area,)):
+            stored[(row[0], row[1], row[2], bool(row[3]), bool(row[4]))] = row[5]
+
+        catalog_diff = CatalogDiff(subj_area)
+        changed = []
+        for key, course in new.items():
+            fingerprint = stored.get(key)
+            if fingerprint is None:
+                catalog_diff.added.append(course)
+            elif fingerprint != _fingerprint(_fields(course)):
+                changed.append(course)
+        for course in changed:
+            old = self._load(course_key(course))
+            catalog_diff.modified.append(CourseChange(course, _changes(_fields(old), _fields(course))))
+        catalog_diff.removed = [self._load(key) for key in stored if key not in new]
+        return catalog_diff
+
+    def _load(self, key):
+        row = self._conn.execute(
+            'SELECT subj_area, ctlg_no, seq_no, is_concurrent, is_multi_listed, title, units, desc FROM courses '
+            'WHERE subj_area = ? AND ctlg_no = ? AND seq_no = ? AND is_concurrent = ? AND is_multi_listed = ?', key
+        ).fetchone()
+        return _course(row)
+
+# Courses are stored under their own subj_area, so one of another subject area would be reported as added every time
+def _by_key(subj_area, courses):
+    out = {}
+    for course in courses:
+        if course.subj_area != subj_area:
+            raise ValueError(course.subj_area + ' course given for ' + subj_area + '!')
+        out.setdefault(course_key(course), course)
+    return out
+
+def _fields(course):
+    return tuple(getattr(course, name) for name in DIFF_FIELDS)
+
+def _changes(old_fields, new_fields):
+    return {name: (old, new) for name, old, new in zip(DIFF_FIELDS, old_fields, new_fields) if old != new}
+
+def _fingerprint(fields):
+    return hashlib.blake2b('\x1f'.join(fields).encode('utf-8'), digest_size=8).digest()
+
+def _row(course):
+    fields = _fields(course)
+    return course_key(course) + (_fingerprint(fields),) + fields
+
+def _course(row):
+    course = Course()
+    course.subj_area, course.ctlg_no, course.seq_no = row[:3]
+    course.is_concurrent = bool(row[3])
+    course.is_multi_listed = bool(row[4])
+    course.title, course.units, course.desc = row[5:8]
+    return course